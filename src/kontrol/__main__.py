@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import json
 import logging
 import sys
 from collections.abc import Iterable
@@ -17,6 +18,7 @@ from .foundry import (
     foundry_clean,
     foundry_get_model,
     foundry_list,
+    foundry_list_summaries,
     foundry_merge_nodes,
     foundry_minimize_proof,
     foundry_refute_node,
@@ -30,7 +32,7 @@ from .foundry import (
     init_project,
 )
 from .kompile import foundry_kompile
-from .prove import _interpret_proof_failure, foundry_prove
+from .prove import _interpret_proof_failure, foundry_prove_results, foundry_prove_worker
 from .state_record import (
     foundry_state_load,
     read_recorded_state_diff,
@@ -74,6 +76,7 @@ if TYPE_CHECKING:
         UnrefuteNodeOptions,
         VersionOptions,
         ViewKcfgOptions,
+        WorkerOptions,
     )
 
     T = TypeVar('T')
@@ -201,7 +204,7 @@ def exec_prove(options: ProveOptions) -> None:
     foundry = _load_foundry(options.foundry_root, options.bug_report, add_enum_constraints=options.enum_constraints)
     try:
         console.print(proving_message)
-        results = foundry_prove(
+        results = foundry_prove_results(
             foundry=foundry,
             options=options,
             init_accounts=init_accounts,
@@ -221,28 +224,33 @@ def exec_prove(options: ProveOptions) -> None:
     failed = 0
     passed = 0
     total_time = 0.0
-    for proof in results:
-        _, test = proof.id.split('.')
+    for result in results:
+        _, test = result.id.split('.')
         if not any(test.startswith(prefix) for prefix in ['test', 'check', 'prove']):
             signature, _ = test.split(':')
             _LOGGER.warning(
                 f"{signature} is not prefixed with 'test', 'prove', or 'check', therefore, it is not reported as failing in the presence of reverts or assertion violations."
             )
 
-        total_time += proof.exec_time if hasattr(proof, 'exec_time') else 0.0
+        total_time += result.exec_time
 
-        if proof.passed:
+        if result.passed:
             passed += 1
-            console.print(f':sparkles: [bold green]PROOF PASSED[/bold green] :sparkles: {proof.id}')
+            console.print(f':sparkles: [bold green]PROOF PASSED[/bold green] :sparkles: {result.id}')
             console.print(
-                f':hourglass_not_done: [bold blue]Time: {proof.formatted_exec_time()}[/bold blue] :hourglass_not_done:'
+                f':hourglass_not_done: [bold blue]Time: {result.formatted_exec_time}[/bold blue] :hourglass_not_done:'
             )
         else:
             failed += 1
-            console.print(f':cross_mark: [bold red]PROOF FAILED[/bold red] :cross_mark: {proof.id}')
+            console.print(f':cross_mark: [bold red]PROOF FAILED[/bold red] :cross_mark: {result.id}')
             console.print(
-                f':hourglass_not_done: [bold blue]Time: {proof.formatted_exec_time()}[/bold blue] :hourglass_not_done:'
+                f':hourglass_not_done: [bold blue]Time: {result.formatted_exec_time}[/bold blue] :hourglass_not_done:'
             )
+            if result.skipped:
+                _LOGGER.error(f'{result.id}: {result.error_info}')
+                continue
+            # Only failed proofs are read back from disk, to report why they failed
+            proof = result.load_proof(foundry)
             contract, _ = foundry.get_contract_and_method(proof.id.split(':')[0])
             _interpret_proof_failure(proof, options.failure_info, contract.error_selectors)
             refuted_nodes = list(proof.node_refutations.keys())
@@ -261,6 +269,13 @@ def exec_prove(options: ProveOptions) -> None:
     sys.exit(1 if failed else 0)
 
 
+def exec_worker(options: WorkerOptions) -> None:
+    # The project is loaded by each worker process with the options of the coordinator, check it exists up front
+    _load_foundry(options.foundry_root)
+    count = foundry_prove_worker(options)
+    console.print(f'[bold]Worker finished after running {count} proofs.[/bold]')
+
+
 def exec_show(options: ShowOptions) -> None:
     output = foundry_show(
         foundry=_load_foundry(
@@ -304,7 +319,12 @@ def exec_split_node(options: SplitNodeOptions) -> None:
 
 
 def exec_list(options: ListOptions) -> None:
-    stats = foundry_list(foundry=_load_foundry(options.foundry_root, add_enum_constraints=options.enum_constraints))
+    foundry = _load_foundry(options.foundry_root, add_enum_constraints=options.enum_constraints)
+    if options.json:
+        summaries = foundry_list_summaries(foundry=foundry)
+        print(json.dumps([{k: v for k, v in summary.to_dict().items() if k != 'lines'} for summary in summaries]))
+        return
+    stats = foundry_list(foundry=foundry)
     print('\n'.join(stats))
 
 
@@ -0,0 +1,377 @@
+"""
+Bookkeeping for the contract artifacts that `forge build` writes to the `out` directory.
+
+Artifacts can be large, since they include the full solc AST. The `ArtifactIndex` records a fingerprint of the raw
+bytes of each artifact, keyed by its path, modification time and size, so that unchanged artifacts are not hashed
+again, together with the name, method signatures, enums and bytecode key of the contract it defines. The
+`ContractCache` keeps the parsed contracts, without their AST, so that only changed artifacts are parsed again, and
+the `ContractIndex` uses both to load a contract only when it is first accessed.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+from collections.abc import Mapping
+from typing import TYPE_CHECKING, NamedTuple
+
+import pyk
+from multiprocess import current_process  # type: ignore
+from multiprocess.pool import Pool  # type: ignore
+
+from . import VERSION
+from .solc_to_k import BytecodeKey, Contract
+from .utils import locked_json_update
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+    from pathlib import Path
+    from typing import Any, Final
+
+_LOGGER: Final = logging.getLogger(__name__)
+
+ARTIFACT_INDEX_FILE: Final = 'kontrol-artifacts.json'
+CONTRACT_CACHE_DIR: Final = 'kontrol-contracts'
+
+# Below this many artifacts, starting worker processes costs more than it saves
+PARALLEL_LOAD_THRESHOLD: Final = 64
+
+
+class ArtifactInfo(NamedTuple):
+    """What the `ContractIndex` needs to know about an artifact without loading its contract.
+
+    `name_with_path` and `contract_path` are `None` for artifacts that are not compatible solc contract JSON files.
+    """
+
+    name_with_path: str | None
+    contract_path: str | None
+    signatures: tuple[str, ...]
+    test_signatures: tuple[str, ...]
+    enums: tuple[tuple[str, int], ...]
+    bytecode_key: BytecodeKey | None = None
+
+    @staticmethod
+    def from_artifact(artifact: LoadedArtifact) -> ArtifactInfo:
+        contract = artifact.contract
+        if contract is None:
+            return ArtifactInfo(None, None, (), (), artifact.enums)
+        return ArtifactInfo(
+            name_with_path=contract.name_with_path,
+            contract_path=contract.contract_path,
+            signatures=tuple(method.signature for method in contract.methods),
+            test_signatures=tuple(method.signature for method in contract.methods if method.is_test),
+            enums=artifact.enums,
+            bytecode_key=BytecodeKey.from_bytecode(
+                contract.deployed_bytecode, contract.immutable_ranges, contract.link_ranges
+            ),
+        )
+
+    @staticmethod
+    def from_list(lst: list[Any]) -> ArtifactInfo:
+        name_with_path, contract_path, signatures, test_signatures, enums, bytecode_key = lst
+        return ArtifactInfo(
+            name_with_path=name_with_path,
+            contract_path=contract_path,
+            signatures=tuple(signatures),
+            test_signatures=tuple(test_signatures),
+            enums=tuple((enum_name, enum_max) for enum_name, enum_max in enums),
+            bytecode_key=BytecodeKey.from_list(bytecode_key) if bytecode_key is not None else None,
+        )
+
+    def to_list(self) -> list[Any]:
+        return [
+            self.name_with_path,
+            self.contract_path,
+            list(self.signatures),
+            list(self.test_signatures),
+            [list(enum) for enum in self.enums],
+            self.bytecode_key.to_list() if self.bytecode_key is not None else None,
+        ]
+
+
+class ArtifactIndex:
+    _out: Path
+    _entries: dict[str, list[Any]]
+    _updated: dict[str, list[Any]]
+
+    def __init__(self, out: Path) -> None:
+        self._out = out
+        try:
+            self._entries = json.loads((out / ARTIFACT_INDEX_FILE).read_text())
+        except (FileNotFoundError, ValueError):
+            self._entries = {}
+        self._updated = {}
+
+    def _key(self, path: Path) -> str:
+        return str(path.relative_to(self._out)) if path.is_relative_to(self._out) else str(path)
+
+    @staticmethod
+    def _stamp(path: Path) -> list[int]:
+        path_stat = path.stat()
+        return [path_stat.st_mtime_ns, path_stat.st_size]
+
+    def _entry(self, path: Path) -> list[Any] | None:
+        entry = self._entries.get(self._key(path))
+        if entry is not None and entry[:2] == self._stamp(path):
+            return entry
+        return None
+
+    def cached(self, path: Path) -> str | None:
+        """Return the recorded fingerprint of `path`, or `None` if it is not recorded or the file changed since."""
+        entry = self._entry(path)
+        return entry[2] if entry is not None else None
+
+    def info(self, path: Path) -> ArtifactInfo | None:
+        """Return the recorded `ArtifactInfo` of `path`, or `None` if it is not recorded or the file changed since."""
+        entry = self._entry(path)
+        # Entries written by older versions record fewer fields, the artifact is then recorded again
+        if entry is None or len(entry) <= 3 or len(entry[3]) != len(ArtifactInfo._fields):
+            return None
+        return ArtifactInfo.from_list(entry[3])
+
+    def record(self, path: Path, fingerprint: str, info: ArtifactInfo | None = None) -> None:
+        """Record the fingerprint and `ArtifactInfo` of `path`, keeping the recorded info if none is given."""
+        key = self._key(path)
+        entry: list[Any] = [*self._stamp(path), fingerprint]
+        if info is not None:
+            entry.append(info.to_list())
+        else:
+            old_entry = self._entries.get(key)
+            if old_entry is not None and len(old_entry) > 3 and old_entry[2] == fingerprint:
+                entry.append(old_entry[3])
+        self._entries[key] = self._updated[key] = entry
+
+    def fingerprint(self, path: Path, data: bytes | None = None) -> str:
+        """Return the SHA-256 of the contents of `path`, hashing `data` if given instead of reading the file."""
+        fingerprint = self.cached(path)
+        if fingerprint is None:
+            fingerprint = hashlib.sha256(data if data is not None else path.read_bytes()).hexdigest()
+            self.record(path, fingerprint)
+        return fingerprint
+
+    def flush(self) -> None:
+        """Write the entries recorded since the last flush to the index file in the `out` directory."""
+        if not self._updated:
+            return
+        updated = self._updated
+
+        def merge(entries: dict[str, Any]) -> None:
+            entries.update(updated)
+
+        try:
+            locked_json_update(self._out / ARTIFACT_INDEX_FILE, merge)
+        except OSError as err:
+            _LOGGER.warning(f'Could not update artifact index in {self._out}: {err}')
+        self._updated = {}
+
+
+class LoadedArtifact(NamedTuple):
+    path: Path
+    fingerprint: str
+    contract: Contract | None
+    enums: tuple[tuple[str, int], ...]
+
+
+def add_enum(enums: dict[str, int], enum_name: str, enum_max: int) -> None:
+    if enum_name in enums and enum_max != enums[enum_name]:
+        raise ValueError(
+            f'enum name conflict: {enum_name} exists more than once in the codebase with a different size, which is not supported with --enum-constraints.'
+        )
+    enums[enum_name] = enum_max
+
+
+def find_enums(dct: dict) -> Iterator[tuple[str, int]]:
+    if dct['nodeType'] == 'EnumDefinition':
+        yield dct['canonicalName'], len(dct['members'])
+    for node in dct.get('nodes', []):
+        yield from find_enums(node)
+
+
+def load_artifact(json_path: Path, fingerprint: str | None) -> LoadedArtifact:
+    """Parse a contract artifact, returning no contract if it is not a compatible solc contract JSON."""
+    _LOGGER.debug(f'Processing contract file: {json_path}')
+    contract_name = json_path.stem
+    contract_bytes = json_path.read_bytes()
+    if fingerprint is None:
+        fingerprint = hashlib.sha256(contract_bytes).hexdigest()
+    contract_json = json.loads(contract_bytes)
+    enums = tuple(find_enums(contract_json['ast'])) if 'ast' in contract_json else ()
+    try:
+        contract = Contract(contract_name, contract_json, foundry=True, fingerprint=fingerprint)
+    except (KeyError, TypeError, ValueError):
+        _LOGGER.warning(f'Skipping non-compatible JSON file for contract: {contract_name} at {json_path}.')
+        return LoadedArtifact(json_path, fingerprint, None, enums)
+    contract.compact()
+    return LoadedArtifact(json_path, fingerprint, contract, enums)
+
+
+class ContractCache:
+    """Parsed artifacts, pickled into one file per artifact under the `kontrol-contracts` directory of `out`.
+
+    Each file records the fingerprint of its artifact and the kontrol and pyk versions it was written with, and is
+    ignored if any of them changed.
+    """
+
+    _out: Path
+
+    def __init__(self, out: Path) -> None:
+        self._out = out
+
+    @staticmethod
+    def version() -> tuple[str, str]:
+        return (VERSION, pyk.__version__)
+
+    def _cache_file(self, json_path: Path) -> Path | None:
+        if not json_path.is_relative_to(self._out):
+            return None
+        return (self._out / CONTRACT_CACHE_DIR / json_path.relative_to(self._out)).with_suffix('.pickle')
+
+    def get(self, json_path: Path, fingerprint: str) -> LoadedArtifact | None:
+        cache_file = self._cache_file(json_path)
+        if cache_file is None or not cache_file.exists():
+            return None
+        try:
+            with cache_file.open('rb') as f:
+                version, cached_fingerprint, contract, enums = pickle.load(f)
+        except Exception as err:
+            _LOGGER.debug(f'Ignoring unreadable contract cache {cache_file}: {err}')
+            return None
+        if version != self.version() or cached_fingerprint != fingerprint:
+            return None
+        return LoadedArtifact(json_path, fingerprint, contract, enums)
+
+    def put(self, artifact: LoadedArtifact) -> None:
+        cache_file = self._cache_file(artifact.path)
+        if cache_file is None:
+            return
+        tmp_file = cache_file.with_name(f'{cache_file.name}.{os.getpid()}.tmp')
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            with tmp_file.open('wb') as f:
+                cached = (self.version(), artifact.fingerprint, artifact.contract, artifact.enums)
+                pickle.dump(cached, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file, cache_file)
+        except OSError as err:
+            _LOGGER.debug(f'Could not write contract cache {cache_file}: {err}')
+
+
+def parse_artifacts(
+    json_paths: Iterable[Path], artifacts: ArtifactIndex, cache: ContractCache, *, workers: int | None = None
+) -> list[LoadedArtifact]:
+    """Load the given artifacts, in the order of `json_paths`, from `cache` or else by parsing them.
+
+    Parsed artifacts are added to `cache`, and all of them are recorded in `artifacts` with their `ArtifactInfo`.
+    When at least `PARALLEL_LOAD_THRESHOLD` artifacts need parsing, they are parsed in a process pool of `workers`
+    processes, by default one per CPU.
+    """
+    json_paths = list(json_paths)
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    cached: dict[Path, LoadedArtifact] = {}
+    for json_path in json_paths:
+        hit = cache.get(json_path, artifacts.fingerprint(json_path))
+        if hit is not None:
+            cached[json_path] = hit
+    args = [(json_path, artifacts.cached(json_path)) for json_path in json_paths if json_path not in cached]
+    if cached:
+        _LOGGER.info(f'Loaded {len(cached)} contract files from cache, parsing {len(args)}')
+
+    # Daemonic processes, such as the workers of a proof pool, cannot start processes of their own
+    parallel = len(args) >= PARALLEL_LOAD_THRESHOLD and workers > 1 and not current_process().daemon
+    parsed: Iterable[LoadedArtifact]
+    if parallel:
+        _LOGGER.info(f'Loading {len(args)} contract files with {workers} processes')
+        with Pool(processes=workers) as pool:
+            parsed = pool.starmap(load_artifact, args, chunksize=max(1, len(args) // (4 * workers)))
+    else:
+        parsed = [load_artifact(*arg) for arg in args]
+    for artifact in parsed:
+        cache.put(artifact)
+        cached[artifact.path] = artifact
+
+    loaded = [cached[json_path] for json_path in json_paths]
+    for artifact in loaded:
+        artifacts.record(artifact.path, artifact.fingerprint, ArtifactInfo.from_artifact(artifact))
+    return loaded
+
+
+class ContractIndex(Mapping[str, Contract]):
+    """The contracts of a project by `name_with_path`, each loaded when it is first accessed.
+
+    Names, method signatures and enums are read from the `ArtifactIndex`, so listing and selecting tests loads no
+    contract. Artifacts that are not indexed, or changed since, are loaded when the index is built, and the others
+    are loaded from the `ContractCache` one at a time.
+    """
+
+    _artifacts: ArtifactIndex
+    _cache: ContractCache
+    _paths: dict[str, Path]
+    _infos: dict[str, ArtifactInfo]
+    _enums: list[tuple[str, int]]
+    _loaded: dict[str, Contract]
+
+    def __init__(self, out: Path, json_paths: Iterable[Path], *, workers: int | None = None) -> None:
+        self._artifacts = ArtifactIndex(out)
+        self._cache = ContractCache(out)
+        self._paths = {}
+        self._infos = {}
+        self._enums = []
+        self._loaded = {}
+
+        json_paths = list(json_paths)
+        infos = {json_path: self._artifacts.info(json_path) for json_path in json_paths}
+        stale = [json_path for json_path, info in infos.items() if info is None]
+        for artifact in parse_artifacts(stale, self._artifacts, self._cache, workers=workers):
+            infos[artifact.path] = ArtifactInfo.from_artifact(artifact)
+            if artifact.contract is not None:
+                self._loaded[artifact.contract.name_with_path] = artifact.contract
+        self._artifacts.flush()
+
+        for json_path in json_paths:
+            info = infos[json_path]
+            assert info is not None
+            self._enums.extend(info.enums)
+            if info.name_with_path is not None:
+                self._paths[info.name_with_path] = json_path
+                self._infos[info.name_with_path] = info
+
+    def __getitem__(self, name_with_path: str) -> Contract:
+        if name_with_path not in self._loaded:
+            json_path = self._paths[name_with_path]
+            fingerprint = self._artifacts.fingerprint(json_path)
+            artifact = self._cache.get(json_path, fingerprint)
+            if artifact is None:
+                artifact = load_artifact(json_path, fingerprint)
+                self._cache.put(artifact)
+            if artifact.contract is None or artifact.contract.name_with_path != name_with_path:
+                raise ValueError(f'Contract artifact changed since it was indexed: {json_path}')
+            self._loaded[name_with_path] = artifact.contract
+        return self._loaded[name_with_path]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._paths)
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    def info(self, name_with_path: str) -> ArtifactInfo:
+        return self._infos[name_with_path]
+
+    def bytecode_keys(self) -> dict[str, BytecodeKey | None]:
+        """The `BytecodeKey` of each contract, by name, to find contracts by their bytecode without loading them."""
+        return {name_with_path: info.bytecode_key for name_with_path, info in self._infos.items()}
+
+    def digest(self, name_with_path: str) -> str:
+        """The digest of a contract, as `Contract.digest`, computed without loading it."""
+        return Contract.artifact_digest(name_with_path, self._artifacts.fingerprint(self._paths[name_with_path]))
+
+    def enums(self) -> dict[str, int]:
+        """The sizes of the enums defined in the artifacts, by name, raising on conflicting sizes."""
+        enums: dict[str, int] = {}
+        for enum_name, enum_max in self._enums:
+            add_enum(enums, enum_name, enum_max)
+        return enums
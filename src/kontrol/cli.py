@@ -32,6 +32,7 @@ from .options import (
     UnrefuteNodeOptions,
     VersionOptions,
     ViewKcfgOptions,
+    WorkerOptions,
 )
 from .utils import parse_test_version_tuple
 
@@ -51,6 +52,7 @@ def generate_options(args: dict[str, Any]) -> LoggingOptions:
         'version': VersionOptions(args),
         'build': BuildOptions(args),
         'prove': ProveOptions(args),
+        'worker': WorkerOptions(args),
         'show': ShowOptions(args),
         'refute-node': RefuteNodeOptions(args),
         'unrefute-node': UnrefuteNodeOptions(args),
@@ -81,6 +83,7 @@ def get_option_string_destination(command: str, option_string: str) -> str:
         'version': VersionOptions.from_option_string(),
         'build': BuildOptions.from_option_string(),
         'prove': ProveOptions.from_option_string(),
+        'worker': WorkerOptions.from_option_string(),
         'show': ShowOptions.from_option_string(),
         'refute-node': RefuteNodeOptions.from_option_string(),
         'unrefute-node': UnrefuteNodeOptions.from_option_string(),
@@ -109,6 +112,7 @@ def get_argument_type_setter(command: str, option_string: str) -> Callable[[str]
         'version': VersionOptions.get_argument_type(),
         'build': BuildOptions.get_argument_type(),
         'prove': ProveOptions.get_argument_type(),
+        'worker': WorkerOptions.get_argument_type(),
         'show': ShowOptions.get_argument_type(),
         'refute-node': RefuteNodeOptions.get_argument_type(),
         'unrefute-node': UnrefuteNodeOptions.get_argument_type(),
@@ -347,6 +351,12 @@ def _create_argument_parser() -> ArgumentParser:
         action='append',
         help='Extra modules to import into generated main module.',
     )
+    build.add_argument(
+        '--kompiled-cache',
+        dest='kompiled_cache',
+        type=ensure_dir_path,
+        help='Directory of kompiled definitions shared between projects, reused instead of kompiling again.',
+    )
 
     state_diff_args = command_parser.add_parser(
         'load-state',
@@ -583,6 +593,62 @@ def _create_argument_parser() -> ArgumentParser:
         dest='step_timeout',
         help='Per-step wall-clock budget in whole seconds; on timeout the backend request is interrupted and the execution depth is halved before retrying. Disabled by default.',
     )
+    prove_args.add_argument(
+        '--reuse-server',
+        dest='reuse_server',
+        default=None,
+        action='store_true',
+        help='Keep one KoreServer per worker process and reuse it for all proofs run by that worker.',
+    )
+    prove_args.add_argument(
+        '--longest-first',
+        dest='longest_first',
+        default=None,
+        action='store_true',
+        help=(
+            'Start the proofs expected to take longest first, based on their previous execution time or, '
+            'for new proofs, on the size and branching of their bytecode.'
+        ),
+    )
+    prove_args.add_argument(
+        '--coordinator',
+        dest='coordinator',
+        type=str,
+        help=(
+            'Hand out the proofs to `kontrol worker` processes connecting to this [HOST:]PORT address '
+            'instead of running them locally. Workers must share the proofs directory.'
+        ),
+    )
+    prove_args.add_argument(
+        '--authkey',
+        dest='authkey',
+        type=str,
+        help='Authentication key shared with the workers, defaults to the KONTROL_AUTHKEY environment variable.',
+    )
+
+    worker_args = command_parser.add_parser(
+        'worker',
+        help='Run proofs handed out by a `kontrol prove --coordinator` process.',
+        parents=[
+            kontrol_cli_args.logging_args,
+            kontrol_cli_args.parallel_args,
+            kontrol_cli_args.foundry_args,
+            config_args.config_args,
+        ],
+    )
+    worker_args.add_argument(
+        '--connect',
+        dest='connect',
+        type=str,
+        required=True,
+        help='[HOST:]PORT address of the coordinator.',
+    )
+    worker_args.add_argument(
+        '--authkey',
+        dest='authkey',
+        type=str,
+        help='Authentication key shared with the coordinator, defaults to the KONTROL_AUTHKEY environment variable.',
+    )
 
     show_args = command_parser.add_parser(
         'show',
@@ -646,7 +712,7 @@ def _create_argument_parser() -> ArgumentParser:
         help='Run KCFG minimization routine before displaying it.',
     )
 
-    command_parser.add_parser(
+    list_args = command_parser.add_parser(
         'list',
         help='List information about CFGs on disk',
         parents=[
@@ -656,6 +722,13 @@ def _create_argument_parser() -> ArgumentParser:
             config_args.config_args,
         ],
     )
+    list_args.add_argument(
+        '--json',
+        dest='json',
+        default=None,
+        action='store_true',
+        help='Print the proof summaries as a JSON list.',
+    )
 
     view_kcfg_args = command_parser.add_parser(
         'view-kcfg',
@@ -47,7 +47,7 @@ class FoundryNodePrinter(KEVMNodePrinter):
         KEVMNodePrinter.__init__(self, foundry.kevm, cterm_show)
         self.foundry = foundry
         self.contract_name = contract_name
-        self.compilation_unit = CompilationUnit.load_build_info(foundry.build_info)
+        self.compilation_unit = CompilationUnit.load_build_info(foundry.build_info, foundry.build_info_index)
 
     def print_node(self, kcfg: KCFG, node: KCFG.Node) -> list[str]:
         ret_strs = super().print_node(kcfg, node)
@@ -83,11 +83,10 @@ class FoundryNodePrinter(KEVMNodePrinter):
             if selector_bytes is not None:
                 selector = int.from_bytes(selector_bytes, 'big')
                 current_contract_name = self.foundry.contract_name_from_bytecode(ast.literal_eval(program_cell.token))
-                for contract_name, contract_obj in self.foundry.contracts.items():
-                    if current_contract_name == contract_name:
-                        for method in contract_obj.methods:
-                            if method.id == selector:
-                                ret_strs.append(f'method: {method.qualified_name}')
+                if current_contract_name is not None and current_contract_name in self.foundry.contracts:
+                    for method in self.foundry.contracts[current_contract_name].methods:
+                        if method.id == selector:
+                            ret_strs.append(f'method: {method.qualified_name}')
 
         return ret_strs
 
@@ -281,7 +280,7 @@ def foundry_view(foundry: Foundry, options: ViewKcfgOptions) -> None:
     contract_name, _ = test_id.split('.')
     proof = foundry.get_apr_proof(test_id)
 
-    compilation_unit = CompilationUnit.load_build_info(foundry.build_info)
+    compilation_unit = CompilationUnit.load_build_info(foundry.build_info, foundry.build_info_index)
 
     def _custom_view(elem: KCFGElem) -> Iterable[str]:
         return custom_view(contract_name, elem, compilation_unit)
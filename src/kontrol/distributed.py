@@ -0,0 +1,262 @@
+"""
+Work queue for running proofs on several machines.
+
+A `ProofCoordinator` serves a job description and a queue of tasks over TCP, using the `multiprocess` manager
+protocol with a shared authentication key. Workers started with `run_worker` connect to it, take tasks one at a
+time, and send back one result per task, with heartbeats while a task runs. Proof data itself is not sent over the
+connection, the coordinator and workers are expected to share the proofs directory.
+"""
+
+from __future__ import annotations
+
+import itertools
+import logging
+import os
+import queue
+import socket
+import threading
+import time
+from typing import TYPE_CHECKING, Any
+
+from multiprocess.managers import BaseManager  # type: ignore
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from typing import Final
+
+_LOGGER: Final = logging.getLogger(__name__)
+
+AUTHKEY_ENV_VAR: Final = 'KONTROL_AUTHKEY'
+
+
+def parse_address(address: str) -> tuple[str, int]:
+    """Parse an address of the form `[HOST:]PORT`, where the host defaults to `localhost`."""
+    host, _, port = address.rpartition(':')
+    try:
+        return host or 'localhost', int(port)
+    except ValueError:
+        raise ValueError(f'Expected an address of the form [HOST:]PORT, found: {address}') from None
+
+
+def resolve_authkey(authkey: str | None) -> bytes:
+    """Return the given authentication key, or the one in the environment variable `KONTROL_AUTHKEY`."""
+    if authkey is None:
+        authkey = os.environ.get(AUTHKEY_ENV_VAR)
+    if not authkey:
+        raise ValueError(f'An authentication key must be given with --authkey or the {AUTHKEY_ENV_VAR} variable.')
+    return authkey.encode()
+
+
+class _WorkerManager(BaseManager):
+    pass
+
+
+_WorkerManager.register('get_job')
+_WorkerManager.register('get_dispatcher')
+_WorkerManager.register('get_done')
+
+
+class _Dispatcher:
+    """The task queue of a `ProofCoordinator`, which records the tasks held by each worker.
+
+    Every call from a worker counts as a heartbeat. The tasks held by a worker that has not been heard from for
+    `lost_worker_timeout` seconds are handed out again, and a result it sends for them afterwards is ignored.
+    """
+
+    results: queue.Queue
+    _tasks: queue.PriorityQueue
+    _lost_worker_timeout: float
+    _lock: threading.Lock
+    _held: dict[str, dict[str, tuple[float, int, str, Any]]]
+    _last_seen: dict[str, float]
+
+    def __init__(self, lost_worker_timeout: float) -> None:
+        self.results = queue.Queue()
+        self._tasks = queue.PriorityQueue()
+        self._lost_worker_timeout = lost_worker_timeout
+        self._lock = threading.Lock()
+        self._held = {}
+        self._last_seen = {}
+
+    def put(self, entry: tuple[float, int, str, Any]) -> None:
+        self._tasks.put(entry)
+
+    def take(self, worker_id: str, timeout: float) -> tuple[str, Any] | None:
+        """Hand out the next task to a worker, or return `None` if there is none within `timeout` seconds."""
+        self.heartbeat(worker_id)
+        try:
+            entry = self._tasks.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        _, _, task_id, task = entry
+        with self._lock:
+            self._held.setdefault(worker_id, {})[task_id] = entry
+        return task_id, task
+
+    def heartbeat(self, worker_id: str) -> None:
+        with self._lock:
+            self._last_seen[worker_id] = time.monotonic()
+
+    def finish(self, worker_id: str, task_id: str, result: Any, error: Exception | None) -> None:
+        with self._lock:
+            self._last_seen[worker_id] = time.monotonic()
+            if self._held.get(worker_id, {}).pop(task_id, None) is None:
+                _LOGGER.warning(f'Ignoring the result of task {task_id} from lost worker {worker_id}')
+                return
+        self.results.put((task_id, result, error))
+
+    def requeue_lost(self) -> None:
+        """Hand out again the tasks of the workers that have not been heard from in time."""
+        now = time.monotonic()
+        with self._lock:
+            lost = [
+                worker_id
+                for worker_id, last_seen in self._last_seen.items()
+                if now - last_seen > self._lost_worker_timeout
+            ]
+            for worker_id in lost:
+                del self._last_seen[worker_id]
+                for task_id, entry in self._held.pop(worker_id, {}).items():
+                    _LOGGER.warning(f'Lost worker {worker_id}, handing out task {task_id} again')
+                    self._tasks.put(entry)
+
+
+class ProofCoordinator:
+    """Serve the tasks of a job to `run_worker` processes and collect their results.
+
+    Tasks with a higher priority are handed out first, and tasks with equal priority in submission order. The tasks
+    of a worker that stops sending heartbeats for `lost_worker_timeout` seconds are handed out again.
+    """
+
+    _job: Any
+    _dispatcher: _Dispatcher
+    _done: threading.Event
+    _counter: itertools.count
+    _poll_interval: float
+    _server: Any
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        authkey: bytes,
+        job: Any,
+        lost_worker_timeout: float = 60.0,
+        poll_interval: float = 1.0,
+    ) -> None:
+        self._job = job
+        self._dispatcher = _Dispatcher(lost_worker_timeout)
+        self._done = threading.Event()
+        self._counter = itertools.count()
+        self._poll_interval = poll_interval
+
+        class _CoordinatorManager(BaseManager):
+            pass
+
+        _CoordinatorManager.register('get_job', callable=lambda: self._job)
+        _CoordinatorManager.register('get_dispatcher', callable=lambda: self._dispatcher)
+        _CoordinatorManager.register('get_done', callable=lambda: self._done)
+
+        self._server = _CoordinatorManager(address=address, authkey=authkey).get_server()
+
+    def __enter__(self) -> ProofCoordinator:
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        _LOGGER.info(f'Proof coordinator listening on {self.address[0]}:{self.address[1]}')
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    @property
+    def address(self) -> tuple[str, int]:
+        return self._server.address
+
+    def submit(self, task_id: str, task: Any, priority: float = 0.0) -> None:
+        self._dispatcher.put((-priority, next(self._counter), task_id, task))
+
+    def result(self) -> tuple[str, Any]:
+        """Wait for the next result sent by a worker, re-raising the exception of a failed task.
+
+        While waiting, the tasks of lost workers are handed out again.
+        """
+        while True:
+            try:
+                task_id, result, error = self._dispatcher.results.get(timeout=self._poll_interval)
+                break
+            except queue.Empty:
+                self._dispatcher.requeue_lost()
+        if error is not None:
+            raise RuntimeError(f'Worker failed to run task {task_id}: {error}') from error
+        return task_id, result
+
+    def close(self) -> None:
+        """Tell the connected workers that there are no more tasks.
+
+        The server thread keeps answering until the process exits, so that polling workers see that the job is done.
+        """
+        self._done.set()
+
+
+def _send_heartbeats(dispatcher: Any, worker_id: str, stop: threading.Event, interval: float) -> None:
+    while not stop.wait(interval):
+        try:
+            dispatcher.heartbeat(worker_id)
+        except (EOFError, ConnectionError):
+            return
+
+
+def run_worker(
+    address: tuple[str, int],
+    authkey: bytes,
+    run_task: Callable[[Any, Any], Any],
+    poll_interval: float = 1.0,
+    heartbeat_interval: float = 10.0,
+) -> int:
+    """Run tasks from the coordinator at `address` until it has no more, and return the number of tasks run.
+
+    Each task is run as `run_task(job, task)`, where `job` is the job description served by the coordinator. A task
+    that raises is reported to the coordinator as failed, and the worker goes on with the next one. While a task
+    runs, a heartbeat is sent every `heartbeat_interval` seconds so that the coordinator knows the worker is alive.
+    """
+    manager = _WorkerManager(address=address, authkey=authkey)
+    manager.connect()
+    job = manager.get_job()._getvalue()
+    dispatcher = manager.get_dispatcher()
+    done = manager.get_done()
+    worker_id = f'{socket.gethostname()}:{os.getpid()}'
+
+    count = 0
+    while True:
+        try:
+            taken = dispatcher.take(worker_id, poll_interval)
+            if taken is None:
+                if done.is_set():
+                    break
+                continue
+        except (EOFError, ConnectionError):
+            _LOGGER.info('Lost the connection to the proof coordinator.')
+            break
+
+        task_id, task = taken
+        _LOGGER.info(f'Running task: {task_id}')
+        stop = threading.Event()
+        heartbeats = threading.Thread(
+            target=_send_heartbeats, args=(dispatcher, worker_id, stop, heartbeat_interval), daemon=True
+        )
+        heartbeats.start()
+        result, error = None, None
+        try:
+            result = run_task(job, task)
+        except Exception as err:
+            _LOGGER.exception(f'Task failed: {task_id}')
+            error = err
+        finally:
+            stop.set()
+            heartbeats.join()
+
+        try:
+            dispatcher.finish(worker_id, task_id, result, error)
+        except (EOFError, ConnectionError):
+            _LOGGER.info('Lost the connection to the proof coordinator.')
+            break
+        count += 1
+    return count
@@ -2,14 +2,13 @@ from __future__ import annotations
 
 import ast
 import datetime
-import json
 import logging
 import os
 import re
 import shutil
 import traceback
 import xml.etree.ElementTree as Et
-from functools import cached_property
+from functools import cache, cached_property
 from os import listdir
 from pathlib import Path
 from subprocess import CalledProcessError
@@ -31,7 +30,7 @@ from pyk.kast.manip import (
 from pyk.kast.outer import KRule
 from pyk.kast.prelude.bytes import bytesToken
 from pyk.kast.prelude.collections import map_empty
-from pyk.kast.prelude.k import DOTS, GENERATED_TOP_CELL
+from pyk.kast.prelude.k import DOTS
 from pyk.kast.prelude.kbool import notBool
 from pyk.kast.prelude.kint import INT, intToken
 from pyk.kast.prelude.ml import mlEqualsFalse, mlEqualsTrue
@@ -42,10 +41,13 @@ from pyk.proof.reachability import APRFailureInfo, APRProof
 from pyk.utils import ensure_dir_path, hash_str, run_process, run_process_2, single, unique
 
 from . import VERSION
-from .solc_to_k import Contract, _contract_name_from_bytecode
+from .artifacts import ContractIndex
+from .proof_store import ProofIndex, ProofSummary, ProofSummaryIndex
+from .solc_to_k import BytecodeIndex, Contract
 from .storage_generation import generate_setup_contract
 from .utils import (
-    _read_digest_file,
+    DigestStore,
+    cached_empty_config,
     decode_log_message,
     empty_lemmas_file_contents,
     ensure_name_is_unique,
@@ -57,7 +59,7 @@ from .utils import (
 )
 
 if TYPE_CHECKING:
-    from collections.abc import Iterable
+    from collections.abc import Callable, Iterable, Sequence
     from typing import Any, Final
 
     from pyk.cterm import CTermSymbolic
@@ -82,18 +84,23 @@ if TYPE_CHECKING:
         StepNodeOptions,
         UnrefuteNodeOptions,
     )
+    from .prove import ProofResult
 
 _LOGGER: Final = logging.getLogger(__name__)
 
+_SIMPLIFY_CACHE_SIZE: Final = 1024
+
 
 class KontrolSemantics(KEVMSemantics):
 
     allow_ffi_calls: bool
+    _simplified: dict[CTerm, CTerm]
 
     def __init__(
         self, auto_abstract_gas: bool = False, allow_symbolic_program: bool = False, allow_ffi_calls: bool = False
     ) -> None:
         self.allow_ffi_calls = allow_ffi_calls
+        self._simplified = {}
 
         custom_steps = (
             CustomStep(self._ffi_pattern, self._exec_ffi_custom_step),
@@ -108,6 +115,22 @@ class KontrolSemantics(KEVMSemantics):
             custom_step_definitions=custom_steps,
         )
 
+    @staticmethod
+    @cache
+    def base_kevm() -> KEVM:
+        """The `kontrol.base` definition, loaded once per process and shared by all custom steps."""
+        return KEVM(kdist.get('kontrol.base'))
+
+    def _simplify_cached(self, cterm_symbolic: CTermSymbolic, cterm: CTerm) -> CTerm:
+        """Simplify `cterm`, reusing the results of earlier simplifications of the same term."""
+        simplified = self._simplified.get(cterm)
+        if simplified is None:
+            simplified, _ = cterm_symbolic.simplify(cterm)
+            if len(self._simplified) >= _SIMPLIFY_CACHE_SIZE:
+                self._simplified.clear()
+            self._simplified[cterm] = simplified
+        return simplified
+
     @staticmethod
     def cut_point_rules(
         break_on_jumpi: bool,
@@ -240,7 +263,7 @@ class KontrolSemantics(KEVMSemantics):
         ) -> set[KInner]:
             for constraint_variant in constraints_to_remove:
                 simplification_cterm = initial_cterm.add_constraint(constraint_variant)
-                result_cterm, _ = cterm_symbolic.simplify(simplification_cterm)
+                result_cterm = self._simplify_cached(cterm_symbolic, simplification_cterm)
                 # Extract constraints that appear after simplification but are not in the 'to keep' set
                 result_constraints = set(result_cterm.constraints).difference(constraints_to_keep)
 
@@ -256,7 +279,9 @@ class KontrolSemantics(KEVMSemantics):
                     # If no constraints or multiple constraints appear, log this scenario.
                     if len(result_constraints) == 0:
                         _LOGGER.info(f'forgetBranch: constraint {constraint_variant} entailed by remaining constraints')
-                        result_cterm, _ = cterm_symbolic.simplify(CTerm(empty_config.config, [constraint_variant]))
+                        result_cterm = self._simplify_cached(
+                            cterm_symbolic, CTerm(empty_config.config, [constraint_variant])
+                        )
                         if len(result_cterm.constraints) == 1:
                             to_remove = single(result_cterm.constraints)
                             if to_remove in constraints:
@@ -284,9 +309,9 @@ class KontrolSemantics(KEVMSemantics):
 
         # Set up initial configuration for constraint simplification, and simplify it to get all
         # of the kept constraints in the form in which they will appear after constraint simplification
-        kevm = KEVM(kdist.get('kontrol.base'))
-        empty_config: CTerm = CTerm.from_kast(kevm.definition.empty_config(GENERATED_TOP_CELL))
-        initial_cterm, _ = cterm_symbolic.simplify(CTerm(empty_config.config, constraints_to_keep))
+        kevm = KontrolSemantics.base_kevm()
+        empty_config: CTerm = CTerm.from_kast(cached_empty_config(kevm.definition_dir, lambda: kevm.definition))
+        initial_cterm = self._simplify_cached(cterm_symbolic, CTerm(empty_config.config, constraints_to_keep))
         constraints_to_keep = set(initial_cterm.constraints)
 
         # Simplify in the presence of constraints to keep, then remove the constraints to keep to
@@ -322,8 +347,7 @@ class KontrolSemantics(KEVMSemantics):
                 if output is not None:
                     print(f'    {output}')
             else:
-                kevm = KEVM(kdist.get('kontrol.base'))
-                print(f'    {kevm.pretty_print(data)}')
+                print(f'    {KontrolSemantics.base_kevm().pretty_print(data)}')
         except Exception as e:
             _LOGGER.warning(f'Console log decode error: {e}')
 
@@ -456,7 +480,6 @@ class Foundry:
     _expand_config: bool
 
     add_enum_constraints: bool
-    enums: dict[str, int]
 
     def __init__(
         self,
@@ -473,7 +496,6 @@ class Foundry:
         self._use_hex_encoding = use_hex_encoding
         self._expand_config = expand_config
         self.add_enum_constraints = add_enum_constraints
-        self.enums = {}
 
     def lookup_full_contract_name(self, contract_name: str) -> str:
         contracts = [
@@ -512,10 +534,19 @@ class Foundry:
     def digest_file(self) -> Path:
         return self.out / 'digest'
 
+    @cached_property
+    def digests(self) -> DigestStore:
+        return DigestStore(self.digest_file)
+
     @property
     def kompiled(self) -> Path:
+        """The active kompiled definition, a link into `kompiled_variants` set by `kontrol build`."""
         return self.out / 'kompiled'
 
+    @property
+    def kompiled_variants(self) -> Path:
+        return self.out / 'kompiled-variants'
+
     @property
     def llvm_library(self) -> Path:
         return self.kompiled / 'llvm-library'
@@ -533,6 +564,10 @@ class Foundry:
         else:
             return self.out / 'build-info'
 
+    @property
+    def build_info_index(self) -> Path:
+        return self.out / 'kontrol-build-info.json'
+
     @property
     def ffi(self) -> bool:
         if os.getenv('FOUNDRY_FFI', '').lower() in ('true', '1'):
@@ -541,6 +576,10 @@ class Foundry:
             return True
         return self.profile.get('ffi', False)
 
+    @property
+    def empty_config(self) -> KInner:
+        return cached_empty_config(self.kompiled, lambda: self.kevm.definition)
+
     @cached_property
     def kevm(self) -> KEVM:
         use_directory = self.out / 'tmp'
@@ -555,21 +594,9 @@ class Foundry:
         )
 
     @cached_property
-    def contracts(self) -> dict[str, Contract]:
+    def contracts(self) -> ContractIndex:
         lint_dir = self.out / 'lint'
 
-        def find_enums(dct: dict) -> None:
-            if dct['nodeType'] == 'EnumDefinition':
-                enum_name = dct['canonicalName']
-                enum_max = len(dct['members'])
-                if enum_name in self.enums and enum_max != self.enums[enum_name]:
-                    raise ValueError(
-                        f'enum name conflict: {enum_name} exists more than once in the codebase with a different size, which is not supported with --enum-constraints.'
-                    )
-                self.enums[enum_name] = enum_max
-            for node in dct.get('nodes', []):
-                find_enums(node)
-
         # Exclude .metadata.json files and forge lint artifacts (out/lint/**) which lack 'ast'.
         json_paths = sorted(
             path
@@ -577,55 +604,36 @@ class Foundry:
             if not path.name.endswith('.metadata.json') and not path.is_relative_to(lint_dir)
         )
         _LOGGER.info(f'Processing contract files: {json_paths}')
-        _contracts: dict[str, Contract] = {}
-
-        for json_path in json_paths:
-            _LOGGER.debug(f'Processing contract file: {json_path}')
-            contract_name = json_path.stem
-            contract_json = json.loads(json_path.read_text())
-            if self.add_enum_constraints:
-                find_enums(contract_json['ast'])
-            try:
-                contract = Contract(contract_name, contract_json, foundry=True)
-            except (KeyError, TypeError, ValueError):
-                _LOGGER.warning(f'Skipping non-compatible JSON file for contract: {contract_name} at {json_path}.')
-                continue
+        return ContractIndex(self.out, json_paths)
 
-            _contracts[contract.name_with_path] = contract  # noqa: B909
-
-        return _contracts
+    @cached_property
+    def enums(self) -> dict[str, int]:
+        return self.contracts.enums() if self.add_enum_constraints else {}
 
     def mk_proofs_dir(self, reinit: bool = False, remove_existing_proofs: bool = False) -> None:
         if remove_existing_proofs and self.proofs_dir.exists():
             self.remove_old_proofs(reinit)
         self.proofs_dir.mkdir(exist_ok=True)
 
+    @cached_property
+    def _bytecode_index(self) -> BytecodeIndex:
+        return BytecodeIndex.from_keys(self.contracts.bytecode_keys())
+
     def contract_name_from_bytecode(self, bytecode: bytes) -> str | None:
-        return _contract_name_from_bytecode(
-            bytecode,
-            {
-                contract_name: (contract_obj.deployed_bytecode, contract_obj.immutable_ranges, contract_obj.link_ranges)
-                for (contract_name, contract_obj) in self.contracts.items()
-            },
-        )
+        return self._bytecode_index.contract_name(bytecode)
 
     @cached_property
     def digest(self) -> str:
-        contract_digests = [self.contracts[c].digest for c in sorted(self.contracts)]
+        contract_digests = [self.contracts.digest(c) for c in sorted(self.contracts)]
         return hash_str('\n'.join(contract_digests))
 
     def up_to_date(self) -> bool:
-        if not self.digest_file.exists():
+        if not self.digests.exists():
             return False
-        digest_dict = _read_digest_file(self.digest_file)
-        return digest_dict.get('foundry', '') == self.digest
+        return self.digests.get('foundry') == self.digest
 
     def update_digest(self) -> None:
-        digest_dict = _read_digest_file(self.digest_file)
-        digest_dict['foundry'] = self.digest
-        self.digest_file.write_text(json.dumps(digest_dict, indent=4))
-
-        _LOGGER.info(f'Updated Foundry digest file: {self.digest_file}')
+        self.digests.set('foundry', self.digest)
 
     def build(self, metadata: bool) -> None:
         forge_build_args = [
@@ -671,21 +679,22 @@ class Foundry:
     def all_tests(self) -> list[str]:
         test_dir = os.path.join(self.profile.get('test', 'test'), '')
         return [
-            f'{contract.name_with_path}.{method.signature}'
-            for contract in self.contracts.values()
-            if contract.contract_path.startswith(test_dir)
-            for method in contract.methods
-            if method.is_test
+            f'{contract_name}.{signature}'
+            for contract_name in self.contracts
+            if (self.contracts.info(contract_name).contract_path or '').startswith(test_dir)
+            for signature in self.contracts.info(contract_name).test_signatures
         ]
 
     @cached_property
     def all_non_tests(self) -> list[str]:
+        all_tests = set(self.all_tests)
+        # Every contract has a constructor, an empty one if its ABI declares none
         return [
-            f'{contract.name_with_path}.{method.signature}'
-            for contract in self.contracts.values()
-            for method in contract.methods
-            if f'{contract.name_with_path}.{method.signature}' not in self.all_tests
-        ] + [f'{contract.name_with_path}.init' for contract in self.contracts.values() if contract.constructor]
+            f'{contract_name}.{signature}'
+            for contract_name in self.contracts
+            for signature in self.contracts.info(contract_name).signatures
+            if f'{contract_name}.{signature}' not in all_tests
+        ] + [f'{contract_name}.init' for contract_name in self.contracts]
 
     @staticmethod
     def _escape_brackets(regs: list[str]) -> list[str]:
@@ -881,6 +890,10 @@ class Foundry:
             raise ValueError('Specified proof is not an APRProof.')
         return proof
 
+    def get_proof_index(self, test_id: str) -> ProofIndex:
+        """Return a view of a proof on disk that reads its nodes on demand, without loading the whole KCFG."""
+        return ProofIndex(self.proofs_dir, test_id)
+
     def get_optional_proof(self, test_id: str) -> Proof | None:
         if Proof.proof_data_exists(test_id, self.proofs_dir):
             return Proof.read_proof_data(self.proofs_dir, test_id)
@@ -908,11 +921,11 @@ class Foundry:
         _, method = self.get_contract_and_method(test)
         effective_test_version = 0 if test_version is None else self.free_proof_version(test)
 
-        if not method.up_to_date(self.digest_file):
+        if not method.up_to_date(self.digests):
             _LOGGER.info(f'Creating a new version of {test} because it was updated.')
             return self.free_proof_version(test)
 
-        if not kontrol_up_to_date(self.digest_file):
+        if not kontrol_up_to_date(self.digests):
             _LOGGER.warning(
                 'Kontrol version is different than the one used to generate the current definition. Consider running `kontrol build` to update the definition.'
             )
@@ -955,12 +968,12 @@ class Foundry:
             _LOGGER.info(f'Creating a new version of test {test} because --reinit was specified.')
             return self.free_proof_version(test)
 
-        if not kontrol_up_to_date(self.digest_file):
+        if not kontrol_up_to_date(self.digests):
             _LOGGER.warning(
                 'Kontrol version is different than the one used to generate the current definition. Consider running `kontrol build` to update the definition.'
             )
 
-        method_status = method.up_to_date(self.digest_file)
+        method_status = method.up_to_date(self.digests)
 
         if user_specified_version:
             _LOGGER.info(f'Using user-specified version {user_specified_version} for test {test}')
@@ -986,7 +999,7 @@ class Foundry:
             _LOGGER.info(
                 f'Using the the latest version {version} of test {test} because it is up to date and no version was specified.'
             )
-            if type(method) is Contract.Method and not method.contract_up_to_date(self.digest_file):
+            if type(method) is Contract.Method and not method.contract_up_to_date(self.digests):
                 _LOGGER.warning(
                     f'Test {test} was not reinitialized because it is up to date, but the contract it is a part of has changed.'
                 )
@@ -1022,8 +1035,7 @@ class Foundry:
         if force_remove or any(
             # We need to check only the methods that get written to the digest file
             # Otherwise we'd get vacuous positives
-            (method.is_test or method.is_testfail or method.is_setup)
-            and not method.contract_up_to_date(Path(self.digest_file))
+            (method.is_test or method.is_testfail or method.is_setup) and not method.contract_up_to_date(self.digests)
             for contract in self.contracts.values()
             for method in contract.methods
         ):
@@ -1038,29 +1050,42 @@ class Foundry:
 
 
 def foundry_list(foundry: Foundry) -> list[str]:
+    lines: list[str] = []
+    for summary in foundry_list_summaries(foundry):
+        lines.extend(summary.lines)
+        lines.append('')
+    if len(lines) > 0:
+        lines = lines[0:-1]
+
+    return lines
+
+
+def foundry_list_summaries(foundry: Foundry) -> list[ProofSummary]:
+    """Return the summaries of the proofs on disk, read from the proof summary index where it is up to date."""
     all_methods = [
-        f'{contract.name_with_path}.{method.signature}'
-        for contract in foundry.contracts.values()
-        for method in contract.methods
+        f'{contract_name}.{signature}'
+        for contract_name in foundry.contracts
+        for signature in foundry.contracts.info(contract_name).signatures
     ]
 
-    lines: list[str] = []
+    summaries: list[ProofSummary] = []
+    summary_index = ProofSummaryIndex(foundry.proofs_dir)
     proof_ids = listdir(foundry.proofs_dir) if foundry.proofs_dir.exists() else []
     for method in sorted(all_methods):
         for test_id in proof_ids:
             test, *_ = test_id.split(':')
             if test == method:
-                proof = foundry.get_optional_proof(test_id)
-                if proof is not None:
-                    lines.extend(proof.summary.lines)
-                    lines.append('')
-    if len(lines) > 0:
-        lines = lines[0:-1]
-
-    return lines
+                summary = summary_index.get(test_id)
+                if summary is None:
+                    proof = foundry.get_optional_proof(test_id)
+                    if proof is None:
+                        continue
+                    summary = ProofSummary.from_proof(proof)
+                summaries.append(summary)
+    return summaries
 
 
-def foundry_to_xml(foundry: Foundry, proofs: list[APRProof], report_name: str) -> None:
+def foundry_to_xml(foundry: Foundry, proofs: Sequence[APRProof | ProofResult], report_name: str) -> None:
     testsuites = Et.Element(
         'testsuites', tests='0', failures='0', errors='0', time='0', timestamp=str(datetime.datetime.now())
     )
@@ -1356,10 +1381,15 @@ def foundry_get_model(
     options: GetModelOptions,
 ) -> str:
     test_id = foundry.get_test_id(options.test, options.version)
-    proof = foundry.get_apr_proof(test_id)
 
+    # Only the requested nodes are read from disk, the whole KCFG is needed to find pending and failing nodes
+    get_node: Callable[[NodeIdLike], KCFG.Node]
     nodes: Iterable[NodeIdLike] = options.nodes
-    if not options.nodes:
+    if options.nodes:
+        get_node = foundry.get_proof_index(test_id).node
+    else:
+        proof = foundry.get_apr_proof(test_id)
+        get_node = proof.kcfg.node
         _LOGGER.warning('Node ID is not provided. Displaying models of failing and pending nodes:')
         nodes = [node.id for node in proof.pending] + [node.id for node in proof.failing]
     nodes = unique(nodes)
@@ -1375,7 +1405,7 @@ def foundry_get_model(
     with legacy_explore(
         foundry.kevm,
         kcfg_semantics=KontrolSemantics(),
-        id=proof.id,
+        id=test_id,
         bug_report=options.bug_report,
         kore_rpc_command=kore_rpc_command,
         llvm_definition_dir=foundry.llvm_library if options.use_booster else None,
@@ -1394,8 +1424,7 @@ def foundry_get_model(
         for node_id in nodes:
             res_lines.append('')
             res_lines.append(f'Node id: {node_id}')
-            node = proof.kcfg.node(node_id)
-            res_lines.extend(print_model(node, kcfg_explore))
+            res_lines.extend(print_model(get_node(node_id), kcfg_explore))
 
     return '\n'.join(res_lines)
 
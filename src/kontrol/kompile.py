@@ -4,36 +4,40 @@ import json
 import logging
 import os
 import shutil
+import signal
 import stat
+from contextlib import contextmanager
 from pathlib import Path
 from typing import TYPE_CHECKING
 
 from kevm_pyk.kevm import KEVM
 from kevm_pyk.kompile import kevm_kompile
+from multiprocess import Process  # type: ignore
 from pyk.kast.outer import KDefinition, KFlatModule, KImport, KRequire
+from pyk.kbuild.utils import k_version
 from pyk.kdist import kdist
 from pyk.utils import ensure_dir_path, hash_str, unique
 
 from . import VERSION
 from .kdist.utils import KSRC_DIR
-from .utils import _read_digest_file, _rv_blue, console, kontrol_up_to_date
+from .utils import _rv_blue, console, file_lock, kontrol_up_to_date
 
 if TYPE_CHECKING:
-    from collections.abc import Iterable
-    from typing import Final
+    from collections.abc import Callable, Iterable, Iterator
+    from typing import Any, Final
 
     from .foundry import Foundry
     from .options import BuildOptions
 
 _LOGGER: Final = logging.getLogger(__name__)
 
+KOMPILED_VARIANT_FILE: Final = 'kontrol-variant.json'
+
 
 def foundry_kompile(
     options: BuildOptions,
     foundry: Foundry,
 ) -> None:
-    foundry_requires_dir = foundry.kompiled / 'requires'
-    kompiled_timestamp = foundry.kompiled / 'timestamp'
     main_module = 'KONTROL-MAIN'
     base_definition = 'KONTROL-BASE'
     if options.keccak_lemmas and not options.auxiliary_lemmas:
@@ -45,23 +49,9 @@ def foundry_kompile(
     includes = [Path(include) for include in options.includes if Path(include).exists()] + [KSRC_DIR]
     requires_paths: dict[str, str] = {}
 
-    if options.forge_build:
-        foundry.build(options.metadata)
-
     if options.silence_warnings:
         options.ignore_warnings = _silenced_warnings()
 
-    ensure_dir_path(foundry.kompiled)
-    ensure_dir_path(foundry_requires_dir)
-
-    regen = options.regen
-    foundry_up_to_date = True
-
-    if not foundry.up_to_date():
-        _LOGGER.info('Detected updates to contracts.')
-        regen = True
-        foundry_up_to_date = False
-
     options.requires = [str(foundry._root / r) for r in options.requires]
     for r in options.requires:
         req = Path(r)
@@ -72,109 +62,319 @@ def foundry_kompile(
                 f'Required K files have conflicting names: {r} and {requires_paths[req.name]}. Consider changing the name of one of these files.'
             )
         requires_paths[req.name] = str(r)
-        req_path = foundry_requires_dir / req.name
-        if regen or not req_path.exists():
-            _LOGGER.info(f'Copying requires path: {req} -> {req_path}')
-            shutil.copy(req, req_path)
-            # If the copied file is not writeable
-            if not os.access(req_path, os.W_OK):
-                # Fetch current permissions
-                current_permissions = req_path.stat().st_mode
-                # Grant write permissions
-                req_path.chmod(current_permissions | stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH)
-            regen = True
-
-    _imports: dict[str, list[str]] = {contract.name_with_path: [] for contract in foundry.contracts.values()}
+
+    # Only the module names go into the definition, the contract names are checked once the contracts are built
+    module_imports: list[tuple[str, str]] = []
     for i in options.imports:
         imp = i.split(':')
-        full_import_name = foundry.lookup_full_contract_name(imp[0])
         if not len(imp) == 2:
             raise ValueError(f'module imports must be of the form "[ContractName]:[MODULE-NAME]". Got: {i}')
-        if full_import_name in _imports:
-            _imports[full_import_name].append(imp[1])
-        else:
-            raise ValueError(f'Could not find contract: {full_import_name}')
+        module_imports.append((imp[0], imp[1]))
+    flattened_imports = list(unique(module for _, module in module_imports))
+
+    optimization = 0
+    if options.o1:
+        optimization = 1
+    if options.o2:
+        optimization = 2
+    if options.o3:
+        optimization = 3
+
+    variant = _kompiled_variant(
+        base_definition=base_definition,
+        imports=flattened_imports,
+        requires_paths=requires_paths,
+        includes=includes,
+        options=options,
+        optimization=optimization,
+    )
+    variant_dir = foundry.kompiled_variants / hash_str(json.dumps(variant, sort_keys=True))
+    variant_marker = variant_dir / KOMPILED_VARIANT_FILE
+    main_file = variant_dir / foundry.main_file.name
+    foundry_requires_dir = variant_dir / 'requires'
 
-    if regen or not foundry.main_file.exists():
-        if regen and foundry_up_to_date:
-            console.print(
-                f'[{_rv_blue()}][bold]--regen[/bold] option provided. Rebuilding Kontrol Project.[/{_rv_blue()}]'
-            )
+    def main_file_text() -> str:
+        return _main_file_text(main_module, base_definition, requires_paths, flattened_imports, options) + '\n'
 
-        copied_requires = []
-        copied_requires += [f'requires/{name}' for name in list(requires_paths.keys())]
-        flattened_imports = list(unique([imp for module_imports in _imports.values() for imp in module_imports]))
-        contract_main_definition = _foundry_to_main_def(
-            main_module=main_module,
-            base_definition=base_definition,
-            requires=(['kontrol.md'] + copied_requires),
-            imports=flattened_imports,
-            keccak_lemmas=options.keccak_lemmas,
-            auxiliary_lemmas=options.auxiliary_lemmas,
-        )
-
-        kevm = KEVM(kdist.get('kontrol.base'))
-        foundry.main_file.write_text(kevm.pretty_print(contract_main_definition) + '\n')
-        _LOGGER.info(f'Wrote file: {foundry.main_file}')
+    def options_digest() -> str:
+        return hash_str(str(options))
 
     def kompilation_digest() -> str:
-        k_files = list(options.requires) + [foundry.main_file]
+        k_files = list(options.requires) + [main_file]
         return hash_str(''.join([hash_str(Path(k_file).read_text()) for k_file in k_files]))
 
-    def options_digest() -> str:
-        return hash_str(str(options))
+    def update_kompilation_digest() -> None:
+        foundry.digests.set('kompilation', kompilation_digest())
+        foundry.digests.set('kontrol', VERSION)
+        foundry.digests.set('build-options', options_digest())
+
+        _LOGGER.info('Updated Kompilation digest')
+
+    def build_contracts() -> bool:
+        """Build the contracts and check the module imports against them, returning whether they were up to date."""
+        if options.forge_build:
+            foundry.build(options.metadata)
+
+        for contract_name, _ in module_imports:
+            full_import_name = foundry.lookup_full_contract_name(contract_name)
+            if full_import_name not in foundry.contracts:
+                raise ValueError(f'Could not find contract: {full_import_name}')
 
-    def kompilation_up_to_date() -> bool:
-        if not foundry.digest_file.exists():
+        if not foundry.up_to_date():
+            _LOGGER.info('Detected updates to contracts.')
             return False
-        digest_dict = _read_digest_file(foundry.digest_file)
-        komp_digest = digest_dict.get('kompilation', '') == kompilation_digest()
-        opt_digest = digest_dict.get('build-options', '') == options_digest()
-        return komp_digest and opt_digest
+        return True
+
+    def write_sources(regen: bool, foundry_up_to_date: bool) -> None:
+        ensure_dir_path(foundry_requires_dir)
+        for name, r in requires_paths.items():
+            req = Path(r)
+            req_path = foundry_requires_dir / name
+            if regen or not req_path.exists():
+                _LOGGER.info(f'Copying requires path: {req} -> {req_path}')
+                req_path.unlink(missing_ok=True)
+                shutil.copy(req, req_path)
+                # If the copied file is not writeable
+                if not os.access(req_path, os.W_OK):
+                    # Fetch current permissions
+                    current_permissions = req_path.stat().st_mode
+                    # Grant write permissions
+                    req_path.chmod(current_permissions | stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH)
+                regen = True
+
+        if regen or not main_file.exists():
+            if regen and foundry_up_to_date:
+                console.print(
+                    f'[{_rv_blue()}][bold]--regen[/bold] option provided. Rebuilding Kontrol Project.[/{_rv_blue()}]'
+                )
+
+            main_file.unlink(missing_ok=True)
+            main_file.write_text(main_file_text())
+            _LOGGER.info(f'Wrote file: {main_file}')
+
+    if options.rekompile and variant_dir.exists():
+        # The files of a variant may be hard links into the kompiled cache, which kompiling in place would overwrite
+        shutil.rmtree(variant_dir)
+
+    with _kompiled_cache_entry(options.kompiled_cache, variant) as cache_entry:
+        if not variant_marker.exists() and not options.rekompile:
+            _adopt_legacy_kompiled(foundry, variant_dir, variant, requires_paths, main_file_text, options_digest())
+            if cache_entry is not None and not variant_marker.exists():
+                _fetch_kompiled(cache_entry, variant_dir)
+
+        # Variants are keyed by everything kevm_kompile reads, so an existing one only needs rekompiling on request
+        if options.rekompile or not variant_marker.exists():
+            write_sources(regen=True, foundry_up_to_date=False)
+            # The definition does not depend on the contracts, so they are built while it is kompiled
+            kompilation = _start_in_session(
+                kevm_kompile,
+                target=options.target,
+                output_dir=variant_dir,
+                main_file=main_file,
+                main_module=main_module,
+                syntax_module=options.syntax_module,
+                includes=includes,
+                emit_json=True,
+                ccopts=options.ccopts,
+                debug=options.debug,
+                verbose=options.verbose,
+                ignore_warnings=options.ignore_warnings,
+                optimization=optimization,
+            )
+            try:
+                build_contracts()
+                _join_session(kompilation, f'Kompilation of {main_file}')
+            except BaseException:
+                _cancel_session(kompilation)
+                raise
+            variant_marker.write_text(json.dumps(variant, indent=4))
+        else:
+            _LOGGER.info(f'Reusing kompiled definition: {variant_dir}')
+            foundry_up_to_date = build_contracts()
+            write_sources(regen=options.regen or not foundry_up_to_date, foundry_up_to_date=foundry_up_to_date)
 
-    def update_kompilation_digest() -> None:
-        digest_dict = _read_digest_file(foundry.digest_file)
-        digest_dict['kompilation'] = kompilation_digest()
-        digest_dict['kontrol'] = VERSION
-        digest_dict['build-options'] = options_digest()
-        foundry.digest_file.write_text(json.dumps(digest_dict, indent=4))
+        if cache_entry is not None:
+            _publish_kompiled(variant_dir, cache_entry)
 
-        _LOGGER.info('Updated Kompilation digest')
+    _activate_kompiled_variant(foundry, variant_dir)
+
+    with foundry.digests.batch():
+        update_kompilation_digest()
+        foundry.update_digest()
 
-    def should_rekompile() -> bool:
-        if options.rekompile or not kompiled_timestamp.exists():
-            return True
-
-        return not (kompilation_up_to_date() and kontrol_up_to_date(foundry.digest_file))
-
-    if should_rekompile():
-        output_dir = foundry.kompiled
-
-        optimization = 0
-        if options.o1:
-            optimization = 1
-        if options.o2:
-            optimization = 2
-        if options.o3:
-            optimization = 3
-
-        kevm_kompile(
-            target=options.target,
-            output_dir=output_dir,
-            main_file=foundry.main_file,
-            main_module=main_module,
-            syntax_module=options.syntax_module,
-            includes=includes,
-            emit_json=True,
-            ccopts=options.ccopts,
-            debug=options.debug,
-            verbose=options.verbose,
-            ignore_warnings=options.ignore_warnings,
-            optimization=optimization,
-        )
-
-    update_kompilation_digest()
-    foundry.update_digest()
+
+def _start_in_session(func: Callable[..., Any], /, **kwargs: Any) -> Process:
+    """Run `func(**kwargs)` in a new process that leads its own session.
+
+    Cancelling the session with `_cancel_session` then also stops the processes it started, such as the K compilers.
+    """
+
+    def run() -> None:
+        os.setsid()
+        func(**kwargs)
+
+    process = Process(target=run)
+    process.start()
+    return process
+
+
+def _join_session(process: Process, description: str) -> None:
+    process.join()
+    if process.exitcode != 0:
+        raise RuntimeError(f'{description} failed with exit code {process.exitcode}, see the log above for details.')
+
+
+def _cancel_session(process: Process) -> None:
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+    except ProcessLookupError:
+        # The process has not started its session yet, or it has ended along with everything it started
+        process.terminate()
+    process.join()
+
+
+def _kompiled_variant(
+    base_definition: str,
+    imports: list[str],
+    requires_paths: dict[str, str],
+    includes: list[Path],
+    options: BuildOptions,
+    optimization: int,
+) -> dict[str, Any]:
+    """The inputs of `kevm_kompile` that determine a kompiled definition, which key the kompiled variants."""
+    return {
+        'kontrol': VERSION,
+        'base-definition': base_definition,
+        'imports': imports,
+        'requires': {name: hash_str(Path(path).read_text()) for name, path in requires_paths.items()},
+        'includes': [str(include) for include in includes],
+        'target': str(options.target),
+        'syntax-module': options.syntax_module,
+        'ccopts': options.ccopts,
+        'debug': options.debug,
+        'ignore-warnings': options.ignore_warnings,
+        'optimization': optimization,
+    }
+
+
+def _main_file_text(
+    main_module: str,
+    base_definition: str,
+    requires_paths: dict[str, str],
+    imports: list[str],
+    options: BuildOptions,
+) -> str:
+    copied_requires = [f'requires/{name}' for name in list(requires_paths.keys())]
+    contract_main_definition = _foundry_to_main_def(
+        main_module=main_module,
+        base_definition=base_definition,
+        requires=(['kontrol.md'] + copied_requires),
+        imports=imports,
+        keccak_lemmas=options.keccak_lemmas,
+        auxiliary_lemmas=options.auxiliary_lemmas,
+    )
+    kevm = KEVM(kdist.get('kontrol.base'))
+    return kevm.pretty_print(contract_main_definition)
+
+
+def _adopt_legacy_kompiled(
+    foundry: Foundry,
+    variant_dir: Path,
+    variant: dict[str, Any],
+    requires_paths: dict[str, str],
+    main_file_text: Callable[[], str],
+    options_digest: str,
+) -> None:
+    """Move a definition that an earlier version kompiled into `kompiled` to `variant_dir`, if it is that variant.
+
+    This is the case when it was kompiled by the current Kontrol version with the current build options, and its
+    copies of the main file and of the requires match the current ones.
+    """
+    legacy_dir = foundry.kompiled
+    if legacy_dir.is_symlink() or not (legacy_dir / 'timestamp').exists() or variant_dir.exists():
+        return
+    if not kontrol_up_to_date(foundry.digests) or foundry.digests.get('build-options') != options_digest:
+        return
+    legacy_requires = {path.name: path for path in (legacy_dir / 'requires').glob('*')}
+    if legacy_requires.keys() != requires_paths.keys() or any(
+        legacy_requires[name].read_text() != Path(path).read_text() for name, path in requires_paths.items()
+    ):
+        return
+    legacy_main_file = legacy_dir / foundry.main_file.name
+    if not legacy_main_file.exists() or legacy_main_file.read_text() != main_file_text():
+        return
+    _LOGGER.info(f'Moving kompiled definition into the variant store: {legacy_dir} -> {variant_dir}')
+    ensure_dir_path(variant_dir.parent)
+    os.replace(legacy_dir, variant_dir)
+    (variant_dir / KOMPILED_VARIANT_FILE).write_text(json.dumps(variant, indent=4))
+
+
+@contextmanager
+def _kompiled_cache_entry(kompiled_cache: Path | None, variant: dict[str, Any]) -> Iterator[Path | None]:
+    """Yield the entry for `variant` in the shared `kompiled_cache` while holding its lock, or `None` without a cache.
+
+    Entries are keyed by the variant and the K version. Holding the lock while kompiling makes concurrent builds of
+    the same variant, from any project, wait for the first one to publish it instead of kompiling it again.
+    """
+    if kompiled_cache is None:
+        yield None
+        return
+    key = hash_str(json.dumps({**variant, 'k': k_version().text}, sort_keys=True))
+    ensure_dir_path(kompiled_cache)
+    with file_lock(kompiled_cache / f'{key}.lock'):
+        yield kompiled_cache / key
+
+
+def _link_tree(src: Path, dst: Path) -> None:
+    """Copy the directory `src` to `dst`, hard linking the files where the file system allows it."""
+
+    def link_or_copy(src_file: str, dst_file: str) -> None:
+        try:
+            os.link(src_file, dst_file)
+        except OSError:
+            shutil.copy2(src_file, dst_file)
+
+    shutil.copytree(src, dst, symlinks=True, copy_function=link_or_copy)
+
+
+def _fetch_kompiled(cache_entry: Path, variant_dir: Path) -> None:
+    if not (cache_entry / KOMPILED_VARIANT_FILE).exists():
+        return
+    _LOGGER.info(f'Reusing kompiled definition from cache: {cache_entry}')
+    if variant_dir.exists():
+        shutil.rmtree(variant_dir)
+    tmp_dir = variant_dir.with_name(f'{variant_dir.name}.{os.getpid()}.tmp')
+    _link_tree(cache_entry, tmp_dir)
+    os.replace(tmp_dir, variant_dir)
+
+
+def _publish_kompiled(variant_dir: Path, cache_entry: Path) -> None:
+    """Add a kompiled variant to the cache, renamed into place once complete so that it is never seen partially."""
+    if (cache_entry / KOMPILED_VARIANT_FILE).exists():
+        return
+    tmp_dir = cache_entry.with_name(f'{cache_entry.name}.{os.getpid()}.tmp')
+    try:
+        _link_tree(variant_dir, tmp_dir)
+        os.replace(tmp_dir, cache_entry)
+        _LOGGER.info(f'Added kompiled definition to cache: {cache_entry}')
+    except OSError as err:
+        _LOGGER.warning(f'Could not add kompiled definition to cache {cache_entry}: {err}')
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def _activate_kompiled_variant(foundry: Foundry, variant_dir: Path) -> None:
+    """Point the `kompiled` directory of the project at `variant_dir`, replacing the link atomically."""
+    link = foundry.kompiled
+    target = os.path.relpath(variant_dir, link.parent)
+    if link.is_symlink() and os.readlink(link) == target:
+        return
+    if link.exists() and not link.is_symlink():
+        shutil.rmtree(link)
+    tmp_link = link.with_name(f'{link.name}.{os.getpid()}.tmp')
+    tmp_link.unlink(missing_ok=True)
+    tmp_link.symlink_to(target, target_is_directory=True)
+    os.replace(tmp_link, link)
+    _LOGGER.info(f'Activated kompiled definition: {variant_dir}')
 
 
 def _foundry_to_main_def(
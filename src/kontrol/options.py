@@ -206,6 +206,14 @@ class KompileTargetOptions(Options):
 
 
 class ListOptions(LoggingOptions, KOptions, FoundryOptions):
+    json: bool
+
+    @staticmethod
+    def default() -> dict[str, Any]:
+        return {
+            'json': False,
+        }
+
     @staticmethod
     def from_option_string() -> dict[str, str]:
         return FoundryOptions.from_option_string() | LoggingOptions.from_option_string() | KOptions.from_option_string()
@@ -351,6 +359,10 @@ class ProveOptions(
     symbolic_caller: bool
     generate_counterexample: bool
     step_timeout: int | None
+    reuse_server: bool
+    longest_first: bool
+    coordinator: str | None
+    authkey: str | None
 
     def __init__(self, args: dict[str, Any]) -> None:
         super().__init__(args)
@@ -385,6 +397,10 @@ class ProveOptions(
             'symbolic_caller': False,
             'generate_counterexample': False,
             'step_timeout': None,
+            'reuse_server': False,
+            'longest_first': False,
+            'coordinator': None,
+            'authkey': None,
         }
 
     @staticmethod
@@ -749,6 +765,33 @@ class VersionOptions(LoggingOptions):
         return LoggingOptions.get_argument_type()
 
 
+class WorkerOptions(LoggingOptions, ParallelOptions, FoundryOptions):
+    connect: str
+    authkey: str | None
+
+    @staticmethod
+    def default() -> dict[str, Any]:
+        return {
+            'authkey': None,
+        }
+
+    @staticmethod
+    def from_option_string() -> dict[str, str]:
+        return (
+            LoggingOptions.from_option_string()
+            | ParallelOptions.from_option_string()
+            | FoundryOptions.from_option_string()
+        )
+
+    @staticmethod
+    def get_argument_type() -> dict[str, Callable]:
+        return (
+            LoggingOptions.get_argument_type()
+            | ParallelOptions.get_argument_type()
+            | FoundryOptions.get_argument_type()
+        )
+
+
 class ViewKcfgOptions(FoundryTestOptions, LoggingOptions, FoundryOptions):
 
     use_hex_encoding: bool
@@ -825,6 +868,7 @@ class BuildOptions(LoggingOptions, KOptions, KompileOptions, FoundryOptions, Kom
     auxiliary_lemmas: bool
     requires: list[str]
     imports: list[str]
+    kompiled_cache: Path | None
 
     @staticmethod
     def default() -> dict[str, Any]:
@@ -839,6 +883,7 @@ class BuildOptions(LoggingOptions, KOptions, KompileOptions, FoundryOptions, Kom
             'auxiliary_lemmas': False,
             'requires': [],
             'imports': [],
+            'kompiled_cache': None,
         }
 
     @staticmethod
@@ -852,6 +897,7 @@ class BuildOptions(LoggingOptions, KOptions, KompileOptions, FoundryOptions, Kom
             | {
                 'require': 'requires',
                 'module-import': 'imports',
+                'kompiled-cache': 'kompiled_cache',
             }
         )
 
@@ -866,6 +912,7 @@ class BuildOptions(LoggingOptions, KOptions, KompileOptions, FoundryOptions, Kom
             | {
                 'require': list_of(str),
                 'module-import': list_of(str),
+                'kompiled-cache': ensure_dir_path,
             }
         )
 
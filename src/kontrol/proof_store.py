@@ -0,0 +1,171 @@
+"""
+Fast access to proofs stored on disk.
+
+`APRProof.read_proof_data` rebuilds the whole KCFG of a proof, which for large proofs means parsing tens of
+thousands of node files. The proof directory already stores each node in its own `kcfg/nodes/<id>.json` file,
+next to a `kcfg/kcfg.json` file with the structure of the KCFG and a `proof.json` file with the proof metadata.
+A `ProofIndex` reads only these two small files, and parses node files on demand.
+
+The `ProofSummaryIndex` keeps the summaries shown by `kontrol list` in a single file, so that listing proofs does
+not need to read them at all.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from functools import cached_property
+from typing import TYPE_CHECKING, NamedTuple
+
+from pyk.kcfg import KCFG
+from pyk.proof.reachability import APRProof
+
+from .utils import locked_json_update
+
+if TYPE_CHECKING:
+    from pathlib import Path
+    from typing import Any, Final
+
+    from pyk.kcfg.kcfg import NodeIdLike
+    from pyk.proof.proof import Proof
+
+_LOGGER: Final = logging.getLogger(__name__)
+
+SUMMARY_INDEX_FILE: Final = '.summaries.json'
+
+
+class ProofIndex:
+    proof_id: str
+    _proof_dir: Path
+    _nodes: dict[int, KCFG.Node]
+
+    def __init__(self, proofs_dir: Path, proof_id: str) -> None:
+        self.proof_id = proof_id
+        self._proof_dir = proofs_dir / proof_id
+        self._nodes = {}
+        if not (self._proof_dir / 'proof.json').is_file() or not (self._proof_dir / 'kcfg' / 'kcfg.json').is_file():
+            raise ValueError(f'Could not find proof data for {proof_id} in {proofs_dir}')
+
+    @cached_property
+    def structure(self) -> dict[str, Any]:
+        """The contents of `kcfg/kcfg.json`: the node ids, edges, covers, splits and aliases of the KCFG."""
+        return json.loads((self._proof_dir / 'kcfg' / 'kcfg.json').read_text())
+
+    def resolve(self, node_id: NodeIdLike) -> int:
+        """Return the numeric id of a node given by id or by `@alias`, as `KCFG` does."""
+        if isinstance(node_id, int):
+            return node_id
+        if node_id.startswith('@'):
+            aliases = self.structure.get('aliases', {})
+            if node_id[1:] not in aliases:
+                raise ValueError(f'Unknown alias {node_id} in proof {self.proof_id}')
+            return int(aliases[node_id[1:]])
+        try:
+            return int(node_id)
+        except ValueError:
+            raise ValueError(f'Unknown node {node_id} in proof {self.proof_id}') from None
+
+    def node(self, node_id: NodeIdLike) -> KCFG.Node:
+        """Read a single node of the KCFG from disk."""
+        resolved = self.resolve(node_id)
+        if resolved not in self._nodes:
+            node_file = self._proof_dir / 'kcfg' / 'nodes' / f'{resolved}.json'
+            if not node_file.is_file():
+                raise ValueError(f'Unknown node {node_id} in proof {self.proof_id}')
+            _LOGGER.debug(f'Reading node {resolved} of proof {self.proof_id}: {node_file}')
+            self._nodes[resolved] = KCFG.Node.from_dict(json.loads(node_file.read_text()))
+        return self._nodes[resolved]
+
+
+class ProofSummary(NamedTuple):
+    """The information about a proof shown by `kontrol list`, as recorded in the `ProofSummaryIndex`."""
+
+    id: str
+    status: str
+    nodes: int
+    pending: int
+    failing: int
+    exec_time: float
+    version: int | None
+    digest: str | None
+    lines: tuple[str, ...]
+
+    @staticmethod
+    def from_proof(proof: Proof, digest: str | None = None) -> ProofSummary:
+        """Summarize a proof. Proofs other than `APRProof`, such as refutations, have no KCFG or execution time."""
+        _, _, version = proof.id.rpartition(':')
+        summary = ProofSummary(
+            id=proof.id,
+            status=proof.status.value,
+            nodes=0,
+            pending=0,
+            failing=0,
+            exec_time=0.0,
+            version=int(version) if version.isdigit() else None,
+            digest=digest,
+            lines=tuple(proof.summary.lines),
+        )
+        if isinstance(proof, APRProof):
+            summary = summary._replace(
+                nodes=len(proof.kcfg.nodes),
+                pending=len(proof.pending),
+                failing=len(proof.failing),
+                exec_time=proof.exec_time,
+            )
+        return summary
+
+    @staticmethod
+    def from_dict(dct: dict[str, Any]) -> ProofSummary:
+        return ProofSummary(**{**dct, 'lines': tuple(dct['lines'])})
+
+    def to_dict(self) -> dict[str, Any]:
+        return {**self._asdict(), 'lines': list(self.lines)}
+
+
+class ProofSummaryIndex:
+    """Summaries of the proofs in a proofs directory, stored in its `.summaries.json` file.
+
+    Each entry records the modification time and size of the `proof.json` file it was computed from, and is only
+    returned while that file is unchanged, so that proofs written by other tools are never reported stale.
+    """
+
+    _proofs_dir: Path
+    _entries: dict[str, Any] | None
+
+    def __init__(self, proofs_dir: Path) -> None:
+        self._proofs_dir = proofs_dir
+        self._entries = None
+
+    @property
+    def index_file(self) -> Path:
+        return self._proofs_dir / SUMMARY_INDEX_FILE
+
+    def _stamp(self, proof_id: str) -> list[int] | None:
+        try:
+            stat = (self._proofs_dir / proof_id / 'proof.json').stat()
+        except FileNotFoundError:
+            return None
+        return [stat.st_mtime_ns, stat.st_size]
+
+    def get(self, proof_id: str) -> ProofSummary | None:
+        """Return the summary of a proof, or `None` if it is not indexed or the proof changed since."""
+        if self._entries is None:
+            try:
+                self._entries = json.loads(self.index_file.read_text())
+            except (FileNotFoundError, ValueError):
+                self._entries = {}
+        entry = self._entries.get(proof_id)
+        if entry is None or entry['stamp'] != self._stamp(proof_id):
+            return None
+        return ProofSummary.from_dict(entry['summary'])
+
+    def update(self, proof: Proof, digest: str | None = None) -> ProofSummary:
+        """Record the summary of a proof that was just written to disk."""
+        summary = ProofSummary.from_proof(proof, digest=digest)
+        entry = {'stamp': self._stamp(proof.id), 'summary': summary.to_dict()}
+
+        def add_entry(entries: dict[str, Any]) -> None:
+            entries[proof.id] = entry
+
+        self._entries = locked_json_update(self.index_file, add_entry)
+        return summary
@@ -1,12 +1,12 @@
 from __future__ import annotations
 
+import json
 import logging
-import sys
+import os
 import time
 from abc import abstractmethod
 from collections import Counter
-from copy import copy
-from functools import partial
+from queue import Queue
 from subprocess import CalledProcessError
 from typing import TYPE_CHECKING, Any, ContextManager, NamedTuple
 
@@ -14,19 +14,18 @@ from kevm_pyk.cli import EVMChainOptions
 from kevm_pyk.kevm import KEVM, _process_jumpdests
 from kevm_pyk.utils import KDefinition__expand_macros, abstract_cell_vars, run_prover
 from multiprocess.pool import Pool  # type: ignore
+from multiprocess.util import Finalize  # type: ignore
 from pyk.cterm import CTerm, CTermSymbolic
 from pyk.kast.inner import KApply, KSequence, KSort, KVariable, Subst
 from pyk.kast.manip import flatten_label, free_vars, set_cell
 from pyk.kast.prelude.bytes import bytesToken
 from pyk.kast.prelude.collections import list_empty, map_empty, map_item, set_empty
-from pyk.kast.prelude.k import GENERATED_TOP_CELL
 from pyk.kast.prelude.kbool import FALSE, boolToken, notBool
 from pyk.kast.prelude.kint import eqInt, intToken, leInt, ltInt
 from pyk.kast.prelude.ml import mlEqualsFalse, mlEqualsTrue
 from pyk.kast.prelude.utils import token
 from pyk.kcfg import KCFG, KCFGExplore
 from pyk.kcfg.minimize import KCFGMinimizer
-from pyk.kdist import kdist
 from pyk.kore.rpc import KoreClient, kore_server
 from pyk.proof import ProofStatus
 from pyk.proof.proof import Proof
@@ -35,26 +34,44 @@ from pyk.utils import hash_str, run_process_2, unique
 from rich.progress import Progress, SpinnerColumn, TaskID, TextColumn, TimeElapsedColumn
 
 from .counterexample_generation import generate_counterexample_test
+from .distributed import ProofCoordinator, parse_address, resolve_authkey, run_worker
 from .foundry import Foundry, KontrolSemantics, foundry_to_xml
 from .natspec import apply_natspec_preconditions
 from .options import ConfigType
+from .proof_store import ProofSummaryIndex
+from .scheduler import ProofDAG, predict_makespan
 from .solc_to_k import Contract, decode_kinner_output
 from .utils import console, parse_test_version_tuple, replace_k_words
 
 if TYPE_CHECKING:
-    from collections.abc import Iterable
-    from typing import Final
+    from collections.abc import Iterable, Mapping
+    from typing import Final, TypeVar
 
     from pyk.kast.inner import KInner
     from pyk.kore.rpc import KoreServer
 
-    from .options import ProveOptions
+    from .options import ProveOptions, WorkerOptions
     from .solc_to_k import StorageField
 
+    K = TypeVar('K')
+    V = TypeVar('V')
+
 _LOGGER: Final = logging.getLogger(__name__)
 
 
 def foundry_prove(options: ProveOptions, foundry: Foundry, init_accounts: Iterable[KInner] = ()) -> list[APRProof]:
+    """Run the selected proofs and load them, raising if a proof they depend on, such as setUp, did not pass."""
+    results = foundry_prove_results(options, foundry, init_accounts)
+    not_run = '; '.join(f'{result.id}: {result.error_info}' for result in results if result.skipped)
+    if not_run:
+        raise RuntimeError(f'Proofs were not run: {not_run}')
+    return [result.load_proof(foundry) for result in results]
+
+
+def foundry_prove_results(
+    options: ProveOptions, foundry: Foundry, init_accounts: Iterable[KInner] = ()
+) -> list[ProofResult]:
+    """Run the selected proofs and return a summary of each test proof, without loading the proofs from disk."""
     if options.workers <= 0:
         raise ValueError(f'Must have at least one worker, found: --workers {options.workers}')
     if options.max_iterations is not None and options.max_iterations < 0:
@@ -84,38 +101,19 @@ def foundry_prove(options: ProveOptions, foundry: Foundry, init_accounts: Iterab
         else []
     )
 
-    if options.cse:
-        exact_match = options.config_type == ConfigType.SUMMARY_CONFIG
-        return_empty = options.config_type == ConfigType.SUMMARY_CONFIG
-        test_suite = collect_tests(
-            foundry, options.tests, reinit=options.reinit, return_empty=return_empty, exact_match=exact_match
-        )
-        for test in test_suite:
-            if not isinstance(test.method, Contract.Method) or test.method.function_calls is None:
-                continue
-            if not test.contract.has_storage_layout:
-                raise RuntimeError(
-                    "Couldn't locate 'storageLayout' in the compiled solc output. Please add `extra_output = ['storageLayout']` to your foundry.toml file."
-                )
-
-            test_version_tuples = [
-                parse_test_version_tuple(t) for t in test.method.function_calls if t not in summary_ids
-            ]
-
-            if len(test_version_tuples) > 0:
-                _LOGGER.info(f'For test {test.name}, found external calls: {test_version_tuples}')
-                new_prove_options = copy(options)
-                new_prove_options.tests = test_version_tuples
-                new_prove_options.config_type = ConfigType.SUMMARY_CONFIG
-                summary_ids.extend(p.id for p in foundry_prove(new_prove_options, foundry, init_accounts))
-
     exact_match = options.config_type == ConfigType.SUMMARY_CONFIG
     test_suite = collect_tests(foundry, options.tests, reinit=options.reinit, exact_match=exact_match)
     test_names = [test.name for test in test_suite]
     separator = '\n\t\t    '  # ad-hoc separator for the string "Selected functions: " below
     console.print(f'[bold]Selected functions:[/bold] {separator.join(test_names)}')
 
-    contracts = [(test.contract, test.version) for test in test_suite]
+    summary_tests: list[FoundryTest] = []
+    callee_ids: dict[str, tuple[str, ...]] = {}
+    if options.cse:
+        summary_tests, callee_ids = collect_summary_tests(foundry, test_suite, reinit=options.reinit)
+        _LOGGER.info(f'Found external calls to summarize: {[test.name for test in summary_tests]}')
+
+    contracts = [(test.contract, test.version) for test in test_suite + summary_tests]
     setup_method_tests = collect_setup_methods(
         foundry, contracts, reinit=options.reinit, setup_version=options.setup_version
     )
@@ -123,69 +121,70 @@ def foundry_prove(options: ProveOptions, foundry: Foundry, init_accounts: Iterab
 
     _LOGGER.info(f'Running tests: {test_names}')
 
-    _LOGGER.info(f'Updating digests: {test_names}')
-    for test in test_suite:
-        test.method.update_digest(foundry.digest_file)
+    with foundry.digests.batch():
+        _LOGGER.info(f'Updating digests: {test_names}')
+        for test in test_suite + summary_tests:
+            test.method.update_digest(foundry.digests)
 
-    _LOGGER.info(f'Updating digests: {setup_method_names}')
-    for test in setup_method_tests:
-        test.method.update_digest(foundry.digest_file)
-
-    def _run_prover(_test_suite: list[FoundryTest], include_summaries: bool = False) -> list[APRProof]:
-        return _run_cfg_group(
-            tests=_test_suite,
-            foundry=foundry,
-            options=options,
-            summary_ids=(summary_ids if include_summaries else []),
-            init_accounts=init_accounts,
-        )
+        _LOGGER.info(f'Updating digests: {setup_method_names}')
+        for test in setup_method_tests:
+            test.method.update_digest(foundry.digests)
 
-    constructor_results: list[APRProof] = []
+    constructor_tests: list[FoundryTest] = []
     if options.run_constructor:
         constructor_tests = collect_constructors(foundry, contracts, reinit=options.reinit)
         constructor_names = [test.name for test in constructor_tests]
 
         _LOGGER.info(f'Updating digests: {constructor_names}')
-        for test in constructor_tests:
-            test.method.update_digest(foundry.digest_file)
+        with foundry.digests.batch():
+            for test in constructor_tests:
+                test.method.update_digest(foundry.digests)
 
         if options.verbose:
             _LOGGER.info(f'Running initialization code for contracts in parallel: {constructor_names}')
         else:
             console.print(f'[bold]Running initialization code for contracts in parallel:[/bold] {constructor_names}')
 
-        constructor_results = _run_prover(constructor_tests, include_summaries=False)
-        failed = [proof for proof in constructor_results if not proof.passed]
-        failed_contract_names = [proof.id.split('.')[0] for proof in failed]
-        if failed:
-            for proof in failed:
-                contract, _ = foundry.get_contract_and_method(proof.id.split(':')[0])
-                _interpret_proof_failure(proof, options.failure_info, contract.error_selectors)
-            sys.exit(
-                f'Running initialization code failed for {len(failed)} contracts: {", ".join(failed_contract_names)}'
-            )
-
     if options.verbose:
         _LOGGER.info(f'Running setup functions in parallel: {setup_method_names}')
+        _LOGGER.info(f'Running test functions in parallel: {test_names}')
     else:
         separator = '\n\t\t\t\t     '  # ad-hoc separator for the string "Running setup functions in parallel: " below
         console.print(f'[bold]Running setup functions in parallel:[/bold] {separator.join(setup_method_names)}')
-    setup_results = _run_prover(setup_method_tests, include_summaries=False)
-
-    failed = [proof for proof in setup_results if not proof.passed]
-    failed_contract_names = [proof.id.split('.')[0] for proof in failed]
-    if failed:
-        for proof in failed:
-            contract, _ = foundry.get_contract_and_method(proof.id.split(':')[0])
-            _interpret_proof_failure(proof, options.failure_info, contract.error_selectors)
-        sys.exit(f"Running setUp method failed for {len(failed)} contracts: {', '.join(failed_contract_names)}")
-
-    if options.verbose:
-        _LOGGER.info(f'Running test functions in parallel: {test_names}')
-    else:
         separator = '\n\t\t\t\t    '  # ad-hoc separator for the string "Running test functions in parallel: " below
         console.print(f'[bold]Running test functions in parallel:[/bold] {separator.join(test_names)}')
-    test_results = _run_prover(test_suite, include_summaries=True)
+
+    tasks = _proof_tasks(constructor_tests, setup_method_tests, summary_tests + test_suite, summary_ids, callee_ids)
+    results = {
+        result.id: result
+        for result in _run_cfg_group(tasks=tasks, foundry=foundry, options=options, init_accounts=init_accounts)
+    }
+    tasks_by_id = {task.test.id: task for task in tasks}
+
+    def result_of(test_id: str) -> ProofResult:
+        # Proofs that depend on a proof that did not pass are not run, report them as failed
+        if test_id not in results:
+            failed_ids = [
+                dependency for dependency in tasks_by_id[test_id].dependencies if not result_of(dependency).passed
+            ]
+            results[test_id] = ProofResult.from_skipped(test_id, failed_ids)
+        return results[test_id]
+
+    constructor_results = [result_of(test.id) for test in constructor_tests]
+    setup_results = [result_of(test.id) for test in setup_method_tests]
+    test_results = [result_of(test.id) for test in test_suite]
+
+    for step, init_results in [
+        ('Running initialization code', constructor_results),
+        ('Running setUp method', setup_results),
+    ]:
+        failed = [result.load_proof(foundry) for result in init_results if not result.passed and not result.skipped]
+        if failed:
+            for proof in failed:
+                contract, _ = foundry.get_contract_and_method(proof.id.split(':')[0])
+                _interpret_proof_failure(proof, options.failure_info, contract.error_selectors)
+            failed_contract_names = ', '.join(proof.id.split('.')[0] for proof in failed)
+            console.print(f'[bold red]{step} failed for {len(failed)} contracts:[/bold red] {failed_contract_names}')
 
     if options.xml_test_report:
         foundry_to_xml(foundry, constructor_results + setup_results + test_results, options.xml_test_report_name)
@@ -193,6 +192,49 @@ def foundry_prove(options: ProveOptions, foundry: Foundry, init_accounts: Iterab
     return test_results
 
 
+def foundry_prove_worker(options: WorkerOptions) -> int:
+    """Run the proofs handed out by a `kontrol prove --coordinator` process, and return how many were run.
+
+    The Foundry project at `options.foundry_root` must share its proofs directory with the coordinator.
+    """
+    address = parse_address(options.connect)
+    authkey = resolve_authkey(options.authkey)
+    foundries: dict[bool, Foundry] = {}
+
+    def run_task(
+        job: tuple[ProveOptions, list[KInner]], task: tuple[str, tuple[str, ...], ConfigType | None]
+    ) -> ProofResult:
+        prove_options, init_accounts = job
+        test_id, summary_ids, config_type = task
+        # The project is loaded as the coordinator loaded it, which matters for enum constraints on calldata
+        if prove_options.enum_constraints not in foundries:
+            foundries[prove_options.enum_constraints] = Foundry(
+                options.foundry_root,
+                bug_report=prove_options.bug_report,
+                add_enum_constraints=prove_options.enum_constraints,
+            )
+        foundry = foundries[prove_options.enum_constraints]
+        test, version = parse_test_version_tuple(test_id)
+        assert version is not None
+        contract, method = foundry.get_contract_and_method(test)
+        proof_task = ProofTask(FoundryTest(contract, method, version), summary_ids=summary_ids, config_type=config_type)
+        return init_and_run_proof(proof_task, foundry, prove_options, init_accounts)
+
+    def connect() -> int:
+        try:
+            return run_worker(address, authkey, run_task)
+        finally:
+            close_pooled_kore_server()
+
+    if options.workers == 1:
+        return connect()
+    with Pool(processes=options.workers) as process_pool:
+        results = [process_pool.apply_async(connect) for _ in range(options.workers)]
+        process_pool.close()
+        process_pool.join()
+    return sum(result.get() for result in results)
+
+
 class FoundryTest(NamedTuple):
     contract: Contract
     method: Contract.Method | Contract.Constructor
@@ -268,6 +310,171 @@ def collect_constructors(
     return res
 
 
+def collect_summary_tests(
+    foundry: Foundry, tests: Iterable[FoundryTest], *, reinit: bool
+) -> tuple[list[FoundryTest], dict[str, tuple[str, ...]]]:
+    """Collect the external functions called by `tests`, transitively, to be proven as summaries.
+
+    Each called function is collected once, however many callers it has. Returns the summary proofs not
+    already in `tests`, callees first, and a map from each caller proof id to the proof ids of its callees.
+    Calls closing a recursive cycle are dropped, so that every callee can be proven before its callers.
+    """
+    tests = list(tests)
+    by_name: dict[str, FoundryTest] = {test.name: test for test in tests}
+    callee_ids: dict[str, tuple[str, ...]] = {}
+    summary_tests: list[FoundryTest] = []
+    visiting: set[str] = set()
+    visited: set[str] = set()
+
+    def resolve(call: str) -> FoundryTest | None:
+        if call not in by_name:
+            callees = collect_tests(foundry, [parse_test_version_tuple(call)], reinit=reinit, exact_match=True)
+            if not callees:
+                return None
+            by_name[call] = callees[0]
+        return by_name[call]
+
+    def visit(test: FoundryTest, is_summary: bool) -> None:
+        visiting.add(test.name)
+        ids: list[str] = []
+        if isinstance(test.method, Contract.Method) and test.method.function_calls:
+            if not test.contract.has_storage_layout:
+                raise RuntimeError(
+                    "Couldn't locate 'storageLayout' in the compiled solc output. Please add `extra_output = ['storageLayout']` to your foundry.toml file."
+                )
+            _LOGGER.info(f'For test {test.name}, found external calls: {list(test.method.function_calls)}')
+            for call in test.method.function_calls:
+                callee = resolve(call)
+                if callee is None:
+                    continue
+                if callee.name in visiting:
+                    _LOGGER.warning(f'Not using a summary for recursive call from {test.name} to {callee.name}.')
+                    continue
+                if callee.name not in visited:
+                    visit(callee, callee.name not in test_names)
+                ids.append(callee.id)
+        callee_ids[test.id] = tuple(unique(ids))
+        visiting.remove(test.name)
+        visited.add(test.name)
+        if is_summary:
+            summary_tests.append(test)
+
+    test_names = {test.name for test in tests}
+    for test in tests:
+        if test.name not in visited:
+            visit(test, False)
+    return summary_tests, callee_ids
+
+
+class ProofTask(NamedTuple):
+    test: FoundryTest
+    summary_ids: tuple[str, ...] = ()
+    dependencies: tuple[str, ...] = ()
+    config_type: ConfigType | None = None
+
+
+def _proof_tasks(
+    constructor_tests: Iterable[FoundryTest],
+    setup_method_tests: Iterable[FoundryTest],
+    test_suite: Iterable[FoundryTest],
+    summary_ids: Iterable[str] = (),
+    callee_ids: dict[str, tuple[str, ...]] | None = None,
+) -> list[ProofTask]:
+    """Create one task per proof, with a dependency on the proof providing its initial state.
+
+    `setUp()` proofs start from the constructor proof of their contract when there is one, and tests start
+    from the `setUp()` proof of their contract, or otherwise from its constructor proof. Tests with entries
+    in `callee_ids` use the summaries of their callees, which are proven as summaries themselves.
+    """
+    callee_ids = callee_ids or {}
+    summary_test_ids = {callee_id for ids in callee_ids.values() for callee_id in ids}
+    constructor_ids = {test.contract.name_with_path: test.id for test in constructor_tests}
+    setup_ids = {test.contract.name_with_path: test.id for test in setup_method_tests}
+
+    tasks: dict[str, ProofTask] = {}
+    for test in constructor_tests:
+        tasks[test.id] = ProofTask(test)
+    for test in setup_method_tests:
+        dependencies = tuple(d for d in [constructor_ids.get(test.contract.name_with_path)] if d is not None)
+        tasks[test.id] = ProofTask(test, dependencies=dependencies)
+    for test in test_suite:
+        if test.id in tasks:
+            continue
+        contract_name = test.contract.name_with_path
+        dependency = setup_ids.get(contract_name) or constructor_ids.get(contract_name)
+        dependencies = (dependency,) if dependency is not None else ()
+        tasks[test.id] = ProofTask(
+            test,
+            summary_ids=tuple(unique([*summary_ids, *callee_ids.get(test.id, ())])),
+            dependencies=dependencies,
+            config_type=ConfigType.SUMMARY_CONFIG if test.id in summary_test_ids else None,
+        )
+    return list(tasks.values())
+
+
+class ProofResult(NamedTuple):
+    """The outcome of a proof, small enough to be sent back from the process that ran it."""
+
+    id: str
+    status: ProofStatus
+    exec_time: float
+    formatted_exec_time: str
+    nodes: int
+    pending: int
+    failing: int
+    failure_info: APRFailureInfo | None = None
+    error_info: Exception | None = None
+    skipped: bool = False
+
+    @staticmethod
+    def from_proof(proof: APRProof) -> ProofResult:
+        return ProofResult(
+            id=proof.id,
+            status=proof.status,
+            exec_time=proof.exec_time,
+            formatted_exec_time=proof.formatted_exec_time(),
+            nodes=len(proof.kcfg.nodes),
+            pending=len(proof.pending),
+            failing=len(proof.failing),
+            failure_info=proof.failure_info if isinstance(proof.failure_info, APRFailureInfo) else None,
+            error_info=proof.error_info,
+        )
+
+    @staticmethod
+    def from_skipped(test_id: str, dependency_ids: Iterable[str]) -> ProofResult:
+        """A failed result for a proof that was not run, because a proof it depends on did not pass."""
+        return ProofResult(
+            id=test_id,
+            status=ProofStatus.FAILED,
+            exec_time=0.0,
+            formatted_exec_time='0s',
+            nodes=0,
+            pending=0,
+            failing=0,
+            error_info=RuntimeError(f'Not run, since {", ".join(dependency_ids)} did not pass'),
+            skipped=True,
+        )
+
+    @property
+    def passed(self) -> bool:
+        return self.status == ProofStatus.PASSED
+
+    @property
+    def failed(self) -> bool:
+        return self.status == ProofStatus.FAILED
+
+    def load_proof(self, foundry: Foundry) -> APRProof:
+        """Read the full proof from disk, with the failure or error information of the run that produced it."""
+        proof = foundry.get_apr_proof(self.id)
+        assert proof.failure_info is None  # Refactor once this fails
+        assert proof.error_info is None
+        if self.error_info is not None:
+            proof.error_info = self.error_info
+        elif self.failure_info is not None:
+            proof.failure_info = KontrolAPRFailureInfo(self.failure_info)
+        return proof
+
+
 class OptionalKoreServer(ContextManager['OptionalKoreServer']):
     @abstractmethod
     def port(self) -> int: ...
@@ -304,184 +511,266 @@ class PreexistingKoreServer(OptionalKoreServer):
         return self._port
 
 
-def _run_cfg_group(
-    tests: list[FoundryTest],
+class PooledKoreServer(OptionalKoreServer):
+    """A KoreServer shared by all proofs run in the current process.
+
+    The server is started on first use and kept alive between proofs. It is restarted when the
+    server arguments change, when the server process has died, or when a proof using it raised.
+    """
+
+    _key: str
+    _args: tuple[Any, ...]
+    _kwargs: dict[str, Any]
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        self._key = repr((args, sorted(kwargs.items())))
+        self._args = args
+        self._kwargs = kwargs
+
+    def __enter__(self) -> PooledKoreServer:
+        global _POOLED_SERVER
+        if _POOLED_SERVER is not None:
+            pid, key, server = _POOLED_SERVER
+            if pid != os.getpid():
+                # Inherited from the parent through fork, owned and closed by the parent
+                _POOLED_SERVER = None
+            elif key != self._key or server._proc.poll() is not None:
+                _LOGGER.info('Restarting pooled KoreServer')
+                close_pooled_kore_server()
+        if _POOLED_SERVER is None:
+            _POOLED_SERVER = (os.getpid(), self._key, kore_server(*self._args, **self._kwargs))
+        return self
+
+    def __exit__(self, exc_type: Any, *args: Any) -> None:
+        if exc_type is not None:
+            close_pooled_kore_server()
+
+    def port(self) -> int:
+        assert _POOLED_SERVER is not None
+        return _POOLED_SERVER[2].port
+
+
+_POOLED_SERVER: tuple[int, str, KoreServer] | None = None
+
+
+def close_pooled_kore_server() -> None:
+    global _POOLED_SERVER
+    if _POOLED_SERVER is None:
+        return
+    pid, _, server = _POOLED_SERVER
+    _POOLED_SERVER = None
+    if pid == os.getpid():
+        server.close()
+
+
+def _init_pool_worker() -> None:
+    Finalize(None, close_pooled_kore_server, exitpriority=10)
+
+
+def init_and_run_proof(
+    proof_task: ProofTask,
     foundry: Foundry,
     options: ProveOptions,
-    summary_ids: Iterable[str],
     init_accounts: Iterable[KInner] = (),
-) -> list[APRProof]:
-    def init_and_run_proof(test: FoundryTest, progress: Progress | None = None) -> APRFailureInfo | Exception | None:
-
-        task: TaskID | None = None
-        if progress is not None:
-            task = progress.add_task(
-                f'{test.id}',
-                total=1,
-                status='Loading proof',
-                summary='---',
-            )
+    progress: Progress | None = None,
+) -> ProofResult:
+    """Initialize the proof of `proof_task` unless it exists already, run it and write it to the proofs directory.
 
-        proof = None
-        if Proof.proof_data_exists(test.id, foundry.proofs_dir):
-            proof = foundry.get_apr_proof(test.id)
-            if proof.passed:
-                if progress is not None and task is not None:
-                    progress.update(
-                        task,
-                        status='Finished',
-                        summary=proof.one_line_summary,
-                        advance=1,
-                    )
-                return None
-        start_time = time.time() if proof is None or proof.status == ProofStatus.PENDING else None
+    Returns a `ProofResult` summarizing the proof, which avoids pickling the whole proof when this runs in a
+    separate process.
+    """
+    test = proof_task.test
+    # Summaries are only left out when they were skipped because a proof they depend on did not pass
+    summary_ids = [
+        summary_id for summary_id in proof_task.summary_ids if Proof.proof_data_exists(summary_id, foundry.proofs_dir)
+    ]
 
-        kore_rpc_command = None
-        if isinstance(options.kore_rpc_command, str):
-            kore_rpc_command = options.kore_rpc_command.split()
+    task: TaskID | None = None
+    if progress is not None:
+        task = progress.add_task(
+            f'{test.id}',
+            total=1,
+            status='Loading proof',
+            summary='---',
+        )
 
-        def select_server() -> OptionalKoreServer:
+    proof = None
+    if Proof.proof_data_exists(test.id, foundry.proofs_dir):
+        proof = foundry.get_apr_proof(test.id)
+        if proof.passed:
             if progress is not None and task is not None:
                 progress.update(
-                    task, status='Starting KoreServer', summary=proof.one_line_summary if proof is not None else '---'
-                )
-            if options.port is not None:
-                return PreexistingKoreServer(options.port)
-            else:
-                return FreshKoreServer(
-                    definition_dir=foundry.kevm.definition_dir,
-                    llvm_definition_dir=foundry.llvm_library if options.use_booster else None,
-                    module_name=foundry.kevm.main_module,
-                    command=kore_rpc_command,
-                    bug_report=options.bug_report,
-                    smt_timeout=options.smt_timeout,
-                    smt_retry_limit=options.smt_retry_limit,
-                    smt_tactic=options.smt_tactic,
-                    haskell_threads=options.max_frontier_parallel,
+                    task,
+                    status='Finished',
+                    summary=proof.one_line_summary,
+                    advance=1,
                 )
+            return ProofResult.from_proof(proof)
+    start_time = time.time() if proof is None or proof.status == ProofStatus.PENDING else None
 
-        with select_server() as server:
-
-            def create_kcfg_explore() -> KCFGExplore:
-                bug_report_id = None if options.bug_report is None else test.id
-                client = KoreClient(
-                    'localhost',
-                    server.port(),
-                    bug_report=options.bug_report,
-                    bug_report_id=bug_report_id,
-                )
-                cterm_symbolic = CTermSymbolic(
-                    client,
-                    foundry.kevm.definition,
-                    log_succ_rewrites=options.log_succ_rewrites,
-                    log_fail_rewrites=options.log_fail_rewrites,
-                    booster_only_simplify=options.booster_only_simplify,
-                    haskell_log_entries=options.haskell_log_entries,
-                    haskell_log_dir=options.haskell_log_dir,
-                )
-                return KCFGExplore(
-                    cterm_symbolic,
-                    kcfg_semantics=KontrolSemantics(
-                        auto_abstract_gas=options.auto_abstract_gas, allow_ffi_calls=foundry.ffi
-                    ),
-                    id=test.id,
-                )
+    kore_rpc_command = None
+    if isinstance(options.kore_rpc_command, str):
+        kore_rpc_command = options.kore_rpc_command.split()
 
-            if proof is None:
-                if progress is not None and task is not None:
-                    progress.update(task, status='Initializing proof')
-                # With CSE, top-level proof should be a summary if it's not a test or setUp function
-                if (
-                    (options.cse or options.include_summaries)
-                    and options.config_type == ConfigType.TEST_CONFIG
-                    and not test.contract.is_test_contract
-                ):
-                    options.config_type = ConfigType.SUMMARY_CONFIG
-
-                proof = method_to_apr_proof(
-                    test=test,
-                    foundry=foundry,
-                    kcfg_explore=create_kcfg_explore(),
-                    bmc_depth=options.bmc_depth,
-                    run_constructor=options.run_constructor,
-                    init_accounts=init_accounts,
-                    summary_ids=summary_ids,
-                    active_simbolik=options.with_non_general_state,
-                    hevm=options.hevm,
-                    config_type=options.config_type,
-                    evm_chain_options=EVMChainOptions(
-                        {
-                            'schedule': options.schedule,
-                            'chainid': options.chainid,
-                            'mode': options.mode,
-                            'usegas': options.usegas,
-                        }
-                    ),
-                    stack_checks=options.stack_checks,
-                    symbolic_caller=options.symbolic_caller,
-                )
-            cut_point_rules = KontrolSemantics.cut_point_rules(
-                options.break_on_jumpi,
-                options.break_on_jump,
-                options.break_on_calls,
-                options.break_on_storage,
-                options.break_on_basic_blocks,
-                options.break_on_load_program,
+    def select_server() -> OptionalKoreServer:
+        if progress is not None and task is not None:
+            progress.update(
+                task, status='Starting KoreServer', summary=proof.one_line_summary if proof is not None else '---'
+            )
+        if options.port is not None:
+            return PreexistingKoreServer(options.port)
+        else:
+            server_type = PooledKoreServer if options.reuse_server else FreshKoreServer
+            return server_type(
+                definition_dir=foundry.kevm.definition_dir,
+                llvm_definition_dir=foundry.llvm_library if options.use_booster else None,
+                module_name=foundry.kevm.main_module,
+                command=kore_rpc_command,
+                bug_report=options.bug_report,
+                smt_timeout=options.smt_timeout,
+                smt_retry_limit=options.smt_retry_limit,
+                smt_tactic=options.smt_tactic,
+                haskell_threads=options.max_frontier_parallel,
             )
-            if options.break_on_cheatcodes:
-                cut_point_rules.extend(
-                    rule.label for rule in foundry.kevm.definition.all_modules_dict['FOUNDRY-CHEAT-CODES'].rules
-                )
-                cut_point_rules.extend(
-                    rule.label for rule in foundry.kevm.definition.all_modules_dict['KONTROL-ASSERTIONS'].rules
-                )
 
-            lemmas_module = foundry.load_lemmas(options.lemmas)
+    # With CSE, top-level proof should be a summary if it's not a test or setUp function
+    config_type = proof_task.config_type or options.config_type
+    if (
+        (options.cse or options.include_summaries)
+        and config_type == ConfigType.TEST_CONFIG
+        and not test.contract.is_test_contract
+    ):
+        config_type = ConfigType.SUMMARY_CONFIG
+
+    with select_server() as server:
+
+        def create_kcfg_explore() -> KCFGExplore:
+            bug_report_id = None if options.bug_report is None else test.id
+            client = KoreClient(
+                'localhost',
+                server.port(),
+                bug_report=options.bug_report,
+                bug_report_id=bug_report_id,
+            )
+            cterm_symbolic = CTermSymbolic(
+                client,
+                foundry.kevm.definition,
+                log_succ_rewrites=options.log_succ_rewrites,
+                log_fail_rewrites=options.log_fail_rewrites,
+                booster_only_simplify=options.booster_only_simplify,
+                haskell_log_entries=options.haskell_log_entries,
+                haskell_log_dir=options.haskell_log_dir,
+            )
+            return KCFGExplore(
+                cterm_symbolic,
+                kcfg_semantics=KontrolSemantics(
+                    auto_abstract_gas=options.auto_abstract_gas, allow_ffi_calls=foundry.ffi
+                ),
+                id=test.id,
+            )
 
+        if proof is None:
             if progress is not None and task is not None:
-                progress.update(
-                    task,
-                    status='Running proof',
-                    summary=proof.one_line_summary,
-                )
-            run_prover(
-                proof,
-                create_kcfg_explore=create_kcfg_explore,
-                max_depth=options.max_depth,
-                max_iterations=options.max_iterations,
-                cut_point_rules=cut_point_rules,
-                terminal_rules=KontrolSemantics.terminal_rules(options.break_every_step),
-                counterexample_info=options.counterexample_info,
-                max_frontier_parallel=options.max_frontier_parallel,
-                fail_fast=options.fail_fast,
-                force_sequential=options.force_sequential,
-                progress=progress,
-                task_id=task,
-                maintenance_rate=options.maintenance_rate,
-                assume_defined=options.assume_defined,
-                extra_module=lemmas_module,
-                optimize_kcfg=options.optimize_kcfg,
-                step_timeout=options.step_timeout,
+                progress.update(task, status='Initializing proof')
+
+            proof = method_to_apr_proof(
+                test=test,
+                foundry=foundry,
+                kcfg_explore=create_kcfg_explore(),
+                bmc_depth=options.bmc_depth,
+                run_constructor=options.run_constructor,
+                init_accounts=init_accounts,
+                summary_ids=summary_ids,
+                active_simbolik=options.with_non_general_state,
+                hevm=options.hevm,
+                config_type=config_type,
+                evm_chain_options=EVMChainOptions(
+                    {
+                        'schedule': options.schedule,
+                        'chainid': options.chainid,
+                        'mode': options.mode,
+                        'usegas': options.usegas,
+                    }
+                ),
+                stack_checks=options.stack_checks,
+                symbolic_caller=options.symbolic_caller,
+            )
+        cut_point_rules = KontrolSemantics.cut_point_rules(
+            options.break_on_jumpi,
+            options.break_on_jump,
+            options.break_on_calls,
+            options.break_on_storage,
+            options.break_on_basic_blocks,
+            options.break_on_load_program,
+        )
+        if options.break_on_cheatcodes:
+            cut_point_rules.extend(
+                rule.label for rule in foundry.kevm.definition.all_modules_dict['FOUNDRY-CHEAT-CODES'].rules
+            )
+            cut_point_rules.extend(
+                rule.label for rule in foundry.kevm.definition.all_modules_dict['KONTROL-ASSERTIONS'].rules
             )
 
-            if progress is not None and task is not None:
-                progress.update(task, advance=1, status='Finished')
+        lemmas_module = foundry.load_lemmas(options.lemmas)
+
+        if progress is not None and task is not None:
+            progress.update(
+                task,
+                status='Running proof',
+                summary=proof.one_line_summary,
+            )
+        run_prover(
+            proof,
+            create_kcfg_explore=create_kcfg_explore,
+            max_depth=options.max_depth,
+            max_iterations=options.max_iterations,
+            cut_point_rules=cut_point_rules,
+            terminal_rules=KontrolSemantics.terminal_rules(options.break_every_step),
+            counterexample_info=options.counterexample_info,
+            max_frontier_parallel=options.max_frontier_parallel,
+            fail_fast=options.fail_fast,
+            force_sequential=options.force_sequential,
+            progress=progress,
+            task_id=task,
+            maintenance_rate=options.maintenance_rate,
+            assume_defined=options.assume_defined,
+            extra_module=lemmas_module,
+            optimize_kcfg=options.optimize_kcfg,
+            step_timeout=options.step_timeout,
+        )
 
-            if options.minimize_proofs or options.config_type == ConfigType.SUMMARY_CONFIG:
-                proof.minimize_kcfg()
+        if progress is not None and task is not None:
+            progress.update(task, advance=1, status='Finished')
 
-            if start_time is not None:
-                end_time = time.time()
-                proof.add_exec_time(end_time - start_time)
-            proof.write_proof_data()
+        if options.minimize_proofs or config_type == ConfigType.SUMMARY_CONFIG:
+            proof.minimize_kcfg()
 
-            # Only return the failure info to avoid pickling the whole proof
-            if proof.failure_info is not None and not isinstance(proof.failure_info, APRFailureInfo):
-                raise RuntimeError('Generated failure info for APRProof is not APRFailureInfo.')
-            if proof.error_info is not None:
-                return proof.error_info
-            else:
-                return proof.failure_info
+        if start_time is not None:
+            end_time = time.time()
+            proof.add_exec_time(end_time - start_time)
+        proof.write_proof_data()
+        ProofSummaryIndex(foundry.proofs_dir).update(proof, digest=test.method.digest)
+
+        # Only return a summary of the proof to avoid pickling the whole proof
+        if proof.failure_info is not None and not isinstance(proof.failure_info, APRFailureInfo):
+            raise RuntimeError('Generated failure info for APRProof is not APRFailureInfo.')
+        return ProofResult.from_proof(proof)
+
+
+def _run_cfg_group(
+    tasks: list[ProofTask],
+    foundry: Foundry,
+    options: ProveOptions,
+    init_accounts: Iterable[KInner] = (),
+) -> list[ProofResult]:
+    """Run the proofs of `tasks`, each one as soon as all the proofs it depends on have passed.
+
+    Proofs whose dependencies did not pass are skipped and left out of the result. The proofs themselves are only
+    loaded from disk when generating counterexamples for them.
+    """
+
+    def run_proof(proof_task: ProofTask, progress: Progress | None = None) -> ProofResult:
+        return init_and_run_proof(proof_task, foundry, options, init_accounts, progress)
 
     with Progress(
         SpinnerColumn(),
@@ -494,84 +783,205 @@ def _run_cfg_group(
     ) as progress:
 
         display_status_bar = not (options.hide_status_bar or options.verbose or options.debug)
-        failure_infos: list[APRFailureInfo | Exception | None]
-        if options.workers > 1 and len(tests) > 1:
+        tasks_by_id = {proof_task.test.id: proof_task for proof_task in tasks}
+        dependencies = {test_id: proof_task.dependencies for test_id, proof_task in tasks_by_id.items()}
+        order_only = {test_id: proof_task.summary_ids for test_id, proof_task in tasks_by_id.items()}
+
+        priority: dict[str, float] | None = None
+        predicted_makespan: float | None = None
+        if options.longest_first:
+            estimates, from_history = _estimate_exec_times(foundry, [proof_task.test for proof_task in tasks])
+            priority = ProofDAG(dependencies, order_only=order_only).bottom_levels(estimates)
+            if from_history:
+                all_dependencies = {test_id: [*dependencies[test_id], *order_only[test_id]] for test_id in tasks_by_id}
+                predicted_makespan = predict_makespan(all_dependencies, estimates, options.workers, priority)
+            else:
+                _LOGGER.info('No previous execution times found, ordering proofs by bytecode size and branching.')
+        start_time = time.time()
+
+        dag = ProofDAG(dependencies, order_only=order_only, priority=priority)
+        results: dict[str, ProofResult] = {}
+        if options.coordinator is not None or (options.workers > 1 and len(tasks) > 1):
             done_tests = 0
             failed_tests = 0
             passed_tests = 0
             if display_status_bar:
+                mode = 'coordinator' if options.coordinator is not None else f'{options.workers} workers'
                 task = progress.add_task(
-                    f'Multi-proof Mode ({options.workers} workers)',
+                    f'Multi-proof Mode ({mode})',
                     status='Running',
-                    summary=f'{done_tests}/{len(tests)} completed. {passed_tests} passed. {failed_tests} failed.',
+                    summary=f'{done_tests}/{len(tasks)} completed. {passed_tests} passed. {failed_tests} failed.',
                 )
 
-            def update_status_bar(test_id: str, result: Any) -> None:
+            def update_status_bar(status: ProofStatus) -> None:
                 nonlocal done_tests, failed_tests, passed_tests
                 if not display_status_bar or progress is None:
                     return
                 done_tests += 1
-                proof = foundry.get_apr_proof(test_id)
-                if proof.passed:
+                if status == ProofStatus.PASSED:
                     passed_tests += 1
-                elif proof.failed:
+                elif status == ProofStatus.FAILED:
                     failed_tests += 1
                 progress.update(
                     task,
-                    summary=f'{done_tests}/{len(tests)} completed. {passed_tests} passed. {failed_tests} failed.',
+                    summary=f'{done_tests}/{len(tasks)} completed. {passed_tests} passed. {failed_tests} failed.',
                 )
 
-            with Pool(processes=options.workers) as process_pool:
-                results = [
-                    process_pool.apply_async(
-                        init_and_run_proof, args=(test,), callback=partial(update_status_bar, test.id)
-                    )
-                    for test in tests
-                ]
-
-                process_pool.close()
-                process_pool.join()
+            if options.coordinator is not None:
+                with ProofCoordinator(
+                    parse_address(options.coordinator),
+                    resolve_authkey(options.authkey),
+                    job=(options, list(init_accounts)),
+                ) as coordinator:
+                    host, port = coordinator.address
+                    console.print(f'[bold]Waiting for workers:[/bold] kontrol worker --connect {host}:{port}')
+                    while not dag.done:
+                        for test_id in dag.pop_ready():
+                            proof_task = tasks_by_id[test_id]
+                            coordinator.submit(
+                                test_id,
+                                (test_id, proof_task.summary_ids, proof_task.config_type),
+                                priority=priority.get(test_id, 0.0) if priority is not None else 0.0,
+                            )
+                        if not dag.running:
+                            break
+                        test_id, results[test_id] = coordinator.result()
+                        update_status_bar(results[test_id].status)
+                        dag.finish(test_id, results[test_id].passed)
+            else:
+                # Results are handed back to this thread, which is the only one submitting new proofs to the pool
+                finished: Queue[str] = Queue()
+                async_results = {}
+                with Pool(processes=options.workers, initializer=_init_pool_worker) as process_pool:
+                    while not dag.done:
+                        # Only hand the pool as many proofs as it can start, so that the next one is picked by priority
+                        for test_id in dag.pop_ready(options.workers - len(dag.running)):
+                            async_results[test_id] = process_pool.apply_async(
+                                run_proof,
+                                args=(tasks_by_id[test_id],),
+                                callback=lambda _, test_id=test_id: finished.put(test_id),
+                                error_callback=lambda _, test_id=test_id: finished.put(test_id),
+                            )
+                        if not dag.running:
+                            break
+                        test_id = finished.get()
+                        # Re-raises the exception from the worker, if any
+                        results[test_id] = async_results[test_id].get()
+                        update_status_bar(results[test_id].status)
+                        dag.finish(test_id, results[test_id].passed)
+
+                    process_pool.close()
+                    process_pool.join()
             if display_status_bar:
                 if progress is not None:
                     progress.update(task, status='Finished', advance=1)
-            failure_infos = [result.get() for result in results]
         else:
-            failure_infos = []
-            for test in tests:
-                failure_infos.append(init_and_run_proof(test, None if not display_status_bar else progress))
-
-        proofs = [foundry.get_apr_proof(test.id) for test in tests]
+            try:
+                while not dag.done:
+                    ready = dag.pop_ready()
+                    if not ready:
+                        break
+                    for test_id in ready:
+                        results[test_id] = run_proof(tasks_by_id[test_id], None if not display_status_bar else progress)
+                        dag.finish(test_id, results[test_id].passed)
+            finally:
+                close_pooled_kore_server()
+
+        if predicted_makespan is not None:
+            actual = time.time() - start_time
+            console.print(
+                f'[bold]Predicted makespan:[/bold] {predicted_makespan:.1f}s, [bold]actual:[/bold] {actual:.1f}s'
+            )
 
-        # Reconstruct the proof from the subprocess
-        for proof, failure_info in zip(proofs, failure_infos, strict=True):
-            assert proof.failure_info is None  # Refactor once this fails
-            assert proof.error_info is None
-            if isinstance(failure_info, Exception):
-                proof.error_info = failure_info
-            elif isinstance(failure_info, APRFailureInfo):
-                proof.failure_info = KontrolAPRFailureInfo(failure_info)
+        for test_id in sorted(dag.skipped):
+            _LOGGER.warning(f'Skipped proof {test_id}: a proof it depends on did not pass.')
 
         # Generate counterexample tests for failed proofs if requested
         if options.generate_counterexample:
-            for proof in proofs:
+            for result in results.values():
                 if (
-                    proof.failure_info
-                    and hasattr(proof.failure_info, 'failing_nodes')
-                    and proof.failure_info.failing_nodes
+                    result.failure_info
+                    and hasattr(result.failure_info, 'failing_nodes')
+                    and result.failure_info.failing_nodes
                 ):
                     try:
-                        _LOGGER.info(f'Attempting to generate counterexample for proof: {proof.id}')
-                        counterexample_path = generate_counterexample_test(proof, foundry)
+                        _LOGGER.info(f'Attempting to generate counterexample for proof: {result.id}')
+                        counterexample_path = generate_counterexample_test(result.load_proof(foundry), foundry)
                         if counterexample_path:
                             console.print(
                                 f':test_tube: [bold yellow]Generated counterexample test: {counterexample_path}[/bold yellow] :test_tube:'
                             )
                         else:
-                            _LOGGER.warning(f'Counterexample generation returned None for proof: {proof.id}')
+                            _LOGGER.warning(f'Counterexample generation returned None for proof: {result.id}')
                     except Exception as e:
                         _LOGGER.warning(f'Failed to generate counterexample test: {e}')
 
-        return proofs
+        return [results[test_id] for test_id in tasks_by_id if test_id in results]
+
+
+_JUMPI_COST: Final = 100
+
+
+def _bytecode_cost(bytecode: str) -> int:
+    """Estimate the relative cost of symbolically executing `bytecode` from its size and number of branches."""
+    size = len(bytecode) // 2
+    jumpis = 0
+    pc = 0
+    while pc < size:
+        try:
+            opcode = int(bytecode[2 * pc : 2 * pc + 2], 16)
+        except ValueError:
+            # Unlinked library placeholder
+            opcode = 0
+        if 0x60 <= opcode <= 0x7F:
+            # Skip the PUSH1 - PUSH32 immediate data
+            pc += opcode - 0x5F
+        elif opcode == 0x57:
+            jumpis += 1
+        pc += 1
+    return size + _JUMPI_COST * jumpis
+
+
+def _previous_exec_time(foundry: Foundry, test: FoundryTest) -> float | None:
+    """Return the execution time stored with the current or, failing that, latest proof of `test`."""
+    proof_ids = [test.id]
+    latest_version = foundry.latest_proof_version(test.name)
+    if latest_version is not None:
+        proof_ids.append(f'{test.name}:{latest_version}')
+    for proof_id in proof_ids:
+        proof_json = foundry.proofs_dir / proof_id / 'proof.json'
+        if not proof_json.is_file():
+            continue
+        dct = json.loads(proof_json.read_text())
+        exec_time = dct.get('execution_time', dct.get('exec_time'))
+        if exec_time:
+            return float(exec_time)
+    return None
+
+
+def _estimate_exec_times(foundry: Foundry, tests: Iterable[FoundryTest]) -> tuple[dict[str, float], bool]:
+    """Estimate how long each proof will take, from its previous execution time when there is one.
+
+    Proofs without history are estimated from the bytecode they execute, scaled by the median ratio of execution
+    time to bytecode cost over the proofs with history. Also returns whether any history was found, without which
+    the estimates are only meaningful relative to each other.
+    """
+    costs: dict[str, int] = {}
+    history: dict[str, float] = {}
+    for test in tests:
+        if isinstance(test.method, Contract.Constructor):
+            bytecode = test.contract.bytecode
+        else:
+            bytecode = test.contract.deployed_bytecode
+        costs[test.id] = max(_bytecode_cost(bytecode), 1)
+        exec_time = _previous_exec_time(foundry, test)
+        if exec_time is not None:
+            history[test.id] = exec_time
+
+    ratios = sorted(history[test_id] / costs[test_id] for test_id in history)
+    scale = ratios[len(ratios) // 2] if ratios else 1.0
+    estimates = {test_id: history.get(test_id, scale * cost) for test_id, cost in costs.items()}
+    return estimates, bool(history)
 
 
 class KontrolAPRFailureInfo(APRFailureInfo):
@@ -635,7 +1045,6 @@ def method_to_apr_proof(
     hevm: bool = False,
 ) -> APRProof:
     setup_proof = None
-    setup_proof_is_constructor = False
     if isinstance(test.method, Contract.Constructor):
         _LOGGER.info(f'Creating proof from constructor for test: {test.id}')
     elif test.method.signature != 'setUp()' and 'setUp' in test.contract.method_by_name:
@@ -644,14 +1053,12 @@ def method_to_apr_proof(
     elif run_constructor:
         _LOGGER.info(f'Using constructor final state as initial state for test: {test.id}')
         setup_proof = _load_constructor_proof(foundry, test.contract)
-        setup_proof_is_constructor = True
 
     kcfg, init_node_id, target_node_id, bounded_node_ids = _method_to_initialized_cfg(
         foundry=foundry,
         test=test,
         kcfg_explore=kcfg_explore,
         setup_proof=setup_proof,
-        graft_setup_proof=((setup_proof is not None) and not setup_proof_is_constructor),
         evm_chain_options=evm_chain_options,
         stack_checks=stack_checks,
         symbolic_caller=symbolic_caller,
@@ -677,18 +1084,103 @@ def method_to_apr_proof(
     return apr_proof
 
 
-def _load_setup_proof(foundry: Foundry, contract: Contract) -> APRProof:
+class SetupGraft(NamedTuple):
+    """The parts of a passed `setUp()` or constructor proof that the proofs of the tests of its contract start from."""
+
+    proof_id: str
+    status: ProofStatus
+    has_pending: bool
+    has_failing: bool
+    init: int
+    final_states: tuple[KCFG.Node, ...]
+    keep_vars: frozenset[str]
+    bounded_node_ids: tuple[int, ...]
+    kcfg_dict: dict[str, Any] | None
+
+    @staticmethod
+    def from_proof(setup_proof: APRProof, graft: bool) -> SetupGraft:
+        """Extract the final states of `setup_proof`, and when `graft` is set its minimized KCFG without the target."""
+        cfg: KCFG | None = None
+        if graft:
+            cfg = KCFG.from_dict(setup_proof.kcfg.to_dict())
+            KCFGMinimizer(cfg).minimize()
+            cfg.remove_node(setup_proof.target)
+
+        # When minimizing constraints, we need to make sure not to forget any variables
+        # that might have been instantiated by a branching in the setup KCFG
+        keep_vars = frozenset(
+            var
+            for split in (cfg.splits() if cfg is not None else ())
+            for _, csubst in split.splits.items()
+            for constraint in csubst.constraints
+            for var in free_vars(constraint)
+        )
+
+        return SetupGraft(
+            proof_id=setup_proof.id,
+            status=setup_proof.status,
+            has_pending=bool(setup_proof.pending),
+            has_failing=bool(setup_proof.failing),
+            init=setup_proof.init,
+            final_states=tuple(cover.source for cover in setup_proof.kcfg.covers(target_id=setup_proof.target)),
+            keep_vars=keep_vars,
+            bounded_node_ids=tuple(node.id for node in setup_proof.bounded) if graft else (),
+            kcfg_dict=cfg.to_dict() if cfg is not None else None,
+        )
+
+    def kcfg(self) -> KCFG:
+        """Return a fresh copy of the grafted KCFG, or an empty KCFG when not grafting."""
+        return KCFG.from_dict(self.kcfg_dict) if self.kcfg_dict is not None else KCFG()
+
+
+def _lru_get(cache: dict[K, V], key: K) -> V | None:
+    """Look up `key` in a dict used as an LRU cache, marking it as the most recently used entry."""
+    value = cache.pop(key, None)
+    if value is not None:
+        cache[key] = value
+    return value
+
+
+def _lru_put(cache: dict[K, V], key: K, value: V, size: int) -> None:
+    """Add an entry to a dict used as an LRU cache, dropping the least recently used entry if it holds `size`."""
+    cache.pop(key, None)
+    if len(cache) >= size:
+        del cache[next(iter(cache))]
+    cache[key] = value
+
+
+# Setup grafts already computed in this process, keyed by proofs directory, proof id, grafting and proof.json mtime
+_SETUP_GRAFTS: dict[tuple[str, str, bool], tuple[int, SetupGraft]] = {}
+_SETUP_GRAFT_CACHE_SIZE: Final = 16
+
+
+def _load_setup_graft(foundry: Foundry, proof_id: str, graft: bool) -> SetupGraft:
+    key = (str(foundry.proofs_dir), proof_id, graft)
+    mtime = (foundry.proofs_dir / proof_id / 'proof.json').stat().st_mtime_ns
+    cached = _lru_get(_SETUP_GRAFTS, key)
+    if cached is not None and cached[0] == mtime:
+        _LOGGER.info(f'Reusing initial state proof from cache: {proof_id}')
+        return cached[1]
+    setup_graft = SetupGraft.from_proof(APRProof.read_proof_data(foundry.proofs_dir, proof_id), graft)
+    _lru_put(_SETUP_GRAFTS, key, (mtime, setup_graft), _SETUP_GRAFT_CACHE_SIZE)
+    return setup_graft
+
+
+def _load_setup_proof(foundry: Foundry, contract: Contract) -> SetupGraft:
     latest_version = foundry.latest_proof_version(f'{contract.name_with_path}.setUp()')
     setup_digest = f'{contract.name_with_path}.setUp():{latest_version}'
-    apr_proof = APRProof.read_proof_data(foundry.proofs_dir, setup_digest)
-    return apr_proof
+    return _load_setup_graft(foundry, setup_digest, graft=True)
 
 
-def _load_constructor_proof(foundry: Foundry, contract: Contract) -> APRProof:
+def _load_constructor_proof(foundry: Foundry, contract: Contract) -> SetupGraft:
     latest_version = foundry.latest_proof_version(f'{contract.name_with_path}.init')
     setup_digest = f'{contract.name_with_path}.init:{latest_version}'
-    apr_proof = APRProof.read_proof_data(foundry.proofs_dir, setup_digest)
-    return apr_proof
+    return _load_setup_graft(foundry, setup_digest, graft=False)
+
+
+# Expanded and simplified target states, keyed by kompiled definition and the target state before expansion
+_TARGET_CTERMS: dict[tuple[str, CTerm], CTerm] = {}
+_TARGET_CTERM_CACHE_SIZE: Final = 64
 
 
 def _method_to_initialized_cfg(
@@ -700,22 +1192,20 @@ def _method_to_initialized_cfg(
     stack_checks: bool,
     symbolic_caller: bool,
     *,
-    setup_proof: APRProof | None = None,
-    graft_setup_proof: bool = False,
+    setup_proof: SetupGraft | None = None,
     init_accounts: Iterable[KInner] = (),
     active_simbolik: bool = False,
     hevm: bool = False,
 ) -> tuple[KCFG, int, int, Iterable[int]]:
     _LOGGER.info(f'Initializing KCFG for test: {test.id}')
 
-    empty_config = foundry.kevm.definition.empty_config(GENERATED_TOP_CELL)
+    empty_config = foundry.empty_config
     kcfg, new_node_ids, init_node_id, target_node_id, bounded_node_ids = _method_to_cfg(
         foundry,
         empty_config,
         test.contract,
         test.method,
         setup_proof,
-        graft_setup_proof,
         evm_chain_options,
         active_simbolik,
         config_type=config_type,
@@ -734,10 +1224,17 @@ def _method_to_initialized_cfg(
         init_cterm, _ = kcfg_explore.cterm_symbolic.simplify(kcfg_explore.cterm_symbolic.assume_defined(init_cterm))
         kcfg.let_node(node_id, cterm=init_cterm)
 
-    _LOGGER.info(f'Expanding macros in target state for test: {test.name}')
-    target_term = kcfg.node(target_node_id).cterm.kast
-    target_term = KDefinition__expand_macros(foundry.kevm.definition, target_term)
-    target_cterm, _ = kcfg_explore.cterm_symbolic.simplify(CTerm.from_kast(target_term))
+    # The target only depends on the contract and the kind of test, so it is shared by the tests of a contract
+    # `kompiled` is a link that `kontrol build` points at one of the variants, the variant itself is the key
+    target_key = (str(foundry.kompiled.resolve()), kcfg.node(target_node_id).cterm)
+    target_cterm = _lru_get(_TARGET_CTERMS, target_key)
+    if target_cterm is None:
+        _LOGGER.info(f'Expanding macros in target state for test: {test.name}')
+        target_term = KDefinition__expand_macros(foundry.kevm.definition, target_key[1].kast)
+        target_cterm, _ = kcfg_explore.cterm_symbolic.simplify(CTerm.from_kast(target_term))
+        _lru_put(_TARGET_CTERMS, target_key, target_cterm, _TARGET_CTERM_CACHE_SIZE)
+    else:
+        _LOGGER.info(f'Reusing expanded target state for test: {test.name}')
     kcfg.let_node(target_node_id, cterm=target_cterm)
 
     return kcfg, init_node_id, target_node_id, bounded_node_ids
@@ -748,8 +1245,7 @@ def _method_to_cfg(
     empty_config: KInner,
     contract: Contract,
     method: Contract.Method | Contract.Constructor,
-    setup_proof: APRProof | None,
-    graft_setup_proof: bool,
+    setup_proof: SetupGraft | None,
     evm_chain_options: EVMChainOptions,
     active_simbolik: bool,
     config_type: ConfigType,
@@ -801,42 +1297,29 @@ def _method_to_cfg(
     bounded_node_ids = []
 
     if setup_proof:
-        if setup_proof.pending:
+        if setup_proof.has_pending:
             raise RuntimeError(
-                f'Initial state proof {setup_proof.id} for {contract.name_with_path}.{method.signature} still has pending branches.'
+                f'Initial state proof {setup_proof.proof_id} for {contract.name_with_path}.{method.signature} still has pending branches.'
             )
 
-        if setup_proof.failing:
+        if setup_proof.has_failing:
             raise RuntimeError(
-                f'Initial state proof {setup_proof.id} for {contract.name_with_path}.{method.signature} still has failing branches.'
+                f'Initial state proof {setup_proof.proof_id} for {contract.name_with_path}.{method.signature} still has failing branches.'
             )
 
         assert setup_proof.status == ProofStatus.PASSED
 
         init_node_id = setup_proof.init
-        # Copy KCFG and minimize it
-        if graft_setup_proof:
-            bounded_node_ids = [node.id for node in setup_proof.bounded]
-            cfg = KCFG.from_dict(setup_proof.kcfg.to_dict())
-            KCFGMinimizer(cfg).minimize()
-            cfg.remove_node(setup_proof.target)
-        else:
-            cfg = KCFG()
-        final_states = [cover.source for cover in setup_proof.kcfg.covers(target_id=setup_proof.target)]
+        # Copy the minimized KCFG when grafting
+        graft_setup_proof = setup_proof.kcfg_dict is not None
+        bounded_node_ids = list(setup_proof.bounded_node_ids)
+        cfg = setup_proof.kcfg()
+        final_states = setup_proof.final_states
         if not final_states:
             _LOGGER.warning(
-                f'Initial state proof {setup_proof.id} for {contract.name_with_path}.{method.signature} has no passing branches to build on. Method will not be executed.'
+                f'Initial state proof {setup_proof.proof_id} for {contract.name_with_path}.{method.signature} has no passing branches to build on. Method will not be executed.'
             )
-
-        # When minimizing constraints, we need to make sure not to forget any variables
-        # that might have been instantiated by a branching in the setup KCFG
-        keep_vars: set[str] = {
-            var
-            for split in cfg.splits()
-            for _, csubst in split.splits.items()
-            for constraint in csubst.constraints
-            for var in free_vars(constraint)
-        }
+        keep_vars = setup_proof.keep_vars
 
         for final_node in final_states:
             new_init_cterm = _update_cterm_from_node(init_cterm, final_node, config_type, keep_vars)
@@ -846,7 +1329,7 @@ def _method_to_cfg(
                 cfg.create_edge(final_node.id, new_node.id, depth=1)
             elif len(final_states) != 1:
                 raise RuntimeError(
-                    f'KCFG grafting must be enabled for branching proofs. Proof {setup_proof.id} branched.'
+                    f'KCFG grafting must be enabled for branching proofs. Proof {setup_proof.proof_id} branched.'
                 )
             new_node_ids.append(new_node.id)
     else:
@@ -1235,10 +1718,11 @@ def _create_cse_accounts(
                 contract_type = field.linked_interface
             else:
                 contract_type = field.data_type.split(' ')[1]
-            for full_contract_name, contract_obj in foundry.contracts.items():
+            for full_contract_name in foundry.contracts:
                 # TODO: this is not enough, it is possible that the same contract comes with
                 # src% and test%, in which case we don't know automatically which one to choose
                 if full_contract_name.split('%')[-1] == contract_type:
+                    contract_obj = foundry.contracts[full_contract_name]
                     contract_account_code = bytesToken(bytes.fromhex(contract_obj.deployed_bytecode))
                     contract_account_variable = KVariable(field_name + '_ID', sort=KSort('Int'))
 
@@ -1429,7 +1913,7 @@ def _final_term(
     )
 
 
-def _process_external_library_references(contract: Contract, foundry_contracts: dict[str, Contract]) -> list[KInner]:
+def _process_external_library_references(contract: Contract, foundry_contracts: Mapping[str, Contract]) -> list[KInner]:
     """Create a list of KInner accounts for external libraries used in the given contract.
 
     This function identifies external library placeholders within the contract's bytecode and deployed bytecode,
@@ -1438,7 +1922,7 @@ def _process_external_library_references(contract: Contract, foundry_contracts:
     KEVM account cells representing the deployed external libraries.
 
     :param contract: The contract object containing the deployed bytecode and external library references.
-    :param foundry_contracts: A dictionary mapping library names to Contract instances, representing all
+    :param foundry_contracts: A mapping from library names to Contract instances, representing all
                              available contracts including external libraries.
     :raises ValueError: If an external library referenced in the contract's bytecode is not found in foundry_contracts.
     :return:  A list of KEVM account cells representing the deployed external libraries.
@@ -1505,7 +1989,7 @@ def _interpret_proof_failure(
     if failure_info and failure_log is not None:
         status_codes: list[str] = []
         output_values: list[str] = []
-        kevm = KEVM(kdist.get('kontrol.base'))
+        kevm = KontrolSemantics.base_kevm()
         for node_id in failure_log.failing_nodes:
             node = proof.kcfg.get_node(node_id)
             assert node is not None
@@ -0,0 +1,181 @@
+"""
+Dependency tracking for proof scheduling.
+
+Proofs depend on each other: tests start from the final states of their contract's `setUp()` proof,
+`setUp()` proofs start from the constructor proof when constructors are run, and callers proven with
+compositional symbolic execution use the summaries of their callees. A `ProofDAG` records these
+dependencies and releases every proof as soon as all of the proofs it depends on have passed.
+"""
+
+from __future__ import annotations
+
+import heapq
+import logging
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping
+    from typing import Final
+
+_LOGGER: Final = logging.getLogger(__name__)
+
+
+class ProofDAG:
+    _parents: dict[str, set[str]]
+    _order_only: dict[str, set[str]]
+    _priority: dict[str, float]
+    _topological_order: list[str]
+    _children: dict[str, list[str]]
+    _waiting: dict[str, set[str]]
+    _ready: list[str]
+    _running: set[str]
+    _passed: set[str]
+    _failed: set[str]
+    _skipped: set[str]
+
+    def __init__(
+        self,
+        dependencies: Mapping[str, Iterable[str]],
+        order_only: Mapping[str, Iterable[str]] | None = None,
+        priority: Mapping[str, float] | None = None,
+    ) -> None:
+        """Build the DAG from a map from each proof id to the ids of the proofs it depends on.
+
+        A proof is skipped when one of its `dependencies` does not pass. Proofs listed in `order_only` only
+        need to have finished, whatever their result, before the proof depending on them is released.
+        Dependencies on ids that are not part of the DAG are treated as already satisfied.
+        Ready proofs are released by decreasing `priority`, then in the insertion order of `dependencies`.
+        """
+        order_only = order_only or {}
+        self._priority = dict(priority or {})
+        self._parents = {}
+        self._order_only = {}
+        self._children = {proof_id: [] for proof_id in dependencies}
+        for proof_id, parents in dependencies.items():
+            hard = {parent for parent in parents if parent in dependencies and parent != proof_id}
+            soft = {
+                parent
+                for parent in order_only.get(proof_id, ())
+                if parent in dependencies and parent != proof_id and parent not in hard
+            }
+            self._parents[proof_id] = hard | soft
+            self._order_only[proof_id] = soft
+            for parent in self._parents[proof_id]:
+                self._children[parent].append(proof_id)
+        self._check_acyclic()
+
+        self._waiting = {proof_id: set(parents) for proof_id, parents in self._parents.items() if parents}
+        self._ready = [proof_id for proof_id, parents in self._parents.items() if not parents]
+        self._running = set()
+        self._passed = set()
+        self._failed = set()
+        self._skipped = set()
+
+    def _check_acyclic(self) -> None:
+        in_degree = {proof_id: len(parents) for proof_id, parents in self._parents.items()}
+        stack = [proof_id for proof_id, degree in in_degree.items() if degree == 0]
+        self._topological_order = []
+        while stack:
+            proof_id = stack.pop()
+            self._topological_order.append(proof_id)
+            for child in self._children[proof_id]:
+                in_degree[child] -= 1
+                if in_degree[child] == 0:
+                    stack.append(child)
+        if len(self._topological_order) != len(in_degree):
+            cyclic = sorted(proof_id for proof_id, degree in in_degree.items() if degree > 0)
+            raise ValueError(f'Cyclic proof dependencies between: {cyclic}')
+
+    def __len__(self) -> int:
+        return len(self._parents)
+
+    def parents(self, proof_id: str) -> set[str]:
+        return set(self._parents[proof_id])
+
+    def children(self, proof_id: str) -> list[str]:
+        return list(self._children[proof_id])
+
+    def bottom_levels(self, durations: Mapping[str, float]) -> dict[str, float]:
+        """Return for each proof the duration of the longest chain of proofs starting from it."""
+        levels: dict[str, float] = {}
+        for proof_id in reversed(self._topological_order):
+            tail = max((levels[child] for child in self._children[proof_id]), default=0.0)
+            levels[proof_id] = durations.get(proof_id, 0.0) + tail
+        return levels
+
+    def pop_ready(self, limit: int | None = None) -> list[str]:
+        """Return up to `limit` proofs whose dependencies are satisfied and mark them as running."""
+        self._ready.sort(key=lambda proof_id: -self._priority.get(proof_id, 0.0))
+        if limit is None:
+            limit = len(self._ready)
+        ready = self._ready[: max(limit, 0)]
+        self._ready = self._ready[len(ready) :]
+        self._running.update(ready)
+        return ready
+
+    def finish(self, proof_id: str, passed: bool) -> None:
+        """Record the result of a running proof, releasing or skipping the proofs depending on it."""
+        if proof_id not in self._running:
+            raise ValueError(f'Proof is not running: {proof_id}')
+        self._running.remove(proof_id)
+        if passed:
+            self._passed.add(proof_id)
+        else:
+            self._failed.add(proof_id)
+        self._release_children(proof_id, passed)
+
+    def _release_children(self, proof_id: str, passed: bool) -> None:
+        for child in self._children[proof_id]:
+            waiting = self._waiting.get(child)
+            if waiting is None:
+                continue
+            if not passed and proof_id not in self._order_only[child]:
+                _LOGGER.info(f'Skipping proof {child}, dependency {proof_id} did not pass.')
+                del self._waiting[child]
+                self._skipped.add(child)
+                self._release_children(child, False)
+                continue
+            waiting.discard(proof_id)
+            if not waiting:
+                del self._waiting[child]
+                self._ready.append(child)
+
+    @property
+    def done(self) -> bool:
+        return not (self._ready or self._running or self._waiting)
+
+    @property
+    def running(self) -> set[str]:
+        return set(self._running)
+
+    @property
+    def passed(self) -> set[str]:
+        return set(self._passed)
+
+    @property
+    def failed(self) -> set[str]:
+        return set(self._failed)
+
+    @property
+    def skipped(self) -> set[str]:
+        return set(self._skipped)
+
+
+def predict_makespan(
+    dependencies: Mapping[str, Iterable[str]],
+    durations: Mapping[str, float],
+    workers: int,
+    priority: Mapping[str, float] | None = None,
+) -> float:
+    """Simulate running the proofs on `workers` workers, assuming they all pass, and return the total time."""
+    dag = ProofDAG(dependencies, priority=priority)
+    now = 0.0
+    running: list[tuple[float, str]] = []
+    while not dag.done:
+        for proof_id in dag.pop_ready(workers - len(running)):
+            heapq.heappush(running, (now + durations.get(proof_id, 0.0), proof_id))
+        if not running:
+            break
+        now, proof_id = heapq.heappop(running)
+        dag.finish(proof_id, True)
+    return now
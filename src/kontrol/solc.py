@@ -4,18 +4,24 @@ import hashlib
 import json
 import logging
 import os
+import re
+from array import array
+from bisect import bisect_right
 from collections import deque
 from functools import cache, cached_property
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, NamedTuple
 
 if TYPE_CHECKING:
-    from collections.abc import Iterator
+    from collections.abc import Callable, Iterator
     from pathlib import Path
 
 import pyevmasm  # type: ignore
 
+from . import VERSION
+from .utils import locked_json_update
+
 if TYPE_CHECKING:
-    from typing import Any
+    from typing import Any, Final
 
     Json = dict[str, Any]
 
@@ -58,6 +64,11 @@ if TYPE_CHECKING:
 
 _LOGGER = logging.getLogger(__name__)
 
+DISASSEMBLY_CACHE_DIR: Final = 'kontrol-disassembly'
+
+# Enough to tell the kinds of Solidity metadata apart, e.g. `{"ipfs": <34 bytes>, ...` from `{"bzzr1": <32 bytes>, ...`
+CBOR_PREFIX_LENGTH: Final = 8
+
 
 class Instruction:
 
@@ -96,7 +107,7 @@ class Instruction:
         try:
             s, l, f, *_ = self.source_map_entry
             try:
-                source = self.compilation_unit.get_source_by_id(f)
+                source = self.compilation_unit.get_source_by_id(f, self.contract.build_info)
             except KeyError:
                 try:
                     source = self.contract.generated_sources[f]
@@ -112,7 +123,7 @@ class Instruction:
         try:
             s, l, f, j, m = self.source_map_entry
             try:
-                source = self.compilation_unit.get_source_by_id(f)
+                source = self.compilation_unit.get_source_by_id(f, self.contract.build_info)
             except KeyError:
                 source = self.contract.generated_sources[f]
             node = source.ast.find_by_range(s, s + l)
@@ -240,24 +251,11 @@ class Source:
     """
     _source_text: str
 
-    """
-    A map of byte offsets to (line, column)-pairs.
-    """
-    _positions: dict[int, LineColumn]
-
-    """
-    A map of (line, column)-pairs to byte offsets.
-    """
-    _offsets: dict[LineColumn, int]
-
     def __init__(self, uuid: int, name: str, json: Json, source_text: str):
         self._uuid = uuid
         self._name = name
         self._json = json
         self._source_text = source_text
-        self._positions = {}
-        self._offsets = {}
-        self._cache_source_map()
 
     @property
     def uuid(self) -> int:
@@ -290,22 +288,26 @@ class Source:
 
         lines and columns start at 1.
         """
-        return self._positions[offset]
+        if not 0 <= offset < len(self._source_text):
+            raise KeyError(offset)
+        line = bisect_right(self._line_starts, offset)
+        line_prefix = self._source_text[self._line_starts[line - 1] : offset]
+        column = 1 + (len(line_prefix) if line_prefix.isascii() else len(line_prefix.encode('utf-8')))
+        return (line, column)
 
     @property
     def source_text(self) -> str:
         return self._source_text
 
-    def _cache_source_map(self) -> None:
-        line, column = (1, 1)
-        for offset in range(len(self.source_text)):
-            self._positions[offset] = (line, column)
-            self._offsets[(line, column)] = offset
-            char = self.source_text[offset]
-            if char == '\n':
-                line, column = (line + 1, 1)
-            else:
-                column = column + len(char.encode('utf-8'))
+    @cached_property
+    def _line_starts(self) -> list[int]:
+        """The offsets at which the lines of the source text start, computed on first use."""
+        line_starts = [0]
+        newline = self._source_text.find('\n')
+        while newline != -1:
+            line_starts.append(newline + 1)
+            newline = self._source_text.find('\n', newline + 1)
+        return line_starts
 
     @property
     def name(self) -> str:
@@ -316,18 +318,13 @@ class ContractSource:
     _uuid: int
     _json: Any
     _compilation_unit: CompilationUnit
+    _build_info: str
 
-    _source_map: ContractSourceMap
-    _init_source_map: ContractSourceMap
-
-    def __init__(self, id: int, json: Any, compilation_unit: CompilationUnit) -> None:
+    def __init__(self, id: int, json: Any, compilation_unit: CompilationUnit, build_info: str) -> None:
         self._uuid = id
         self._json = json
         self._compilation_unit = compilation_unit
-        self._source_map = {}
-        self._init_source_map = {}
-        self._cache_source_map()
-        self._cache_init_source_map()
+        self._build_info = build_info
 
     @property
     def uuid(self) -> int:
@@ -336,6 +333,13 @@ class ContractSource:
         """
         return self._uuid
 
+    @property
+    def build_info(self) -> str:
+        """
+        The name of the build-info file the contract was loaded from.
+        """
+        return self._build_info
+
     @cached_property
     def generated_sources(self) -> dict[int, Source]:
         """
@@ -357,117 +361,442 @@ class ContractSource:
 
     @cached_property
     def instructions(self) -> list[Instruction]:
-        def map(offset: int, instruction: pyevmasm.Instruction) -> Instruction:
-            source_map_entry = self._source_map.get(offset, (-1, -1, -1, '-', 0))
-            return Instruction(instruction, self._compilation_unit, self, source_map_entry, offset)
-
-        return [
-            map(offset, instruction)
-            for offset, instruction in enumerate(pyevmasm.disassemble_all(self.get_deployed_bytecode))
-        ]
+        return [self._instruction(offset) for offset in range(len(self._instruction_pcs))]
 
     @cached_property
     def init_instructions(self) -> list[Instruction]:
-        def map(offset: int, instruction: pyevmasm.Instruction) -> Instruction:
-            source_map_entry = self._init_source_map.get(offset, (-1, -1, -1, '-', 0))
-            return Instruction(instruction, self._compilation_unit, self, source_map_entry, offset)
+        return [self._init_instruction(offset) for offset in range(len(self._init_instruction_pcs))]
 
-        return [
-            map(offset, instruction)
-            for offset, instruction in enumerate(pyevmasm.disassemble_all(self.get_init_bytecode))
-        ]
+    @cached_property
+    def _instruction_pcs(self) -> array[int]:
+        return self._compilation_unit.disassembly.instruction_pcs(self.get_deployed_bytecode)
+
+    @cached_property
+    def _init_instruction_pcs(self) -> array[int]:
+        return self._compilation_unit.disassembly.instruction_pcs(self.get_init_bytecode)
 
     @cached_property
-    def pc_to_instruction_offsets(self) -> dict[int, int]:
-        result = {}
-        for i, instr in enumerate(self.instructions):
-            pc_start = instr.pc
-            pc_end = instr.pc + instr.operand_size + 1
-            for pc in range(pc_start, pc_end):
-                result[pc] = i
-        return result
+    def pc_to_instruction_offsets(self) -> array[int]:
+        return map_pcs_to_instructions(self.get_deployed_bytecode, self._instruction_pcs)
 
     @cached_property
-    def init_pc_to_instruction_offsets(self) -> dict[int, int]:
-        result = {}
-        for i, instr in enumerate(self.init_instructions):
-            pc_start = instr.pc
-            pc_end = instr.pc + instr.operand_size + 1
-            for pc in range(pc_start, pc_end):
-                result[pc] = i
-        return result
+    def init_pc_to_instruction_offsets(self) -> array[int]:
+        return map_pcs_to_instructions(self.get_init_bytecode, self._init_instruction_pcs)
+
+    @cache  # noqa: B019
+    def _instruction(self, offset: int) -> Instruction:
+        data = disassemble_at(self.get_deployed_bytecode, self._instruction_pcs[offset])
+        source_map_entry = self._source_map.get(offset, (-1, -1, -1, '-', 0))
+        return Instruction(data, self._compilation_unit, self, source_map_entry, offset)
+
+    @cache  # noqa: B019
+    def _init_instruction(self, offset: int) -> Instruction:
+        data = disassemble_at(self.get_init_bytecode, self._init_instruction_pcs[offset])
+        source_map_entry = self._init_source_map.get(offset, (-1, -1, -1, '-', 0))
+        return Instruction(data, self._compilation_unit, self, source_map_entry, offset)
 
     def instruction_by_pc(self, pc: int) -> Instruction:
-        offset = self.pc_to_instruction_offsets[pc]
-        return self.instructions[offset]
+        if not 0 <= pc < len(self.pc_to_instruction_offsets):
+            raise KeyError(pc)
+        return self._instruction(self.pc_to_instruction_offsets[pc])
 
     def init_instruction_by_pc(self, pc: int) -> Instruction:
-        offset = self.init_pc_to_instruction_offsets[pc]
-        return self.init_instructions[offset]
+        if not 0 <= pc < len(self.init_pc_to_instruction_offsets):
+            raise KeyError(pc)
+        return self._init_instruction(self.init_pc_to_instruction_offsets[pc])
 
     @cached_property
     def get_deployed_bytecode(self) -> bytes:
-        ref = self._json.get('evm') if 'evm' in self._json else self._json
-        raw = ref.get('deployedBytecode').get('object').removeprefix('0x')
-        link_refs = [
-            (rng['start'], rng['length'])
-            for _, lref in ref.get('deployedBytecode').get('linkReferences', {}).items()
-            for _, ranges in lref.items()
-            for rng in ranges
-        ]
-        for ref_start, ref_len in link_refs:
-            placeholder_start = ref_start * 2
-            placeholder_len = ref_len * 2
-            raw = raw[:placeholder_start] + ''.zfill(40) + raw[placeholder_start + placeholder_len :]
-
-        return bytes.fromhex(raw)
+        return deployed_bytecode(self._json)
 
     @cached_property
     def get_init_bytecode(self) -> bytes:
-        ref = self._json.get('evm') if 'evm' in self._json else self._json
-        raw = ref.get('bytecode').get('object').removeprefix('0x')
-        return bytes.fromhex(raw)
+        return init_bytecode(self._json)
 
-    def _cache_source_map(self) -> None:
+    @cached_property
+    def _source_map(self) -> ContractSourceMap:
         ref = self._json.get('evm') if 'evm' in self._json else self._json
-        raw = ref.get('deployedBytecode', {}).get('sourceMap', '')
-        instrs_srcmap = raw.split(';')
-        s, l, f, j, m = (0, 0, 0, '', 0)  # noqa: E741
-        for i, instr_srcmap in enumerate(instrs_srcmap):
-            fields = instr_srcmap.split(':')
-            s = int(fields[0]) if len(fields) > 0 and fields[0] else s
-            l = int(fields[1]) if len(fields) > 1 and fields[1] else l  # noqa: E741
-            f = int(fields[2]) if len(fields) > 2 and fields[2] else f
-            j = fields[3] if len(fields) > 3 and fields[3] else j
-            m = int(fields[4]) if len(fields) > 4 and fields[4] else m
-            self._source_map[i] = (s, l, f, j, m)
-
-    def _cache_init_source_map(self) -> None:
+        return parse_source_map(ref.get('deployedBytecode', {}).get('sourceMap', ''))
+
+    @cached_property
+    def _init_source_map(self) -> ContractSourceMap:
         ref = self._json.get('evm') if 'evm' in self._json else self._json
-        raw = ref.get('bytecode', {}).get('sourceMap', '')
-        instrs_srcmap = raw.split(';')
-        s, l, f, j, m = (0, 0, 0, '', 0)  # noqa: E741
-        for i, instr_srcmap in enumerate(instrs_srcmap):
-            fields = instr_srcmap.split(':')
-            s = int(fields[0]) if len(fields) > 0 and fields[0] else s
-            l = int(fields[1]) if len(fields) > 1 and fields[1] else l  # noqa: E741
-            f = int(fields[2]) if len(fields) > 2 and fields[2] else f
-            j = fields[3] if len(fields) > 3 and fields[3] else j
-            m = int(fields[4]) if len(fields) > 4 and fields[4] else m
-            self._init_source_map[i] = (s, l, f, j, m)
+        return parse_source_map(ref.get('bytecode', {}).get('sourceMap', ''))
+
+
+def deployed_bytecode(contract_json: Json) -> bytes:
+    """Return the deployed bytecode of a contract, with zeros in place of the addresses of linked libraries."""
+    ref = contract_json.get('evm') or contract_json
+    bytecode = ref.get('deployedBytecode') or {}
+    raw = bytecode.get('object', '').removeprefix('0x')
+    link_refs = [
+        (rng['start'], rng['length'])
+        for _, lref in bytecode.get('linkReferences', {}).items()
+        for _, ranges in lref.items()
+        for rng in ranges
+    ]
+    for ref_start, ref_len in link_refs:
+        placeholder_start = ref_start * 2
+        placeholder_len = ref_len * 2
+        raw = raw[:placeholder_start] + ''.zfill(40) + raw[placeholder_start + placeholder_len :]
+
+    return bytes.fromhex(raw)
+
+
+def init_bytecode(contract_json: Json) -> bytes:
+    ref = contract_json.get('evm') or contract_json
+    bytecode = ref.get('bytecode') or {}
+    raw = bytecode.get('object', '').removeprefix('0x')
+    return bytes.fromhex(raw)
+
+
+def parse_source_map(raw: str) -> ContractSourceMap:
+    source_map: ContractSourceMap = {}
+    instrs_srcmap = raw.split(';')
+    s, l, f, j, m = (0, 0, 0, '', 0)  # noqa: E741
+    for i, instr_srcmap in enumerate(instrs_srcmap):
+        fields = instr_srcmap.split(':')
+        s = int(fields[0]) if len(fields) > 0 and fields[0] else s
+        l = int(fields[1]) if len(fields) > 1 and fields[1] else l  # noqa: E741
+        f = int(fields[2]) if len(fields) > 2 and fields[2] else f
+        j = fields[3] if len(fields) > 3 and fields[3] else j
+        m = int(fields[4]) if len(fields) > 4 and fields[4] else m
+        source_map[i] = (s, l, f, j, m)
+    return source_map
+
+
+def disassemble_at(bytecode: bytes, pc: int) -> pyevmasm.Instruction:
+    """Disassemble the instruction starting at `pc`, which reads at most 32 bytes of operand."""
+    return pyevmasm.disassemble_one(bytecode[pc : pc + 33], pc=pc)
+
+
+def map_pcs_to_instructions(bytecode: bytes, instruction_pcs: array[int]) -> array[int]:
+    """Map each pc in the bytecode to the offset of the instruction it is part of, given where the instructions start.
+
+    A truncated final `PUSH` is not an instruction, so its pcs are not mapped.
+    """
+    if not instruction_pcs:
+        return array('I')
+    last_instruction = disassemble_at(bytecode, instruction_pcs[-1])
+    code_end = last_instruction.pc + last_instruction.operand_size + 1
+    offsets = array('I', [0]) * code_end
+    for offset, (start, end) in enumerate(zip(instruction_pcs, [*instruction_pcs[1:], code_end], strict=True)):
+        offsets[start:end] = array('I', [offset]) * (end - start)
+    return offsets
+
+
+class DisassemblyCache:
+    """Where the instructions of EVM bytecode start, stored in `cache_dir`, if given, keyed by the hash of the bytecode.
+
+    With the start of each instruction known, instructions are only disassembled one at a time, once looked up.
+    """
+
+    _cache_dir: Path | None
+
+    def __init__(self, cache_dir: Path | None = None) -> None:
+        self._cache_dir = cache_dir
+
+    def instruction_pcs(self, bytecode: bytes) -> array[int]:
+        cache_file = None
+        if self._cache_dir is not None:
+            cache_file = self._cache_dir / f'{hashlib.sha256(bytecode).hexdigest()}.pcs'
+            try:
+                instruction_pcs = array('I')
+                instruction_pcs.frombytes(cache_file.read_bytes())
+                return instruction_pcs
+            except (FileNotFoundError, ValueError):
+                pass
+
+        instruction_pcs = array('I', (instruction.pc for instruction in pyevmasm.disassemble_all(bytecode)))
+        if cache_file is not None:
+            try:
+                cache_file.parent.mkdir(parents=True, exist_ok=True)
+                tmp_file = cache_file.with_name(f'{cache_file.name}.{os.getpid()}.tmp')
+                tmp_file.write_bytes(instruction_pcs.tobytes())
+                os.replace(tmp_file, cache_file)
+            except OSError as err:
+                _LOGGER.warning(f'Could not store disassembly in {self._cache_dir}: {err}')
+        return instruction_pcs
+
+
+class BuildInfoContract(NamedTuple):
+    """Where the standard JSON of a contract is stored in a build-info file, and the keys it is looked up by.
+
+    `start` and `end` are byte offsets into the file. `cbor_data` is the hex encoded CBOR metadata at the end of the
+    deployed bytecode, and `init_code_hash` the SHA-256 of the init bytecode, or `None` if it is not linked.
+    """
+
+    build_info: str
+    source_name: str
+    contract_name: str
+    start: int
+    end: int
+    cbor_data: str
+    init_code_hash: str | None
+
+    @property
+    def name(self) -> str:
+        return f'{self.source_name}:{self.contract_name}'
+
+
+class BuildInfoSource(NamedTuple):
+    """Where a source unit is stored in a build-info file.
+
+    `start` and `end` delimit its output JSON, and `content_start` and `content_end` the JSON string holding its text,
+    or are `None` if the build-info file does not include the text.
+    """
+
+    build_info: str
+    name: str
+    id: int
+    start: int
+    end: int
+    content_start: int | None
+    content_end: int | None
+
+
+class BuildInfoIndex:
+    """The contracts and sources of all the build-info files in a directory, and where each file stores them.
+
+    Build-info files are only scanned when they are not yet recorded in `index_file` or changed since, so that a
+    contract can be loaded by reading just its byte range. When several files define a contract, the newest one wins.
+    """
+
+    _build_info_dir: Path
+    _entries: dict[str, dict[str, Any]]  # Build-info file name => entry, oldest file first
+
+    contracts_by_cbor_data: dict[bytes, BuildInfoContract]
+    contracts_by_init_code_hash: dict[str, BuildInfoContract]
+    contracts_by_name: dict[str, BuildInfoContract]
+    sources_by_id: dict[tuple[str, int], BuildInfoSource]
+
+    def __init__(self, build_info_dir: Path, index_file: Path | None = None) -> None:
+        self._build_info_dir = build_info_dir
+        stored_entries: dict[str, dict[str, Any]] = {}
+        if index_file is not None:
+            try:
+                stored_entries = json.loads(index_file.read_text())
+            except (FileNotFoundError, ValueError):
+                pass
+
+        self._entries = {}
+        updated_entries: dict[str, dict[str, Any]] = {}
+        for build_info in sorted(build_info_dir.glob('*.json'), key=os.path.getmtime):
+            build_info_stat = build_info.stat()
+            stamp = [build_info_stat.st_mtime_ns, build_info_stat.st_size, VERSION]
+            entry = stored_entries.get(build_info.name)
+            if entry is None or entry['stamp'] != stamp:
+                _LOGGER.info(f'Indexing build-info file: {build_info}')
+                try:
+                    entry = {'stamp': stamp, **scan_build_info(build_info)}
+                except (ValueError, KeyError, TypeError) as err:
+                    _LOGGER.warning(f'Skipping build-info file that could not be indexed: {build_info}: {err}')
+                    continue
+                updated_entries[build_info.name] = entry
+            self._entries[build_info.name] = entry
+
+        if index_file is not None and (updated_entries or stored_entries.keys() - self._entries.keys()):
+            self._store(index_file, updated_entries)
+
+        self.contracts_by_cbor_data = {}
+        self.contracts_by_init_code_hash = {}
+        self.contracts_by_name = {}
+        self.sources_by_id = {}
+        for build_info_name, entry in self._entries.items():
+            for source_name, source_entry in entry['sources'].items():
+                source = BuildInfoSource(build_info_name, source_name, *source_entry)
+                self.sources_by_id[build_info_name, source.id] = source
+            for contract_entry in entry['contracts']:
+                contract = BuildInfoContract(build_info_name, *contract_entry)
+                self.contracts_by_cbor_data[bytes.fromhex(contract.cbor_data)] = contract
+                if contract.init_code_hash is not None:
+                    self.contracts_by_init_code_hash[contract.init_code_hash] = contract
+                self.contracts_by_name[contract.name] = contract
+
+    @cached_property
+    def cbor_data_lengths(self) -> dict[bytes, list[int]]:
+        """The lengths of the indexed CBOR metadata, grouped by their first `CBOR_PREFIX_LENGTH` bytes.
+
+        Solidity metadata of the same kind shares a prefix, so there are only a few groups to search bytecode for.
+        """
+        lengths: dict[bytes, set[int]] = {}
+        for cbor_data in self.contracts_by_cbor_data:
+            if cbor_data:
+                lengths.setdefault(cbor_data[:CBOR_PREFIX_LENGTH], set()).add(len(cbor_data))
+        return {prefix: sorted(prefix_lengths) for prefix, prefix_lengths in lengths.items()}
+
+    def _store(self, index_file: Path, updated_entries: dict[str, dict[str, Any]]) -> None:
+        build_info_dir = self._build_info_dir
+
+        def merge(entries: dict[str, Any]) -> None:
+            entries.update(updated_entries)
+            for build_info_name in list(entries):
+                if not (build_info_dir / build_info_name).exists():
+                    del entries[build_info_name]
+
+        try:
+            locked_json_update(index_file, merge)
+        except OSError as err:
+            _LOGGER.warning(f'Could not update build-info index {index_file}: {err}')
+
+    @property
+    def build_infos(self) -> list[str]:
+        """The names of the indexed build-info files, oldest first."""
+        return list(self._entries)
+
+    @property
+    def newest_build_info(self) -> str | None:
+        return next(reversed(self._entries), None)
+
+    def build_id(self, build_info: str) -> str:
+        return self._entries[build_info]['id']
+
+    def read(self, build_info: str, start: int, end: int) -> Any:
+        """Parse the JSON value stored at the byte range from `start` to `end` in `build_info`."""
+        with open(self._build_info_dir / build_info, 'rb') as f:
+            f.seek(start)
+            return json.loads(f.read(end - start))
+
+
+_JSON_DECODER = json.JSONDecoder()
+_JSON_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+def _scan_object(text: str, pos: int, visit: Callable[[str, int], int | None]) -> int:
+    """Scan the JSON object starting at `pos`, calling `visit` with the key and the start of each member value.
+
+    `visit` returns the end of the value if it scanned it, or `None` to have it skipped. Returns the end of the object.
+    """
+
+    def skip_whitespace(pos: int) -> int:
+        match = _JSON_WHITESPACE.match(text, pos)
+        assert match is not None
+        return match.end()
+
+    def expect(pos: int, char: str) -> int:
+        if text[pos : pos + 1] != char:
+            raise ValueError(f'Expected {char!r} at offset {pos}')
+        return skip_whitespace(pos + 1)
+
+    pos = expect(skip_whitespace(pos), '{')
+    if text[pos : pos + 1] == '}':
+        return pos + 1
+    while True:
+        if text[pos : pos + 1] != '"':
+            raise ValueError(f'Expected object key at offset {pos}')
+        key, pos = _JSON_DECODER.raw_decode(text, pos)
+        pos = expect(skip_whitespace(pos), ':')
+        end = visit(key, pos)
+        pos = skip_whitespace(end if end is not None else _JSON_DECODER.raw_decode(text, pos)[1])
+        if text[pos : pos + 1] == '}':
+            return pos + 1
+        pos = expect(pos, ',')
+
+
+def scan_build_info(build_info: Path) -> dict[str, Any]:
+    """Return the build id of a build-info file, and where it stores each contract and source.
+
+    Every value is parsed once, to find where it ends, but only the contracts are kept in memory, one at a time.
+    """
+    # Decoded as Latin-1 every byte is one character, so the offsets into the text are byte offsets into the file
+    text = build_info.read_bytes().decode('latin-1')
+    build_id = None
+    sources: dict[str, list[Any]] = {}
+    contents: dict[str, tuple[int, int]] = {}
+    contracts: list[list[Any]] = []
+
+    def utf8(key: str) -> str:
+        return key.encode('latin-1').decode('utf-8')
+
+    def visit_build_info(key: str, pos: int) -> int | None:
+        nonlocal build_id
+        if key == 'id':
+            build_id, end = _JSON_DECODER.raw_decode(text, pos)
+            return end
+        if key == 'input':
+            return _scan_object(text, pos, lambda key, pos: visit_input_sources(pos) if key == 'sources' else None)
+        if key == 'output':
+            return _scan_object(text, pos, visit_output)
+        return None
+
+    def visit_input_sources(pos: int) -> int:
+        def visit_input_source(source_name: str, pos: int) -> int:
+            def visit_content(key: str, pos: int) -> int | None:
+                if key != 'content':
+                    return None
+                end = _JSON_DECODER.raw_decode(text, pos)[1]
+                contents[source_name] = (pos, end)
+                return end
+
+            return _scan_object(text, pos, visit_content)
+
+        return _scan_object(text, pos, lambda key, pos: visit_input_source(utf8(key), pos))
+
+    def visit_output(key: str, pos: int) -> int | None:
+        if key == 'sources':
+            return _scan_object(text, pos, visit_output_source)
+        if key == 'contracts':
+            return _scan_object(text, pos, lambda key, pos: visit_output_contracts(utf8(key), pos))
+        return None
+
+    def visit_output_source(key: str, pos: int) -> int:
+        source_json, end = _JSON_DECODER.raw_decode(text, pos)
+        sources[utf8(key)] = [source_json['id'], pos, end]
+        return end
+
+    def visit_output_contracts(source_name: str, pos: int) -> int:
+        def visit_contract(key: str, pos: int) -> int:
+            contract_json, end = _JSON_DECODER.raw_decode(text, pos)
+            try:
+                bytecode = deployed_bytecode(contract_json)
+            except (AttributeError, KeyError, TypeError, ValueError):
+                return end
+            if not bytecode:
+                return end
+            try:
+                init_code_hash: str | None = hashlib.sha256(init_bytecode(contract_json)).hexdigest()
+            except (AttributeError, KeyError, TypeError, ValueError):
+                init_code_hash = None
+            cbor_data = CompilationUnit.get_cbor_data(bytecode).hex()
+            contracts.append([source_name, utf8(key), pos, end, cbor_data, init_code_hash])
+            return end
+
+        return _scan_object(text, pos, visit_contract)
+
+    _scan_object(text, 0, visit_build_info)
+    if not isinstance(build_id, str):
+        raise ValueError('Missing build id')
+    return {
+        'id': build_id,
+        'sources': {
+            source_name: [*source_entry, *contents.get(source_name, (None, None))]
+            for source_name, source_entry in sources.items()
+        },
+        'contracts': contracts,
+    }
 
 
 class CompilationUnit:
-    """Easy access to Solidity standard json"""
+    """Easy access to the Solidity standard json of the build-info files of a project.
+
+    Contracts and sources are only read from the build-info files when they are first looked up.
+    """
 
     _id: int
-    _sources: dict[int, Source]  # Source UUID => Source
-    _contracts: dict[bytes, ContractSource]
+    _index: BuildInfoIndex
+    _sources: dict[tuple[str, int], Source]  # Build-info file, source id => Source
+    _contracts: dict[BuildInfoContract, ContractSource]
+    _resolved_bytecodes: dict[bytes, tuple[BuildInfoContract | None, BuildInfoContract | None]]
 
-    def __init__(self, id: int, sources: dict[int, Source], contracts: dict[bytes, ContractSource]):
+    disassembly: DisassemblyCache
+
+    def __init__(self, id: int, index: BuildInfoIndex, disassembly: DisassemblyCache | None = None):
         self._id = id
-        self._sources = sources
-        self._contracts = contracts
+        self._index = index
+        self.disassembly = disassembly if disassembly is not None else DisassemblyCache()
+        self._sources = {}
+        self._contracts = {}
+        self._resolved_bytecodes = {}
 
     @property
     def uuid(self) -> int:
@@ -477,48 +806,58 @@ class CompilationUnit:
         return self._id
 
     @staticmethod
-    def load_build_info(foundry_build_info: Path) -> CompilationUnit:
-        build_info_files = foundry_build_info.glob('*.json')
-        build_info = json.loads(max(build_info_files, key=os.path.getmtime).read_text())
-        sources: dict[int, Source] = {}  # Source id => Source
-        contracts: dict[bytes, ContractSource] = {}  # CBOR metadata => contract
-        compilation_unit_uuid = to_uuid(build_info['id'])
-        compilation_unit = CompilationUnit(compilation_unit_uuid, sources, contracts)
-        try:
-            for source_name, source_json in build_info.get('output', {}).get('sources', {}).items():
-                source_uuid = to_uuid(f'{compilation_unit_uuid}:{source_name}')
-                source_text = build_info.get('input', {}).get('sources', {}).get(source_name, {}).get('content', '')
-                source = Source(source_uuid, source_name, source_json, source_text)
-                sources[source_uuid] = source
-                contracts_json = build_info.get('output', {}).get('contracts', {}).get(source_name, {})
-                for contract_name, contract_json in contracts_json.items():
-                    contract_uuid = to_uuid(f'{source_uuid}:{contract_name}')
-                    contract = ContractSource(contract_uuid, contract_json, compilation_unit)
-                    contract_bytecode = contract.get_deployed_bytecode
-                    cbor_data = CompilationUnit.get_cbor_data(contract_bytecode)
-                    contracts[cbor_data] = contract
-
-                    # Add all generated sources
-                    for generated_source in contract.generated_sources.values():
-                        sources[generated_source.uuid] = generated_source
-
-        except (KeyError, IndexError):
-            _LOGGER.error(
-                '.output.contracts.$contract_name.evm.deployedBytecode.generatedSources not found in build-info file.'
-            )
-        except FileNotFoundError:
-            _LOGGER.error('No build-info file found in build-info directory.')
+    def load_build_info(foundry_build_info: Path, index_file: Path | None = None) -> CompilationUnit:
+        """Index the build-info files in `foundry_build_info`, keeping the index in `index_file` if given.
 
-        return compilation_unit
+        Disassembled bytecode is then kept next to the index, in the `DISASSEMBLY_CACHE_DIR` directory.
+        """
+        index = BuildInfoIndex(foundry_build_info, index_file)
+        disassembly = DisassemblyCache(index_file.parent / DISASSEMBLY_CACHE_DIR if index_file is not None else None)
+        if not index.build_infos:
+            _LOGGER.error('No build-info file found in build-info directory.')
+        compilation_unit_uuid = to_uuid(':'.join(index.build_id(build_info) for build_info in index.build_infos))
+        return CompilationUnit(compilation_unit_uuid, index, disassembly)
+
+    def _source_uuid(self, build_info: str, source_name: str) -> int:
+        return to_uuid(f'{to_uuid(self._index.build_id(build_info))}:{source_name}')
+
+    def _load_contract(self, entry: BuildInfoContract) -> ContractSource:
+        contract = self._contracts.get(entry)
+        if contract is None:
+            _LOGGER.debug(f'Loading contract {entry.name} from build-info file: {entry.build_info}')
+            contract_json = self._index.read(entry.build_info, entry.start, entry.end)
+            contract_uuid = to_uuid(f'{self._source_uuid(entry.build_info, entry.source_name)}:{entry.contract_name}')
+            contract = ContractSource(contract_uuid, contract_json, self, entry.build_info)
+            self._contracts[entry] = contract
+        return contract
 
     def get_instruction(self, contract_bytecode: bytes, pc: int) -> Instruction:
+        init_entry, entry = self._resolve_bytecode(contract_bytecode)
+
         # First try to match init bytecode 1-to-1
-        try:
-            contract_source = self.get_contract_by_initcode(contract_bytecode)
-            return contract_source.init_instruction_by_pc(pc)
-        except Exception:
-            pass
+        if init_entry is not None:
+            try:
+                return self._load_contract(init_entry).init_instruction_by_pc(pc)
+            except Exception:
+                pass
 
+        if entry is None:
+            raise Exception('Contract not found.')
+        return self._load_contract(entry).instruction_by_pc(pc)
+
+    def _resolve_bytecode(self, contract_bytecode: bytes) -> tuple[BuildInfoContract | None, BuildInfoContract | None]:
+        """Return the contracts with `contract_bytecode` as init code and as deployed code, if found.
+
+        Printing a proof looks up the same few bytecodes for every node, so each one is only resolved once.
+        """
+        resolved = self._resolved_bytecodes.get(contract_bytecode)
+        if resolved is None:
+            init_entry = self._index.contracts_by_init_code_hash.get(hashlib.sha256(contract_bytecode).hexdigest())
+            resolved = (init_entry, self._find_by_cbor_data(contract_bytecode))
+            self._resolved_bytecodes[contract_bytecode] = resolved
+        return resolved
+
+    def _find_by_cbor_data(self, contract_bytecode: bytes) -> BuildInfoContract | None:
         # We cannot identify the contract by the full deployed bytecode.
 
         # The deployed bytecode on-chain can be different from the
@@ -530,25 +869,41 @@ class CompilationUnit:
 
         # We don't actually need to decode it, we just need to know the length of the metadata.
         cbor_data = CompilationUnit.get_cbor_data(contract_bytecode)
-        contract = self._contracts.get(cbor_data, None)
-        if contract is not None:
-            return contract.instruction_by_pc(pc)
+        entry = self._index.contracts_by_cbor_data.get(cbor_data, None)
+        if entry is not None:
+            return entry
 
         # The former method can fail to detect the contract, if the CBOR_DATA
-        # is not at the end of the bytecode. In this case we use this slower
-        # method to find the contract. Notice, that it is possible to trick
-        # the method into return the wrong contract by copying the CBOR_DATA
-        # of another contract into the malicuous contract's bytecode.
-        for cbor_data, contract in self._contracts.items():
-            if cbor_data in contract_bytecode:
-                return contract.instruction_by_pc(pc)
-        raise Exception('Contract not found.')
+        # is not at the end of the bytecode. In this case we look up the CBOR_DATA
+        # starting at every occurrence of a known CBOR_DATA prefix, and take the last
+        # match, since a contract's own metadata follows any contract code it embeds.
+        # Notice, that it is possible to trick the method into return the wrong contract
+        # by copying the CBOR_DATA of another contract into the malicuous contract's bytecode.
+        contracts_by_cbor_data = self._index.contracts_by_cbor_data
+        last_match: tuple[int, BuildInfoContract] | None = None
+        for prefix, lengths in self._index.cbor_data_lengths.items():
+            start = contract_bytecode.rfind(prefix)
+            while start != -1 and (last_match is None or start > last_match[0]):
+                candidates = (contract_bytecode[start : start + length] for length in lengths)
+                entry = next((contracts_by_cbor_data[c] for c in candidates if c in contracts_by_cbor_data), None)
+                if entry is not None:
+                    last_match = (start, entry)
+                    break
+                start = contract_bytecode.rfind(prefix, 0, start + len(prefix) - 1)
+        return last_match[1] if last_match is not None else None
 
     def get_contract_by_initcode(self, bytecode: bytes) -> ContractSource:
-        for contract in self._contracts.values():
-            if contract.get_init_bytecode == bytecode:
-                return contract
-        raise Exception('Contract initialization code not found.')
+        entry = self._index.contracts_by_init_code_hash.get(hashlib.sha256(bytecode).hexdigest())
+        if entry is None:
+            raise Exception('Contract initialization code not found.')
+        return self._load_contract(entry)
+
+    def get_contract_by_name(self, name: str) -> ContractSource:
+        """Return the contract with the given fully qualified name, i.e. `<source name>:<contract name>`."""
+        entry = self._index.contracts_by_name.get(name)
+        if entry is None:
+            raise KeyError(f'Contract not found: {name}')
+        return self._load_contract(entry)
 
     @staticmethod
     def get_cbor_data(contract_bytecode: bytes) -> bytes:
@@ -559,11 +914,24 @@ class CompilationUnit:
         cbor_data = contract_bytecode[-cbor_length - 2 : -2]  # type: ignore
         return cbor_data
 
-    def get_source_by_id(self, source_id: int) -> Source:
-        for source in self._sources.values():
-            if source.id == source_id:
-                return source
-        raise KeyError('Source not found.')
+    def get_source_by_id(self, source_id: int, build_info: str | None = None) -> Source:
+        """Return the source with the given id in `build_info`, or in the newest build-info file if not given."""
+        if build_info is None:
+            build_info = self._index.newest_build_info
+        if build_info is None:
+            raise KeyError('Source not found.')
+        source = self._sources.get((build_info, source_id))
+        if source is None:
+            entry = self._index.sources_by_id.get((build_info, source_id))
+            if entry is None:
+                raise KeyError('Source not found.')
+            source_json = self._index.read(build_info, entry.start, entry.end)
+            source_text = ''
+            if entry.content_start is not None and entry.content_end is not None:
+                source_text = self._index.read(build_info, entry.content_start, entry.content_end)
+            source = Source(self._source_uuid(build_info, entry.name), entry.name, source_json, source_text)
+            self._sources[build_info, source_id] = source
+        return source
 
 
 def to_uuid(s: str) -> int:
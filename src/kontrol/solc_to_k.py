@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import ast
+import hashlib
 import json
 import logging
 import re
@@ -15,15 +16,14 @@ from pyk.kast.prelude.kbool import TRUE
 from pyk.kast.prelude.kint import eqInt, intToken, ltInt
 from pyk.utils import hash_str, single
 
-from .utils import _read_digest_file
-
 if TYPE_CHECKING:
-    from collections.abc import Iterable
-    from pathlib import Path
-    from typing import Final
+    from collections.abc import Iterable, Mapping
+    from typing import Any, Final
 
     from pyk.kast import KInner
 
+    from .utils import DigestStore
+
 
 _LOGGER: Final = logging.getLogger(__name__)
 
@@ -438,16 +438,11 @@ class Contract:
         def qualified_name(self) -> str:
             return f'{self.contract_name}.init'
 
-        def up_to_date(self, digest_file: Path) -> bool:
-            digest_dict = _read_digest_file(digest_file)
-            return digest_dict.get('methods', {}).get(self.qualified_name, {}).get('method', '') == self.digest
-
-        def update_digest(self, digest_file: Path) -> None:
-            digest_dict = _read_digest_file(digest_file)
-            digest_dict['methods'][self.qualified_name] = {'method': self.digest}
-            digest_file.write_text(json.dumps(digest_dict, indent=4))
+        def up_to_date(self, digest: DigestStore) -> bool:
+            return digest.method(self.qualified_name).get('method', '') == self.digest
 
-            _LOGGER.info(f'Updated method {self.qualified_name} in digest file: {digest_file}')
+        def update_digest(self, digest: DigestStore) -> None:
+            digest.set_method(self.qualified_name, {'method': self.digest})
 
         @cached_property
         def digest(self) -> str:
@@ -622,22 +617,14 @@ class Contract:
             except ValueError:
                 return None
 
-        def up_to_date(self, digest_file: Path) -> bool:
-            digest_dict = _read_digest_file(digest_file)
-            return digest_dict.get('methods', {}).get(self.qualified_name, {}).get('method', '') == self.digest
+        def up_to_date(self, digest: DigestStore) -> bool:
+            return digest.method(self.qualified_name).get('method', '') == self.digest
 
-        def contract_up_to_date(self, digest_file: Path) -> bool:
-            digest_dict = _read_digest_file(digest_file)
-            return (
-                digest_dict.get('methods', {}).get(self.qualified_name, {}).get('contract', '') == self.contract_digest
-            )
+        def contract_up_to_date(self, digest: DigestStore) -> bool:
+            return digest.method(self.qualified_name).get('contract', '') == self.contract_digest
 
-        def update_digest(self, digest_file: Path) -> None:
-            digest_dict = _read_digest_file(digest_file)
-            digest_dict['methods'][self.qualified_name] = {'method': self.digest, 'contract': self.contract_digest}
-            digest_file.write_text(json.dumps(digest_dict, indent=4))
-
-            _LOGGER.info(f'Updated method {self.qualified_name} in digest file: {digest_file}')
+        def update_digest(self, digest: DigestStore) -> None:
+            digest.set_method(self.qualified_name, {'method': self.digest, 'contract': self.contract_digest})
 
         @cached_property
         def digest(self) -> str:
@@ -704,6 +691,7 @@ class Contract:
             return calldata
 
     _name: str
+    _fingerprint: str | None
     contract_json: dict
     contract_id: int
     contract_path: str
@@ -720,9 +708,12 @@ class Contract:
     error_selectors: dict[bytes, tuple[str, list[str]]]
     PREFIX_CODE: Final = 'Z'
 
-    def __init__(self, contract_name: str, contract_json: dict, foundry: bool = False) -> None:
+    def __init__(
+        self, contract_name: str, contract_json: dict, foundry: bool = False, fingerprint: str | None = None
+    ) -> None:
         self._name = contract_name
         self.contract_json = contract_json
+        self._fingerprint = fingerprint
 
         self.contract_id = self.contract_json['id']
         try:
@@ -836,12 +827,32 @@ class Contract:
             _c = Contract.Constructor(empty_constructor, self._name, self.digest, self.storage_digest, self.sort_method)
             self.constructor = _c
 
+    def compact(self) -> None:
+        """Drop the solc AST and the other artifact data that is only needed while parsing the contract.
+
+        Digests and storage fields are computed beforehand, and `contract_json` keeps only the storage layout.
+        """
+        for cached in ('name_with_path', 'digest', 'storage_digest', 'fields', 'has_storage_layout'):
+            getattr(self, cached)
+        for method in self.methods:
+            method.digest
+            method.ast = None
+        storage_layout = self.contract_json.get('storageLayout')
+        self.contract_json = {'storageLayout': storage_layout} if storage_layout is not None else {}
+
     @cached_property
     def name_with_path(self) -> str:
         return contract_name_with_path(self.contract_path, self._name)
 
+    @staticmethod
+    def artifact_digest(name_with_path: str, fingerprint: str) -> str:
+        return hash_str(f'{name_with_path} - {fingerprint}')
+
     @cached_property
     def digest(self) -> str:
+        # A fingerprint of the artifact file is much cheaper than serializing the whole JSON, AST included
+        if self._fingerprint is not None:
+            return Contract.artifact_digest(self.name_with_path, self._fingerprint)
         return hash_str(f'{self.name_with_path} - {json.dumps(self.contract_json, sort_keys=True)}')
 
     @cached_property
@@ -1161,23 +1172,97 @@ def find_function_calls(node: dict, fields: tuple[StorageField, ...]) -> list[st
 def _contract_name_from_bytecode(
     bytecode: bytes, contracts: dict[str, tuple[str, list[tuple[int, int]], list[tuple[int, int]]]]
 ) -> str | None:
-    for contract_name, (contract_deployed_bytecode, immutable_ranges, link_ranges) in contracts.items():
-        zeroed_bytecode = bytearray(bytecode)
+    return BytecodeIndex(contracts).contract_name(bytecode)
+
+
+def _mask_bytecode(bytecode: bytes, ranges: Iterable[tuple[int, int]]) -> bytearray:
+    zeroed_bytecode = bytearray(bytecode)
+    for start, length in ranges:
+        if start + length <= len(zeroed_bytecode):
+            zeroed_bytecode[start : start + length] = bytearray(length)
+        else:
+            break
+    return zeroed_bytecode
+
+
+class BytecodeKey(NamedTuple):
+    """What a `BytecodeIndex` needs of a deployed bytecode: its length, the ranges masked in lookups, and its hash."""
+
+    length: int
+    masked_ranges: tuple[tuple[int, int], ...]
+    sha256: str
+
+    @staticmethod
+    def from_bytecode(
+        deployed_bytecode: str, immutable_ranges: list[tuple[int, int]], link_ranges: list[tuple[int, int]]
+    ) -> BytecodeKey | None:
+        """The key of a deployed bytecode given in hex, with linked libraries zeroed, or `None` if it is not hex."""
         deployed_bytecode_str = re.sub(
             pattern='__\\$(.){34}\\$__',
             repl='0000000000000000000000000000000000000000',
-            string=contract_deployed_bytecode,
+            string=deployed_bytecode,
         )
-        deployed_bytecode = bytearray.fromhex(deployed_bytecode_str)
+        try:
+            bytecode = bytes.fromhex(deployed_bytecode_str)
+        except ValueError:
+            return None
+        masked_ranges = tuple((start, length) for start, length in immutable_ranges + link_ranges)
+        return BytecodeKey(len(bytecode), masked_ranges, hashlib.sha256(bytecode).hexdigest())
 
-        for start, length in immutable_ranges + link_ranges:
-            if start + length <= len(zeroed_bytecode):
-                zeroed_bytecode[start : start + length] = bytearray(length)
-            else:
-                break
-        if zeroed_bytecode == deployed_bytecode:
-            return contract_name
-    return None
+    @staticmethod
+    def from_list(lst: list[Any]) -> BytecodeKey:
+        length, masked_ranges, sha256 = lst
+        return BytecodeKey(length, tuple((start, size) for start, size in masked_ranges), sha256)
+
+    def to_list(self) -> list[Any]:
+        return [self.length, [list(masked_range) for masked_range in self.masked_ranges], self.sha256]
+
+
+class BytecodeIndex:
+    """Find the contract with a given deployed bytecode, ignoring the immutable and linked library ranges.
+
+    Contracts are grouped by the length of their deployed bytecode and the ranges masked before comparing, and keyed by
+    the hash of their deployed bytecode within a group. So a lookup only masks and hashes the bytecode once for each
+    group of its length, instead of comparing it against every contract. Where several contracts match, the first one
+    given wins. Lookups are memoized, since printing a configuration looks up the same few bytecodes many times.
+    """
+
+    _groups: dict[int, dict[tuple[tuple[int, int], ...], dict[str, tuple[int, str]]]]
+    _contract_names: dict[bytes, str | None]
+
+    def __init__(self, contracts: Mapping[str, tuple[str, list[tuple[int, int]], list[tuple[int, int]]]]) -> None:
+        self._groups = {}
+        self._contract_names = {}
+        self._add_keys(
+            {contract_name: BytecodeKey.from_bytecode(*bytecode) for contract_name, bytecode in contracts.items()}
+        )
+
+    @staticmethod
+    def from_keys(keys: Mapping[str, BytecodeKey | None]) -> BytecodeIndex:
+        """Build the index from the `BytecodeKey` of each contract, so that the contracts need not be loaded."""
+        index = BytecodeIndex({})
+        index._add_keys(keys)
+        return index
+
+    def _add_keys(self, keys: Mapping[str, BytecodeKey | None]) -> None:
+        for order, (contract_name, key) in enumerate(keys.items()):
+            if key is None:
+                _LOGGER.warning(f'Could not decode deployed bytecode of contract: {contract_name}')
+                continue
+            group = self._groups.setdefault(key.length, {}).setdefault(key.masked_ranges, {})
+            group.setdefault(key.sha256, (order, contract_name))
+
+    def contract_name(self, bytecode: bytes) -> str | None:
+        if bytecode in self._contract_names:
+            return self._contract_names[bytecode]
+        match: tuple[int, str] | None = None
+        for masked_ranges, group in self._groups.get(len(bytecode), {}).items():
+            found = group.get(hashlib.sha256(_mask_bytecode(bytecode, masked_ranges)).hexdigest())
+            if found is not None and (match is None or found < match):
+                match = found
+        contract_name = match[1] if match is not None else None
+        self._contract_names[bytecode] = contract_name
+        return contract_name
 
 
 def process_storage_layout(storage_layout: dict, interface_annotations: dict) -> tuple[StorageField, ...]:
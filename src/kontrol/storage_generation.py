@@ -90,11 +90,7 @@ def get_storage_layout_from_foundry(
 ) -> tuple[str, list[dict[str, Any]], dict[str, Any]]:
     """Get storage layout of the specific contract from the Foundry object."""
     # Find the contract in the Foundry object
-    contract = None
-    for contract_name_with_path, contract_obj in foundry.contracts.items():
-        if contract_name_with_path == contract_name.replace('/', '%'):
-            contract = contract_obj
-            break
+    contract = foundry.contracts.get(contract_name.replace('/', '%'))
 
     if not contract:
         available_contracts = list(foundry.contracts.keys())
@@ -1,18 +1,26 @@
 from __future__ import annotations
 
 import ast
+import fcntl
 import json
 import logging
+import pickle
 import re
+from contextlib import contextmanager
 from pathlib import Path
 from typing import TYPE_CHECKING
 
 import pyk
 from eth_abi import decode
+from pyk.kast.prelude.k import GENERATED_TOP_CELL
 from pyk.kbuild.utils import KVersion, k_version
 
 if TYPE_CHECKING:
-    from typing import Final
+    from collections.abc import Callable, Iterator
+    from typing import Any, Final
+
+    from pyk.kast.inner import KInner
+    from pyk.kast.outer import KDefinition
     from pyk.cterm import CTerm
     from argparse import Namespace
 
@@ -103,11 +111,167 @@ def _read_digest_file(digest_file: Path) -> dict:
     return digest_dict
 
 
-def kontrol_up_to_date(digest_file: Path) -> bool:
-    if not digest_file.exists():
+@contextmanager
+def file_lock(lock_file: Path) -> Iterator[None]:
+    """Hold an exclusive lock on `lock_file`, creating it if needed, for the duration of the context."""
+    with open(lock_file, 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def locked_json_update(json_file: Path, update: Callable[[dict[str, Any]], None]) -> dict[str, Any]:
+    """Apply `update` to the dictionary stored in `json_file` and return the new dictionary.
+
+    The file is read and written under an exclusive lock on a sibling `.lock` file, and replaced atomically, so that
+    concurrent kontrol processes do not lose each other's updates and readers never see a partially written file.
+    """
+    json_file.parent.mkdir(parents=True, exist_ok=True)
+    with file_lock(json_file.with_name(json_file.name + '.lock')):
+        dct = json.loads(json_file.read_text()) if json_file.exists() else {}
+        update(dct)
+        tmp_file = json_file.with_name(f'{json_file.name}.{os.getpid()}.tmp')
+        tmp_file.write_text(json.dumps(dct, indent=4))
+        os.replace(tmp_file, json_file)
+    return dct
+
+
+class DigestStore:
+    """Cached view of the `digest` file of a Foundry project.
+
+    The file is read once and lookups are served from memory. Updates are merged into the file on disk with
+    `locked_json_update`, so that several kontrol processes can update disjoint entries at the same time. Inside a
+    `batch()` block updates are only written back once, when the block exits.
+    """
+
+    _digest_file: Path
+    _data: dict[str, Any] | None
+    _pending: dict[str, Any]
+    _pending_methods: dict[str, dict[str, str]]
+    _batch_depth: int
+
+    def __init__(self, digest_file: Path) -> None:
+        self._digest_file = digest_file
+        self._data = None
+        self._pending = {}
+        self._pending_methods = {}
+        self._batch_depth = 0
+
+    @property
+    def digest_file(self) -> Path:
+        return self._digest_file
+
+    @property
+    def _dict(self) -> dict[str, Any]:
+        if self._data is None:
+            self._data = _read_digest_file(self._digest_file)
+        return self._data
+
+    def exists(self) -> bool:
+        return self._digest_file.exists() or bool(self._pending or self._pending_methods)
+
+    def get(self, key: str, default: Any = '') -> Any:
+        return self._dict.get(key, default)
+
+    def method(self, qualified_name: str) -> dict[str, str]:
+        return self._dict['methods'].get(qualified_name, {})
+
+    def set(self, key: str, value: Any) -> None:
+        self._dict[key] = value
+        self._pending[key] = value
+        self._maybe_flush()
+
+    def set_method(self, qualified_name: str, entry: dict[str, str]) -> None:
+        self._dict['methods'][qualified_name] = entry
+        self._pending_methods[qualified_name] = entry
+        self._maybe_flush()
+
+    def reload(self) -> None:
+        """Drop the cached view, so that the next lookup reads updates made by other processes."""
+        self._data = None
+
+    @contextmanager
+    def batch(self) -> Iterator[DigestStore]:
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            self._maybe_flush()
+
+    def _maybe_flush(self) -> None:
+        if self._batch_depth == 0:
+            self.flush()
+
+    def flush(self) -> None:
+        if not (self._pending or self._pending_methods):
+            return
+
+        def merge(digest_dict: dict[str, Any]) -> None:
+            digest_dict.update(self._pending)
+            digest_dict.setdefault('methods', {}).update(self._pending_methods)
+
+        digest_dict = locked_json_update(self._digest_file, merge)
+        _LOGGER.info(
+            f'Updated digest file {self._digest_file}: {sorted(self._pending) + sorted(self._pending_methods)}'
+        )
+        self._data = digest_dict
+        self._pending = {}
+        self._pending_methods = {}
+
+
+def kontrol_up_to_date(digest: DigestStore) -> bool:
+    if not digest.exists():
         return False
-    digest_dict = _read_digest_file(digest_file)
-    return digest_dict.get('kontrol', '') == VERSION
+    return digest.get('kontrol') == VERSION
+
+
+EMPTY_CONFIG_FILE: Final = 'kontrol-empty-config.pickle'
+_EMPTY_CONFIGS: dict[tuple[str, tuple[int, int, str] | None], KInner] = {}
+
+
+def cached_empty_config(definition_dir: Path, definition: Callable[[], KDefinition]) -> KInner:
+    """Return the empty configuration of the kompiled definition in `definition_dir`.
+
+    The configuration is computed from `definition()` at most once per kompilation: it is kept in memory and pickled
+    into `definition_dir`, keyed by the modification time and size of `compiled.json` and by the pyk version, so that
+    other processes load it without parsing the definition.
+    """
+    try:
+        compiled_stat = (definition_dir / 'compiled.json').stat()
+        stamp: tuple[int, int, str] | None = (compiled_stat.st_mtime_ns, compiled_stat.st_size, pyk.__version__)
+    except FileNotFoundError:
+        stamp = None
+    key = (str(definition_dir), stamp)
+    if key in _EMPTY_CONFIGS:
+        return _EMPTY_CONFIGS[key]
+
+    cache_file = definition_dir / EMPTY_CONFIG_FILE
+    config: KInner | None = None
+    if stamp is not None and cache_file.exists():
+        try:
+            with cache_file.open('rb') as f:
+                cached_stamp, cached_config = pickle.load(f)
+            if cached_stamp == stamp:
+                config = cached_config
+        except Exception as err:
+            _LOGGER.debug(f'Ignoring unreadable configuration cache {cache_file}: {err}')
+
+    if config is None:
+        config = definition().empty_config(GENERATED_TOP_CELL)
+        if stamp is not None:
+            tmp_file = cache_file.with_name(f'{cache_file.name}.{os.getpid()}.tmp')
+            try:
+                with tmp_file.open('wb') as f:
+                    pickle.dump((stamp, config), f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_file, cache_file)
+            except OSError as err:
+                _LOGGER.debug(f'Could not write configuration cache {cache_file}: {err}')
+
+    _EMPTY_CONFIGS[key] = config
+    return config
 
 
 def read_contract_names(contract_names: Path) -> dict[str, str]:
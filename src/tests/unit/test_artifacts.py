@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from typing import TYPE_CHECKING
+
+import pytest
+
+from kontrol import artifacts as artifacts_module
+from kontrol.artifacts import ARTIFACT_INDEX_FILE, PARALLEL_LOAD_THRESHOLD, ArtifactIndex, ArtifactInfo, ContractIndex
+from kontrol.solc_to_k import BytecodeKey
+
+if TYPE_CHECKING:
+    from pathlib import Path
+    from typing import Any
+
+    from kontrol.artifacts import LoadedArtifact
+
+
+def test_artifact_index(tmp_path: Path) -> None:
+    # Given
+    artifact = tmp_path / 'A.sol' / 'A.json'
+    artifact.parent.mkdir()
+    artifact.write_text('{"abi": []}')
+
+    # When
+    index = ArtifactIndex(tmp_path)
+    first = index.fingerprint(artifact)
+    index.flush()
+    cached = ArtifactIndex(tmp_path).fingerprint(artifact, b'not read')
+    artifact.write_text('{"abi": [], "id": 1}')
+    os.utime(artifact, ns=(0, 0))
+    changed = ArtifactIndex(tmp_path).fingerprint(artifact)
+
+    # Then
+    assert first == cached == hashlib.sha256(b'{"abi": []}').hexdigest()
+    assert changed == hashlib.sha256(b'{"abi": [], "id": 1}').hexdigest()
+
+
+def test_artifact_index_ignores_old_info(tmp_path: Path) -> None:
+    # Given
+    artifact = tmp_path / 'A.sol' / 'A.json'
+    artifact.parent.mkdir()
+    artifact.write_text('{"abi": []}')
+    index = ArtifactIndex(tmp_path)
+    info = ArtifactInfo('A', 'src/A.sol', ('f()',), (), (), BytecodeKey(2, ((0, 1),), 'hash'))
+    index.record(artifact, index.fingerprint(artifact), info)
+    index.flush()
+    index_file = tmp_path / ARTIFACT_INDEX_FILE
+    entries = json.loads(index_file.read_text())
+
+    # When
+    recorded = ArtifactIndex(tmp_path).info(artifact)
+    entries['A.sol/A.json'][3] = entries['A.sol/A.json'][3][:5]
+    index_file.write_text(json.dumps(entries))
+    old = ArtifactIndex(tmp_path).info(artifact)
+
+    # Then
+    assert recorded == info
+    assert old is None
+
+
+def write_enum_artifacts(out: Path, sizes: list[int]) -> list[Path]:
+    json_paths = []
+    for i, size in enumerate(sizes):
+        enum = {'nodeType': 'EnumDefinition', 'canonicalName': f'E{i % 2}', 'members': list(range(size))}
+        json_path = out / f'C{i:03}.sol' / f'C{i:03}.json'
+        json_path.parent.mkdir()
+        json_path.write_text(json.dumps({'ast': {'nodeType': 'SourceUnit', 'nodes': [enum]}}))
+        json_paths.append(json_path)
+    return json_paths
+
+
+@pytest.mark.parametrize('workers', [1, 2], ids=['sequential', 'parallel'])
+def test_contract_index_enums(tmp_path: Path, workers: int) -> None:
+    # Given
+    json_paths = write_enum_artifacts(tmp_path, [2, 3] * (PARALLEL_LOAD_THRESHOLD // 2))
+
+    # When
+    contracts = ContractIndex(tmp_path, json_paths, workers=workers)
+
+    # Then
+    assert len(contracts) == 0
+    assert contracts.enums() == {'E0': 2, 'E1': 3}
+
+
+@pytest.mark.parametrize('workers', [1, 2], ids=['sequential', 'parallel'])
+def test_contract_index_enum_conflict(tmp_path: Path, workers: int) -> None:
+    # Given
+    json_paths = write_enum_artifacts(tmp_path, [2, 3] * (PARALLEL_LOAD_THRESHOLD // 2) + [4])
+    contracts = ContractIndex(tmp_path, json_paths, workers=workers)
+
+    # Then
+    with pytest.raises(ValueError, match='enum name conflict: E0'):
+        contracts.enums()
+
+
+def test_contract_index_parses_changed_artifacts(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    # Given
+    json_paths = write_enum_artifacts(tmp_path, [2, 3, 2])
+    ContractIndex(tmp_path, json_paths)
+    parsed: list[Path] = []
+    load_artifact = artifacts_module.load_artifact
+
+    def recording_load_artifact(json_path: Path, *args: Any) -> LoadedArtifact:
+        parsed.append(json_path)
+        return load_artifact(json_path, *args)
+
+    monkeypatch.setattr(artifacts_module, 'load_artifact', recording_load_artifact)
+    json_paths[1].write_text(json_paths[1].read_text().replace('"members": [0, 1, 2]', '"members": [0, 1]'))
+
+    # When
+    enums = ContractIndex(tmp_path, json_paths).enums()
+    reindexed_enums = ContractIndex(tmp_path, json_paths).enums()
+    os.utime(json_paths[0], ns=(0, 0))
+    touched_enums = ContractIndex(tmp_path, json_paths).enums()
+
+    # Then
+    assert parsed == [json_paths[1]]
+    assert enums == reindexed_enums == touched_enums == {'E0': 2, 'E1': 2}
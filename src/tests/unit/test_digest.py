@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING
+
+from kontrol.utils import DigestStore
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def test_digest_store_merges_concurrent_updates(tmp_path: Path) -> None:
+    # Given
+    digest_file = tmp_path / 'digest'
+    first = DigestStore(digest_file)
+    second = DigestStore(digest_file)
+    first.get('foundry')
+    second.get('foundry')
+
+    # When
+    first.set_method('A.test_1()', {'method': 'a1', 'contract': 'a'})
+    second.set_method('B.test_1()', {'method': 'b1', 'contract': 'b'})
+    second.set('foundry', 'f')
+
+    # Then
+    digest_dict = json.loads(digest_file.read_text())
+    assert digest_dict['foundry'] == 'f'
+    assert digest_dict['methods'] == {
+        'A.test_1()': {'method': 'a1', 'contract': 'a'},
+        'B.test_1()': {'method': 'b1', 'contract': 'b'},
+    }
+
+
+def test_digest_store_batch(tmp_path: Path) -> None:
+    # Given
+    digest_file = tmp_path / 'digest'
+    digests = DigestStore(digest_file)
+
+    # When
+    with digests.batch():
+        digests.set_method('A.test_1()', {'method': 'a1'})
+        digests.set_method('A.test_2()', {'method': 'a2'})
+        written_in_batch = digest_file.exists()
+
+    # Then
+    assert not written_in_batch
+    assert digests.method('A.test_2()') == {'method': 'a2'}
+    assert DigestStore(digest_file).method('A.test_1()') == {'method': 'a1'}
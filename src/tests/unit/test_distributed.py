@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import os
+from typing import TYPE_CHECKING
+
+import pytest
+from multiprocess import Process  # type: ignore
+
+from kontrol.distributed import ProofCoordinator, parse_address, run_worker
+
+if TYPE_CHECKING:
+    from typing import Final
+
+
+AUTHKEY: Final = b'kontrol-test'
+
+
+def double(job: str, task: int) -> tuple[str, int]:
+    return job, 2 * task
+
+
+def run_local_worker(address: tuple[str, int]) -> None:
+    run_worker(address, AUTHKEY, double, poll_interval=0.1)
+
+
+def test_coordinator_with_local_workers() -> None:
+    # Given
+    task_ids = [f'test_{i}():0' for i in range(10)]
+
+    # When
+    with ProofCoordinator(('localhost', 0), AUTHKEY, job='job') as coordinator:
+        for i, task_id in enumerate(task_ids):
+            coordinator.submit(task_id, i, priority=i)
+        workers = [Process(target=run_local_worker, args=(coordinator.address,)) for _ in range(3)]
+        for worker in workers:
+            worker.start()
+        results = dict(coordinator.result() for _ in task_ids)
+    for worker in workers:
+        worker.join(timeout=10)
+
+    # Then
+    assert results == {task_id: ('job', 2 * i) for i, task_id in enumerate(task_ids)}
+    assert all(worker.exitcode == 0 for worker in workers)
+
+
+def exit_without_result(job: str, task: int) -> tuple[str, int]:
+    os._exit(1)
+
+
+def fail_on_one(job: str, task: int) -> tuple[str, int]:
+    if task == 1:
+        raise ValueError('Task failed')
+    return double(job, task)
+
+
+def test_coordinator_requeues_tasks_of_lost_workers() -> None:
+    # Given
+    task_ids = [f'test_{i}():0' for i in range(3)]
+
+    # When
+    with ProofCoordinator(
+        ('localhost', 0), AUTHKEY, job='job', lost_worker_timeout=0.5, poll_interval=0.1
+    ) as coordinator:
+        for i, task_id in enumerate(task_ids):
+            coordinator.submit(task_id, i)
+        lost_worker = Process(target=run_worker, args=(coordinator.address, AUTHKEY, exit_without_result, 0.1))
+        lost_worker.start()
+        lost_worker.join(timeout=10)
+        worker = Process(target=run_local_worker, args=(coordinator.address,))
+        worker.start()
+        results = dict(coordinator.result() for _ in task_ids)
+    worker.join(timeout=10)
+
+    # Then
+    assert lost_worker.exitcode == 1
+    assert results == {task_id: ('job', 2 * i) for i, task_id in enumerate(task_ids)}
+    assert worker.exitcode == 0
+
+
+def test_worker_continues_after_task_error() -> None:
+    # Given
+    task_ids = [f'test_{i}():0' for i in range(3)]
+
+    # When
+    results = {}
+    errors = []
+    with ProofCoordinator(('localhost', 0), AUTHKEY, job='job') as coordinator:
+        for i, task_id in enumerate(task_ids):
+            coordinator.submit(task_id, i)
+        worker = Process(target=run_worker, args=(coordinator.address, AUTHKEY, fail_on_one, 0.1))
+        worker.start()
+        for _ in task_ids:
+            try:
+                task_id, result = coordinator.result()
+                results[task_id] = result
+            except RuntimeError as err:
+                errors.append(str(err))
+    worker.join(timeout=10)
+
+    # Then
+    assert results == {'test_0():0': ('job', 0), 'test_2():0': ('job', 4)}
+    assert errors == ['Worker failed to run task test_1():0: Task failed']
+    assert worker.exitcode == 0
+
+
+PARSE_ADDRESS_TEST_DATA: Final = [
+    ('port', '5555', ('localhost', 5555)),
+    ('host-port', 'node1:5555', ('node1', 5555)),
+]
+
+
+@pytest.mark.parametrize(
+    'test_id,address,expected', PARSE_ADDRESS_TEST_DATA, ids=[test_id for test_id, *_ in PARSE_ADDRESS_TEST_DATA]
+)
+def test_parse_address(test_id: str, address: str, expected: tuple[str, int]) -> None:
+    # When
+    actual = parse_address(address)
+
+    # Then
+    assert actual == expected
+
+
+def test_parse_address_invalid() -> None:
+    with pytest.raises(ValueError):
+        parse_address('node1')
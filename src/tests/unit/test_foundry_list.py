@@ -7,6 +7,7 @@ from typing import TYPE_CHECKING, cast
 import pytest
 from pyk.proof.proof import Proof
 
+from kontrol.artifacts import ArtifactInfo
 from kontrol.foundry import Foundry, foundry_list
 from kontrol.solc_to_k import Contract
 
@@ -22,24 +23,33 @@ LIST_APR_PROOF: Final = LIST_DATA_DIR / 'apr_proofs'
 LIST_EXPECTED: Final = LIST_DATA_DIR / 'foundry-list.expected'
 
 
+class ContractIndexMock(dict[str, Contract]):
+    def info(self, name_with_path: str) -> ArtifactInfo:
+        contract = self[name_with_path]
+        signatures = tuple(method.signature for method in contract.methods)
+        return ArtifactInfo(contract.name_with_path, contract.contract_path, signatures, (), ())
+
+
 class FoundryMock:
     @property
     def proofs_dir(self) -> Path:
         return LIST_DATA_DIR / 'apr_proofs'
 
     @cached_property
-    def contracts(self) -> dict[str, Contract]:
-        ret: dict[str, Contract] = {}
+    def contracts(self) -> ContractIndexMock:
+        ret = ContractIndexMock()
         for full_method in listdir(LIST_APR_PROOF):
-            contract = Contract.__new__(Contract)
             method = Contract.Method.__new__(Contract.Method)
             contract_method, *_ = full_method.split(':')
-            contract._name, method.signature = contract_method.split('.')
-            contract.contract_path = contract._name
-            if not hasattr(contract, 'methods'):
+            contract_name, method.signature = contract_method.split('.')
+            if contract_name not in ret:
+                contract = Contract.__new__(Contract)
+                contract._name = contract_name
+                contract.contract_path = contract_name
                 contract.methods = ()
+                ret[contract_name] = contract
+            contract = ret[contract_name]
             contract.methods = contract.methods + (method,)
-            ret[full_method] = contract
         return ret
 
     def get_optional_proof(self, test_id: str) -> Proof | None:
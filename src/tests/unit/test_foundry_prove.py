@@ -1,20 +1,40 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+import os
+import shutil
+from typing import TYPE_CHECKING, NamedTuple, cast
 
 import pytest
 from pyk.cterm import CTerm
 from pyk.kast.inner import KApply, KLabel, KSequence, KSort, KToken, KVariable
 
+from kontrol import prove, utils
+from kontrol.prove import (
+    PooledKoreServer,
+    ProofResult,
+    _bytecode_cost,
+    _load_setup_graft,
+    _lru_get,
+    _lru_put,
+    close_pooled_kore_server,
+)
 from kontrol.state_record import read_recorded_state_diff, recorded_state_to_account_cells
-from kontrol.utils import decode_log_message, ensure_name_is_unique
+from kontrol.utils import cached_empty_config, decode_log_message, ensure_name_is_unique
 
 from .utils import (
     TEST_DATA_DIR,
 )
 
 if TYPE_CHECKING:
-    from typing import Final
+    from pathlib import Path
+    from typing import Any, Final
+
+    from _pytest.monkeypatch import MonkeyPatch
+    from pyk.kast.inner import KInner
+    from pyk.kast.outer import KDefinition
+
+    from kontrol.foundry import Foundry
+    from kontrol.options import ProveOptions
 
 
 ACCESSES_INPUT_FILE: Final = TEST_DATA_DIR / 'accesses.json'
@@ -119,3 +139,152 @@ def test_abi_decode(test_id: str, log_selector: int, input: str, expected: str)
 
     # Then
     assert actual == expected
+
+
+class FakeProcess:
+    returncode: int | None = None
+
+    def poll(self) -> int | None:
+        return self.returncode
+
+
+class FakeKoreServer:
+    port: int
+    closed: bool
+
+    def __init__(self, port: int) -> None:
+        self.port = port
+        self.closed = False
+        self._proc = FakeProcess()
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def test_pooled_kore_server(monkeypatch: MonkeyPatch) -> None:
+    # Given
+    started: list[FakeKoreServer] = []
+
+    def fake_kore_server(*args: Any, **kwargs: Any) -> FakeKoreServer:
+        server = FakeKoreServer(len(started))
+        started.append(server)
+        return server
+
+    monkeypatch.setattr(prove, 'kore_server', fake_kore_server)
+
+    # When
+    with PooledKoreServer(smt_timeout=100) as server:
+        first_port = server.port()
+    with PooledKoreServer(smt_timeout=100) as server:
+        second_port = server.port()
+    with PooledKoreServer(smt_timeout=200) as server:
+        changed_port = server.port()
+    started[-1]._proc.returncode = 1
+    with PooledKoreServer(smt_timeout=200) as server:
+        restarted_port = server.port()
+    close_pooled_kore_server()
+
+    # Then
+    assert first_port == second_port == 0
+    assert changed_port == 1
+    assert restarted_port == 2
+    assert all(server.closed for server in started)
+
+
+def test_foundry_prove_reports_proofs_not_run(monkeypatch: MonkeyPatch) -> None:
+    # Given
+    skipped = ProofResult.from_skipped('AssertTest.test_assert_true():0', ['AssertTest.setUp():0'])
+    monkeypatch.setattr(prove, 'foundry_prove_results', lambda *args: [skipped])
+
+    # Then
+    with pytest.raises(RuntimeError, match=r'AssertTest\.test_assert_true\(\):0: Not run, since AssertTest\.setUp'):
+        prove.foundry_prove(cast('ProveOptions', None), cast('Foundry', None))
+
+
+BYTECODE_COST_TEST_DATA: Final = [
+    ('empty', '', 0),
+    ('stop', '00', 1),
+    ('jumpi', '600a57', 103),
+    ('push-data', '6257575700', 5),
+    ('unlinked-library', '73__$1234$__57', 7),
+]
+
+
+@pytest.mark.parametrize(
+    'test_id,bytecode,expected', BYTECODE_COST_TEST_DATA, ids=[test_id for test_id, *_ in BYTECODE_COST_TEST_DATA]
+)
+def test_bytecode_cost(test_id: str, bytecode: str, expected: int) -> None:
+    # When
+    actual = _bytecode_cost(bytecode)
+
+    # Then
+    assert actual == expected
+
+
+class FoundryProofsDirMock(NamedTuple):
+    proofs_dir: Path
+
+
+def test_load_setup_graft_cache(tmp_path: Path) -> None:
+    # Given
+    proof_id = 'test%AssertTest.setUp():0'
+    shutil.copytree(TEST_DATA_DIR / 'foundry-list' / 'apr_proofs' / proof_id, tmp_path / proof_id)
+    foundry = cast('Foundry', FoundryProofsDirMock(tmp_path))
+
+    # When
+    first = _load_setup_graft(foundry, proof_id, graft=True)
+    second = _load_setup_graft(foundry, proof_id, graft=True)
+    proof_json = tmp_path / proof_id / 'proof.json'
+    proof_json.write_text(proof_json.read_text())
+    os.utime(proof_json, ns=(0, 0))
+    reloaded = _load_setup_graft(foundry, proof_id, graft=True)
+
+    # Then
+    assert second is first
+    assert reloaded is not first
+    assert reloaded == first
+    assert first.kcfg().to_dict() == first.kcfg_dict
+
+
+def test_lru_cache() -> None:
+    # Given
+    cache: dict[str, int] = {}
+    _lru_put(cache, 'a', 1, size=2)
+    _lru_put(cache, 'b', 2, size=2)
+
+    # When
+    hit = _lru_get(cache, 'a')
+    _lru_put(cache, 'c', 3, size=2)
+    miss = _lru_get(cache, 'b')
+
+    # Then
+    assert hit == 1
+    assert miss is None
+    assert cache == {'a': 1, 'c': 3}
+
+
+class DefinitionMock:
+    def __init__(self, config: KInner) -> None:
+        self.config = config
+        self.calls = 0
+
+    def empty_config(self, sort: KSort) -> KInner:
+        self.calls += 1
+        return self.config
+
+
+def test_cached_empty_config(tmp_path: Path) -> None:
+    # Given
+    (tmp_path / 'compiled.json').write_text('{}')
+    definition = DefinitionMock(KApply('<generatedTop>', KVariable('K_CELL')))
+
+    # When
+    first = cached_empty_config(tmp_path, lambda: cast('KDefinition', definition))
+    utils._EMPTY_CONFIGS.clear()
+    reloaded = cached_empty_config(tmp_path, lambda: cast('KDefinition', definition))
+    (tmp_path / 'compiled.json').write_text('{ }')
+    recomputed = cached_empty_config(tmp_path, lambda: cast('KDefinition', definition))
+
+    # Then
+    assert first == reloaded == recomputed == definition.config
+    assert definition.calls == 2
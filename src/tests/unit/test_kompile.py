@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import subprocess
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, cast
+
+import pytest
+
+from kontrol.kompile import (
+    KOMPILED_VARIANT_FILE,
+    _activate_kompiled_variant,
+    _cancel_session,
+    _fetch_kompiled,
+    _join_session,
+    _publish_kompiled,
+    _start_in_session,
+)
+
+if TYPE_CHECKING:
+    from kontrol.foundry import Foundry
+
+
+class FoundryKompiledMock:
+    def __init__(self, out: Path) -> None:
+        self.kompiled = out / 'kompiled'
+        self.kompiled_variants = out / 'kompiled-variants'
+
+
+def test_activate_kompiled_variant(tmp_path: Path) -> None:
+    # Given
+    foundry = FoundryKompiledMock(tmp_path)
+    (foundry.kompiled / 'foundry.k').parent.mkdir()
+    (foundry.kompiled / 'foundry.k').write_text('legacy')
+    first, second = foundry.kompiled_variants / 'first', foundry.kompiled_variants / 'second'
+    for variant in (first, second):
+        variant.mkdir(parents=True)
+        (variant / 'foundry.k').write_text(variant.name)
+
+    # When
+    _activate_kompiled_variant(cast('Foundry', foundry), first)
+    activated_first = (foundry.kompiled / 'foundry.k').read_text()
+    _activate_kompiled_variant(cast('Foundry', foundry), second)
+    activated_second = (foundry.kompiled / 'foundry.k').read_text()
+    _activate_kompiled_variant(cast('Foundry', foundry), first)
+
+    # Then
+    assert activated_first == 'first'
+    assert activated_second == 'second'
+    assert (foundry.kompiled / 'foundry.k').read_text() == 'first'
+    assert foundry.kompiled.is_symlink()
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['kompiled', 'kompiled-variants']
+
+
+def test_kompiled_cache_round_trip(tmp_path: Path) -> None:
+    # Given
+    built = tmp_path / 'first' / 'kompiled-variants' / 'variant'
+    (built / 'llvm-library').mkdir(parents=True)
+    (built / 'llvm-library' / 'interpreter').write_text('interpreter')
+    (built / KOMPILED_VARIANT_FILE).write_text('{}')
+    cache_entry = tmp_path / 'cache' / 'key'
+    cache_entry.parent.mkdir()
+    fetched = tmp_path / 'second' / 'kompiled-variants' / 'variant'
+    fetched.parent.mkdir(parents=True)
+    incomplete = tmp_path / 'third' / 'kompiled-variants' / 'variant'
+
+    # When
+    _fetch_kompiled(cache_entry, incomplete)
+    _publish_kompiled(built, cache_entry)
+    _fetch_kompiled(cache_entry, fetched)
+
+    # Then
+    assert not incomplete.exists()
+    assert (cache_entry / 'llvm-library' / 'interpreter').read_text() == 'interpreter'
+    assert (fetched / 'llvm-library' / 'interpreter').read_text() == 'interpreter'
+    assert (fetched / KOMPILED_VARIANT_FILE).exists()
+    assert sorted(path.name for path in cache_entry.parent.iterdir()) == ['key']
+
+
+def is_running(pid: int) -> bool:
+    try:
+        stat = Path(f'/proc/{pid}/stat').read_text()
+    except FileNotFoundError:
+        return False
+    # Killed processes whose parent is gone may linger as zombies until reaped
+    return stat.rsplit(')', 1)[1].split()[0] != 'Z'
+
+
+def start_sleep(pid_file: Path) -> None:
+    sleep = subprocess.Popen(['sleep', '60'])
+    pid_file.write_text(str(sleep.pid))
+    sleep.wait()
+
+
+def write_target(target: str, output_file: Path) -> None:
+    output_file.write_text(target)
+
+
+def fail() -> None:
+    raise ValueError('kompilation error')
+
+
+def test_cancel_session(tmp_path: Path) -> None:
+    # Given
+    pid_file = tmp_path / 'pid'
+    session = _start_in_session(start_sleep, pid_file=pid_file)
+    while not pid_file.exists() or not pid_file.read_text():
+        time.sleep(0.01)
+    sleep_pid = int(pid_file.read_text())
+
+    # When
+    _cancel_session(session)
+
+    # Then
+    assert session.exitcode != 0
+    for _ in range(100):
+        if not is_running(sleep_pid):
+            break
+        time.sleep(0.01)
+    assert not is_running(sleep_pid)
+
+
+def test_join_session_failure() -> None:
+    # Given
+    session = _start_in_session(fail)
+
+    # Then
+    with pytest.raises(RuntimeError, match='Kompilation failed with exit code 1'):
+        _join_session(session, 'Kompilation')
+
+
+def test_start_in_session_forwards_kwargs(tmp_path: Path) -> None:
+    # Given
+    output_file = tmp_path / 'target'
+
+    # When
+    session = _start_in_session(write_target, target='llvm', output_file=output_file)
+    _join_session(session, 'Kompilation')
+
+    # Then
+    assert output_file.read_text() == 'llvm'
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import shutil
+from typing import TYPE_CHECKING
+
+import pytest
+from pyk.kast.prelude.ml import mlTop
+from pyk.proof.implies import RefutationProof
+from pyk.proof.reachability import APRProof
+
+from kontrol.proof_store import ProofIndex, ProofSummaryIndex
+
+from .utils import TEST_DATA_DIR
+
+if TYPE_CHECKING:
+    from pathlib import Path
+    from typing import Final
+
+
+APR_PROOFS_DIR: Final = TEST_DATA_DIR / 'foundry-list' / 'apr_proofs'
+PROOF_ID: Final = 'test%AssertTest.test_assert_false():0'
+
+
+def test_proof_index_reads_nodes() -> None:
+    # Given
+    proof = APRProof.read_proof_data(APR_PROOFS_DIR, PROOF_ID)
+
+    # When
+    index = ProofIndex(APR_PROOFS_DIR, PROOF_ID)
+
+    # Then
+    for node in proof.kcfg.nodes:
+        assert index.node(node.id) == node
+        assert index.node(str(node.id)) == node
+
+
+def test_proof_index_unknown_node() -> None:
+    # Given
+    index = ProofIndex(APR_PROOFS_DIR, PROOF_ID)
+
+    # Then
+    with pytest.raises(ValueError, match='Unknown node'):
+        index.node(1000)
+
+
+def test_proof_summary_index(tmp_path: Path) -> None:
+    # Given
+    shutil.copytree(APR_PROOFS_DIR / PROOF_ID, tmp_path / PROOF_ID)
+    proof = APRProof.read_proof_data(tmp_path, PROOF_ID)
+    index = ProofSummaryIndex(tmp_path)
+
+    # When
+    missing = index.get(PROOF_ID)
+    written = index.update(proof, digest='digest')
+    indexed = ProofSummaryIndex(tmp_path).get(PROOF_ID)
+    (tmp_path / PROOF_ID / 'proof.json').write_text((tmp_path / PROOF_ID / 'proof.json').read_text() + '\n')
+    stale = ProofSummaryIndex(tmp_path).get(PROOF_ID)
+
+    # Then
+    assert missing is None
+    assert indexed == written
+    assert written.lines == tuple(proof.summary.lines)
+    assert written.version == 0
+    assert written.digest == 'digest'
+    assert stale is None
+
+
+def test_proof_summary_index_refutation(tmp_path: Path) -> None:
+    # Given
+    refutation_id = f'{PROOF_ID}.node-infeasible-3'
+    refutation = RefutationProof(refutation_id, pre_constraints=[], last_constraint=mlTop(), proof_dir=tmp_path)
+    refutation.write_proof_data()
+    index = ProofSummaryIndex(tmp_path)
+
+    # When
+    written = index.update(refutation)
+    indexed = ProofSummaryIndex(tmp_path).get(refutation_id)
+
+    # Then
+    assert indexed == written
+    assert written.lines == tuple(refutation.summary.lines)
+    assert (written.nodes, written.pending, written.failing, written.exec_time) == (0, 0, 0, 0.0)
+    assert written.version is None
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import pytest
+
+from kontrol.scheduler import ProofDAG, predict_makespan
+
+
+def test_proof_dag_releases_children() -> None:
+    # Given
+    dag = ProofDAG(
+        {
+            'A.init:0': [],
+            'A.setUp():0': ['A.init:0'],
+            'A.test_1():0': ['A.setUp():0'],
+            'A.test_2():0': ['A.setUp():0'],
+            'B.test_1():0': [],
+        }
+    )
+
+    # When
+    first = dag.pop_ready()
+    dag.finish('A.init:0', True)
+    second = dag.pop_ready()
+    dag.finish('A.setUp():0', True)
+    third = dag.pop_ready()
+
+    # Then
+    assert first == ['A.init:0', 'B.test_1():0']
+    assert second == ['A.setUp():0']
+    assert third == ['A.test_1():0', 'A.test_2():0']
+    assert not dag.done
+
+
+def test_proof_dag_skips_descendants_of_failed() -> None:
+    # Given
+    dag = ProofDAG(
+        {
+            'A.init:0': [],
+            'A.setUp():0': ['A.init:0'],
+            'A.test_1():0': ['A.setUp():0'],
+            'B.test_1():0': [],
+        }
+    )
+
+    # When
+    dag.pop_ready()
+    dag.finish('A.init:0', False)
+    dag.finish('B.test_1():0', True)
+
+    # Then
+    assert dag.done
+    assert dag.pop_ready() == []
+    assert dag.failed == {'A.init:0'}
+    assert dag.passed == {'B.test_1():0'}
+    assert dag.skipped == {'A.setUp():0', 'A.test_1():0'}
+
+
+def test_proof_dag_ignores_external_dependencies() -> None:
+    # Given
+    dag = ProofDAG({'A.test_1():0': ['A.setUp():0']})
+
+    # Then
+    assert dag.pop_ready() == ['A.test_1():0']
+
+
+def test_proof_dag_rejects_cycles() -> None:
+    with pytest.raises(ValueError, match='Cyclic proof dependencies'):
+        ProofDAG({'A.f():0': ['B.g():0'], 'B.g():0': ['A.f():0']})
+
+
+def test_proof_dag_order_only_dependencies() -> None:
+    # Given
+    dag = ProofDAG(
+        {'C.g():0': [], 'B.f():0': [], 'A.test():0': []},
+        order_only={'B.f():0': ['C.g():0'], 'A.test():0': ['B.f():0']},
+    )
+
+    # When
+    first = dag.pop_ready()
+    dag.finish('C.g():0', False)
+    second = dag.pop_ready()
+    dag.finish('B.f():0', True)
+    third = dag.pop_ready()
+
+    # Then
+    assert first == ['C.g():0']
+    assert second == ['B.f():0']
+    assert third == ['A.test():0']
+    assert dag.skipped == set()
+
+
+def test_proof_dag_priority() -> None:
+    # Given
+    dependencies: dict[str, list[str]] = {
+        'A.setUp():0': [],
+        'A.test_short():0': ['A.setUp():0'],
+        'A.test_long():0': ['A.setUp():0'],
+        'B.test():0': [],
+    }
+    durations = {'A.setUp():0': 1.0, 'A.test_short():0': 1.0, 'A.test_long():0': 10.0, 'B.test():0': 5.0}
+
+    # When
+    priority = ProofDAG(dependencies).bottom_levels(durations)
+    dag = ProofDAG(dependencies, priority=priority)
+    first = dag.pop_ready(1)
+
+    # Then
+    assert priority['A.setUp():0'] == 11.0
+    assert first == ['A.setUp():0']
+    assert predict_makespan(dependencies, durations, 2, priority) == 11.0
+    assert predict_makespan(dependencies, durations, 1, priority) == 17.0
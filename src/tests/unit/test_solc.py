@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import json
+import os
+from typing import TYPE_CHECKING
+
+import pytest
+
+from kontrol import solc as solc_module
+from kontrol.solc import CompilationUnit
+
+if TYPE_CHECKING:
+    from pathlib import Path
+    from typing import Any
+
+
+def contract_json(runtime_code: bytes, cbor_data: bytes) -> dict[str, Any]:
+    deployed = runtime_code + cbor_data + len(cbor_data).to_bytes(2, byteorder='big')
+    return {
+        'abi': [],
+        'evm': {
+            'bytecode': {'object': '6080' + deployed.hex(), 'sourceMap': ''},
+            'deployedBytecode': {'object': '0x' + deployed.hex(), 'sourceMap': '', 'linkReferences': {}},
+        },
+    }
+
+
+def write_build_info(build_info_dir: Path, build_id: str, sources: dict[str, dict[str, Any]], mtime: int) -> Path:
+    build_info = {
+        'id': build_id,
+        'input': {'sources': {name: {'content': source['content']} for name, source in sources.items()}},
+        'output': {
+            'sources': {name: {'id': i, 'ast': {'nodeType': 'SourceUnit'}} for i, name in enumerate(sources)},
+            'contracts': {name: source['contracts'] for name, source in sources.items()},
+        },
+    }
+    build_info_file = build_info_dir / f'{build_id}.json'
+    build_info_file.write_text(json.dumps(build_info, ensure_ascii=False, indent=2), encoding='utf-8')
+    os.utime(build_info_file, ns=(mtime, mtime))
+    return build_info_file
+
+
+def write_build_infos(build_info_dir: Path) -> None:
+    build_info_dir.mkdir()
+    old_contract = contract_json(b'\x60\x00', b'old')
+    write_build_info(
+        build_info_dir,
+        'old',
+        {'src/Old.sol': {'content': 'contract Old {}\n', 'contracts': {'Old': old_contract, 'Token': old_contract}}},
+        mtime=1_000_000_000,
+    )
+    write_build_info(
+        build_info_dir,
+        'new',
+        {
+            'src/Ünïcode.sol': {
+                'content': '// ünïcode\ncontract Token {}\n',
+                'contracts': {'Token': contract_json(b'\x60\x01', b'new')},
+            },
+            'src/Interface.sol': {'content': 'interface I {}\n', 'contracts': {'I': {'evm': {}}}},
+        },
+        mtime=2_000_000_000,
+    )
+
+
+def test_compilation_unit_loads_all_build_infos(tmp_path: Path) -> None:
+    # Given
+    build_info_dir = tmp_path / 'build-info'
+    write_build_infos(build_info_dir)
+
+    # When
+    compilation_unit = CompilationUnit.load_build_info(build_info_dir)
+    old = compilation_unit.get_contract_by_name('src/Old.sol:Old')
+    token = compilation_unit.get_contract_by_initcode(bytes.fromhex('6080') + b'\x60\x01new\x00\x03')
+    source = compilation_unit.get_source_by_id(0, token.build_info)
+
+    # Then
+    assert old.build_info == 'old.json'
+    assert old.get_deployed_bytecode == b'\x60\x00old\x00\x03'
+    assert token.build_info == 'new.json'
+    assert compilation_unit.get_contract_by_name('src/Ünïcode.sol:Token') is token
+    assert source.name == 'src/Ünïcode.sol'
+    assert source.source_text == '// ünïcode\ncontract Token {}\n'
+    assert source.offset_to_position(11) == (2, 1)
+    assert compilation_unit.get_source_by_id(0).name == 'src/Ünïcode.sol'
+    assert compilation_unit.get_source_by_id(0, old.build_info).name == 'src/Old.sol'
+
+
+INSTRUCTION_TEST_DATA: list[tuple[str, bytes, str]] = [
+    ('deployed-code', b'\x60\x01new\x00\x03', 'src/Ünïcode.sol:Token'),
+    ('init-code', bytes.fromhex('6080') + b'\x60\x01new\x00\x03', 'src/Ünïcode.sol:Token'),
+    ('older-build-info', b'\x60\x00old\x00\x03', 'src/Old.sol:Token'),
+    ('embedded-metadata', b'\x60\x00old\x00\x03\x60\x01new\x00\x03' + bytes(32), 'src/Ünïcode.sol:Token'),
+]
+
+
+@pytest.mark.parametrize(
+    'bytecode,contract_name',
+    [(bytecode, contract_name) for _, bytecode, contract_name in INSTRUCTION_TEST_DATA],
+    ids=[test_id for test_id, *_ in INSTRUCTION_TEST_DATA],
+)
+def test_get_instruction(tmp_path: Path, bytecode: bytes, contract_name: str) -> None:
+    # Given
+    build_info_dir = tmp_path / 'build-info'
+    write_build_infos(build_info_dir)
+    compilation_unit = CompilationUnit.load_build_info(build_info_dir)
+
+    # When
+    instruction = compilation_unit.get_instruction(bytecode, 0)
+
+    # Then
+    assert instruction.contract is compilation_unit.get_contract_by_name(contract_name)
+    assert compilation_unit.get_instruction(bytecode, 1) is instruction
+
+
+def test_disassembly_cache(tmp_path: Path, monkeypatch: Any) -> None:
+    # Given
+    build_info_dir = tmp_path / 'build-info'
+    index_file = tmp_path / 'kontrol-build-info.json'
+    write_build_infos(build_info_dir)
+    bytecode = b'\x60\x01new\x00\x03'
+    compilation_unit = CompilationUnit.load_build_info(build_info_dir, index_file)
+    contract = compilation_unit.get_contract_by_name('src/Ünïcode.sol:Token')
+    expected = [(instruction.pc, str(instruction)) for instruction in contract.instructions]
+
+    def fail(bytecode: bytes) -> None:
+        raise AssertionError('Bytecode disassembled again')
+
+    monkeypatch.setattr(solc_module.pyevmasm, 'disassemble_all', fail)
+
+    # When
+    compilation_unit = CompilationUnit.load_build_info(build_info_dir, index_file)
+    instructions = [compilation_unit.get_instruction(bytecode, pc) for pc in range(2)]
+
+    # Then
+    assert len(list((tmp_path / 'kontrol-disassembly').iterdir())) == 1
+    assert [(instruction.pc, str(instruction)) for instruction in instructions[:1]] == expected
+    assert instructions[0] is instructions[1]
+    with pytest.raises(KeyError):
+        # The metadata bytes start with a truncated PUSH15, which is not disassembled
+        compilation_unit.get_instruction(bytecode, 2)
+
+
+def test_build_info_index_scans_changed_files(tmp_path: Path, monkeypatch: Any) -> None:
+    # Given
+    build_info_dir = tmp_path / 'build-info'
+    index_file = tmp_path / 'kontrol-build-info.json'
+    write_build_infos(build_info_dir)
+    CompilationUnit.load_build_info(build_info_dir, index_file)
+    scanned: list[str] = []
+    scan_build_info = solc_module.scan_build_info
+
+    def recording_scan_build_info(build_info: Path) -> dict[str, Any]:
+        scanned.append(build_info.name)
+        return scan_build_info(build_info)
+
+    monkeypatch.setattr(solc_module, 'scan_build_info', recording_scan_build_info)
+    os.utime(build_info_dir / 'old.json', ns=(3_000_000_000, 3_000_000_000))
+    (build_info_dir / 'new.json').unlink()
+
+    # When
+    compilation_unit = CompilationUnit.load_build_info(build_info_dir, index_file)
+    token = compilation_unit.get_contract_by_name('src/Old.sol:Token')
+    reloaded = CompilationUnit.load_build_info(build_info_dir, index_file)
+
+    # Then
+    assert scanned == ['old.json']
+    assert token.get_deployed_bytecode == b'\x60\x00old\x00\x03'
+    assert reloaded.get_contract_by_name('src/Old.sol:Old').build_info == 'old.json'
+    assert list(json.loads(index_file.read_text())) == ['old.json']
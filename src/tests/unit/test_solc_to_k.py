@@ -8,6 +8,8 @@ from pyk.kast.inner import KApply, KToken, KVariable
 from pyk.kast.prelude.kint import eqInt, intToken
 
 from kontrol.solc_to_k import (
+    BytecodeIndex,
+    BytecodeKey,
     Contract,
     Input,
     StorageField,
@@ -645,6 +647,45 @@ def test_contract_name_from_bytecode() -> None:
     )
 
 
+def test_bytecode_index() -> None:
+    # Given
+    contract_data: dict[str, tuple[str, list[tuple[int, int]], list[tuple[int, int]]]] = {
+        'contract1': ('aaaa0000bbbb', [(2, 2)], []),
+        'contract2': ('aaaa0000bbbb', [], []),
+        'contract3': ('aaaa0000bbbb', [(2, 2)], []),
+        'contract4': ('cccc', [(1, 4)], []),
+    }
+    index = BytecodeIndex(contract_data)
+
+    # Then
+    assert index.contract_name(bytes.fromhex('aaaa1111bbbb')) == 'contract1'
+    assert index.contract_name(bytes.fromhex('aaaa0000bbbb')) == 'contract1'
+    assert index.contract_name(bytes.fromhex('aaaa00bbbb')) is None
+    assert index.contract_name(bytes.fromhex('cccc')) == 'contract4'
+    assert index.contract_name(bytes.fromhex('cc11')) is None
+
+
+def test_bytecode_index_from_keys() -> None:
+    # Given
+    contract_data: dict[str, tuple[str, list[tuple[int, int]], list[tuple[int, int]]]] = {
+        'contract1': ('aaaa0000bbbb', [(2, 2)], []),
+        'contract2': ('bbbb__$53aea86b7d70b31448b230b20ae141a537$__', [], [(2, 20)]),
+        'contract3': ('not-hex', [], []),
+    }
+    keys = {name: BytecodeKey.from_bytecode(*bytecode) for name, bytecode in contract_data.items()}
+
+    # When
+    index = BytecodeIndex.from_keys(
+        {name: BytecodeKey.from_list(key.to_list()) if key is not None else None for name, key in keys.items()}
+    )
+
+    # Then
+    assert keys['contract3'] is None
+    assert index.contract_name(bytes.fromhex('aaaa1111bbbb')) == 'contract1'
+    assert index.contract_name(bytes.fromhex('bbbb' + '77' * 20)) == 'contract2'
+    assert index.contract_name(bytes.fromhex('bbbb')) is None
+
+
 DECODE_DATA: list[tuple[str, KInner, str, dict[bytes, tuple[str, list[str]]], str]] = [
     (
         'concrete-0',